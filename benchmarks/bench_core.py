@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the core hot paths and writes the results as JSON.
+
+Runs the activity monitor, activity simulator, sleep preventer and keep-alive
+controller against the in-memory fakes of benchmarks/fakes.py, so no display
+server or D-Bus session is needed. Measures:
+
+- the cost of one input event callback, with events arriving at 100, 1000
+  and 10000 events per second
+- the cost of one simulated mouse and keyboard input, without the pause
+  between its two halves
+- the cost of taking and releasing the sleep inhibitor
+- the latency of an activity state transition, from the monitor callback
+  to the STATE_CHANGED handler
+- start/stop cycle times of the monitor, the simulator and the controller
+
+Times are in microseconds. Compare two runs to spot regressions:
+
+    python benchmarks/bench_core.py -o before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fakes import FakeInhibitor, FakeInputBackend  # noqa: E402
+from screen_keeper.config.settings import Settings  # noqa: E402
+from screen_keeper.core.activity_monitor import ActivityMonitor  # noqa: E402
+from screen_keeper.core.events import STATE_CHANGED  # noqa: E402
+from screen_keeper.core.keeper import KeepAliveController  # noqa: E402
+from screen_keeper.core.mouse_mover import MouseMover  # noqa: E402
+from screen_keeper.core.scheduler import Scheduler  # noqa: E402
+from screen_keeper.core.sleep_preventer import SleepPreventer  # noqa: E402
+
+EVENT_RATES = (100, 1000, 10000)
+
+
+def summarize(times_ns: Sequence[int]) -> Dict[str, float]:
+    """Get the count and distribution of timings, in microseconds."""
+    times = sorted(t / 1e3 for t in times_ns)
+    return {
+        "count": len(times),
+        "mean_us": round(statistics.fmean(times), 3),
+        "median_us": round(statistics.median(times), 3),
+        "p99_us": round(times[min(int(len(times) * 0.99), len(times) - 1)], 3),
+        "max_us": round(times[-1], 3),
+    }
+
+
+def time_calls(call: Callable[[], object], runs: int) -> List[int]:
+    """Time a function, once per run, in nanoseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        call()
+        times.append(time.perf_counter_ns() - start)
+    return times
+
+
+def bench_event_rate(rate: int, duration: float) -> dict:
+    """
+    Time the input callbacks of an ActivityMonitor with events arriving at a rate.
+    
+    Events alternate between mouse movement, clicks and key presses, as the
+    listener threads would deliver them. The pacing between events is not
+    timed, only the callbacks themselves.
+    
+    Args:
+        rate: Events per second
+        duration: Seconds to deliver events for
+    """
+    backend = FakeInputBackend()
+    monitor = ActivityMonitor(inactivity_timeout=3600, scheduler=Scheduler(), input_backend=backend)
+    monitor.start()
+    emitters = (backend.emit_move, backend.emit_click, backend.emit_press)
+    
+    times = []
+    period_ns = int(1e9 / rate)
+    next_ns = time.perf_counter_ns()
+    for i in range(int(rate * duration)):
+        # Sleep through most of the gap and spin the rest, sleeps overshoot
+        while True:
+            remaining_ns = next_ns - time.perf_counter_ns()
+            if remaining_ns <= 0:
+                break
+            if remaining_ns > 2_000_000:
+                time.sleep((remaining_ns - 1_000_000) / 1e9)
+        next_ns += period_ns
+        
+        emit = emitters[i % 3]
+        start = time.perf_counter_ns()
+        emit()
+        times.append(time.perf_counter_ns() - start)
+    
+    monitor.stop()
+    result = summarize(times)
+    result["coalesced"] = monitor.coalesced_events
+    return result
+
+
+def bench_update_activity(runs: int) -> dict:
+    """Time the full activity handling path, run once per coalesce window."""
+    monitor = ActivityMonitor(inactivity_timeout=3600, scheduler=Scheduler(),
+                              input_backend=FakeInputBackend())
+    monitor.start()
+    times = time_calls(monitor._update_activity, runs)
+    monitor.stop()
+    return summarize(times)
+
+
+def bench_simulation(runs: int) -> Dict[str, dict]:
+    """Time one simulated mouse and keyboard input, with no pause between their halves."""
+    mover = MouseMover(mode=MouseMover.MODE_BOTH, scheduler=Scheduler(),
+                       input_backend=FakeInputBackend())
+    mover.INPUT_PAUSE = 0
+    mover._open_controllers()
+    return {
+        "mouse": summarize(time_calls(mover._simulate_mouse, runs)),
+        "keyboard": summarize(time_calls(mover._simulate_keyboard, runs)),
+    }
+
+
+def bench_sleep_prevention(runs: int) -> Dict[str, dict]:
+    """Time taking and releasing the Linux inhibitor, without D-Bus round trips."""
+    preventer = SleepPreventer(scheduler=Scheduler(), inhibitor_factory=FakeInhibitor)
+    preventer.system = "Linux"
+    prevent, allow = [], []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        preventer.prevent_sleep()
+        prevent.append(time.perf_counter_ns() - start)
+        start = time.perf_counter_ns()
+        preventer.allow_sleep()
+        allow.append(time.perf_counter_ns() - start)
+    return {"prevent_sleep": summarize(prevent), "allow_sleep": summarize(allow)}
+
+
+def create_controller(config_file: str) -> KeepAliveController:
+    """Create a controller moving the mouse while the input hooks see no activity."""
+    with open(config_file, "w") as f:
+        json.dump({
+            "prevent_sleep": True,
+            "use_activity_detection": True,
+            "activity_backend": "hooks",
+            "simulation_mode": "mouse",
+            "record_activity_history": False,
+        }, f)
+    
+    preventer = SleepPreventer(inhibitor_factory=FakeInhibitor)
+    preventer.system = "Linux"
+    return KeepAliveController(Settings(config_file), sleep_preventer=preventer,
+                               input_backend=FakeInputBackend())
+
+
+def bench_transitions(config_file: str, runs: int) -> Dict[str, dict]:
+    """
+    Time activity state transitions through the event bus.
+    
+    Each transition runs from the monitor callback, on the calling thread as
+    on a listener thread, to the STATE_CHANGED handler on the scheduler
+    thread, including starting or stopping the simulator in between.
+    """
+    keeper = create_controller(config_file)
+    changed = threading.Event()
+    keeper.event_bus.subscribe(STATE_CHANGED, changed.set)
+    keeper.start()
+    changed.wait(1.0)
+    monitor = keeper.activity_monitor
+    
+    def transition(callback: Callable[[], None]) -> int:
+        changed.clear()
+        start = time.perf_counter_ns()
+        callback()
+        if not changed.wait(1.0):
+            raise RuntimeError("state change not delivered")
+        return time.perf_counter_ns() - start
+    
+    inactive, active = [], []
+    for _ in range(runs):
+        inactive.append(transition(monitor._on_inactive_callback))
+        active.append(transition(monitor._on_active_callback))
+    keeper.stop()
+    return {"user_inactive": summarize(inactive), "user_active": summarize(active)}
+
+
+def bench_start_stop(config_file: str, runs: int) -> Dict[str, dict]:
+    """Time start() followed by stop() of the monitor, the simulator and the controller."""
+    scheduler = Scheduler()
+    backend = FakeInputBackend()
+    monitor = ActivityMonitor(scheduler=scheduler, input_backend=backend)
+    mover = MouseMover(mode=MouseMover.MODE_BOTH, scheduler=scheduler, input_backend=backend)
+    keeper = create_controller(config_file)
+    
+    def cycle(component) -> Callable[[], None]:
+        def run():
+            component.start()
+            component.stop()
+        return run
+    
+    return {
+        "activity_monitor": summarize(time_calls(cycle(monitor), runs)),
+        "mouse_mover": summarize(time_calls(cycle(mover), runs)),
+        "keeper": summarize(time_calls(cycle(keeper), runs)),
+    }
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-o", "--output", help="JSON file to write (default: standard output)")
+    parser.add_argument("-d", "--duration", type=float, default=1.0,
+                        help="seconds of events per rate (default: 1)")
+    parser.add_argument("-n", "--runs", type=int, default=1000, help="runs per timing (default: 1000)")
+    args = parser.parse_args()
+    
+    # Start failures and inhibitor messages are expected here, keep the output JSON
+    logging.basicConfig(level=logging.ERROR)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, "config.json")
+        results = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "event_callback": {
+                f"{rate}_per_second": bench_event_rate(rate, args.duration) for rate in EVENT_RATES
+            },
+            "update_activity": bench_update_activity(args.runs),
+            "simulation": bench_simulation(args.runs),
+            "sleep_prevention": bench_sleep_prevention(args.runs),
+            "transition": bench_transitions(config_file, max(args.runs // 10, 1)),
+            "start_stop": bench_start_stop(config_file, max(args.runs // 10, 1)),
+        }
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmarks main window construction and status style changes.
+
+Constructs and shows the main window several times, then times switching the
+activity label between two status colors, once with the dynamic "state"
+property of the theme and once the old way, with a new per-widget
+stylesheet. Runs on the offscreen Qt platform unless QT_QPA_PLATFORM is set:
+
+    python benchmarks/bench_window.py -n 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from screen_keeper.config.settings import Settings  # noqa: E402
+from screen_keeper.gui.main_window import MainWindow  # noqa: E402
+from screen_keeper.gui.styles import set_style_state  # noqa: E402
+
+
+def time_window_construction(app: QApplication, config_file: str, runs: int) -> List[float]:
+    """
+    Time constructing and showing the main window.
+    
+    Args:
+        app: Running application
+        config_file: Settings file of the windows; must not auto-start
+        runs: Number of windows to construct
+    
+    Returns:
+        Seconds per window, until its first events were processed
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        window = MainWindow(Settings(config_file))
+        window.show()
+        app.processEvents()
+        times.append(time.perf_counter() - start)
+        
+        window.settings.unwatch()
+        window.hide()
+        window.deleteLater()
+        app.processEvents()
+    return times
+
+
+def time_status_changes(app: QApplication, change: Callable[[object, str], None],
+                        config_file: str, runs: int) -> List[float]:
+    """
+    Time switching the activity label between the active and inactive colors.
+    
+    Args:
+        app: Running application
+        change: Applies a state ("active" or "inactive") to the label
+        config_file: Settings file of the window
+        runs: Number of changes
+    
+    Returns:
+        Seconds per change
+    """
+    window = MainWindow(Settings(config_file))
+    window.show()
+    app.processEvents()
+    label = window.activity_label
+    
+    times = []
+    for i in range(runs):
+        state = "inactive" if i % 2 == 0 else "active"
+        start = time.perf_counter()
+        change(label, state)
+        label.ensurePolished()
+        times.append(time.perf_counter() - start)
+    
+    window.settings.unwatch()
+    window.hide()
+    window.deleteLater()
+    app.processEvents()
+    return times
+
+
+def set_inline_style(label, state: str) -> None:
+    """Change the color the way the window did before the theme had states."""
+    color = "#f44336" if state == "inactive" else "#4CAF50"
+    label.setStyleSheet(f"font-size: 12px; color: {color};")
+
+
+def report(name: str, times: List[float], unit: str = "ms") -> None:
+    """Print the median and minimum of timings."""
+    scale = 1e3 if unit == "ms" else 1e6
+    print(f"{name:<36} median {statistics.median(times) * scale:8.2f} {unit}"
+          f"   min {min(times) * scale:8.2f} {unit}")
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--runs", type=int, default=30, help="windows to construct (default: 30)")
+    args = parser.parse_args()
+    
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, "config.json")
+        settings = Settings(config_file)
+        settings.set("auto_start_keeping", False)
+        settings.flush()
+        
+        report("window construction", time_window_construction(app, config_file, args.runs))
+        changes = args.runs * 20
+        report("status change, state property", time_status_changes(app, set_style_state, config_file, changes), "us")
+        report("status change, inline stylesheet", time_status_changes(app, set_inline_style, config_file, changes), "us")
+
+
+if __name__ == "__main__":
+    main()
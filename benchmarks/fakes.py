@@ -0,0 +1,121 @@
+"""
+Fake input backend and inhibitor for the core benchmarks.
+
+They stand in for pynput and D-Bus, so the core hot paths can be timed
+without a display server or session bus, and without any cost of their own
+beyond recording what they were asked to do.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+from screen_keeper.core.input_backend import InputBackend, InputListener
+
+
+class FakeMouse:
+    """Mouse controller remembering every position it was moved to."""
+    
+    def __init__(self, position: Tuple[int, int] = (100, 100)):
+        self._position = position
+        self.moves: List[Tuple[int, int]] = []
+    
+    @property
+    def position(self) -> Tuple[int, int]:
+        return self._position
+    
+    @position.setter
+    def position(self, position: Tuple[int, int]) -> None:
+        self._position = position
+        self.moves.append(position)
+
+
+class FakeKeyboard:
+    """Keyboard controller counting key presses and releases."""
+    
+    def __init__(self):
+        self.presses = 0
+        self.releases = 0
+    
+    def press(self, key: Any) -> None:
+        self.presses += 1
+    
+    def release(self, key: Any) -> None:
+        self.releases += 1
+
+
+class FakeListener(InputListener):
+    """Listener handle of a FakeInputBackend."""
+    
+    def __init__(self, backend: "FakeInputBackend"):
+        self._backend = backend
+    
+    def stop(self) -> None:
+        self._backend.callbacks = None
+
+
+class FakeInputBackend(InputBackend):
+    """
+    Input backend delivering events only when told to.
+    
+    emit_move(), emit_click() and emit_press() call the listening callbacks
+    synchronously on the calling thread, as the pynput listener threads would.
+    """
+    
+    def __init__(self):
+        self.callbacks: Optional[tuple] = None
+        self.mouse = FakeMouse()
+        self.keyboard = FakeKeyboard()
+    
+    def listen(self, on_move, on_click, on_press) -> InputListener:
+        self.callbacks = (on_move, on_click, on_press)
+        return FakeListener(self)
+    
+    def mouse_controller(self) -> FakeMouse:
+        return self.mouse
+    
+    def keyboard_controller(self) -> FakeKeyboard:
+        return self.keyboard
+    
+    @property
+    def scroll_lock_key(self) -> str:
+        return "scroll_lock"
+    
+    def emit_move(self, x: int = 0, y: int = 0) -> None:
+        """Deliver a mouse movement."""
+        self.callbacks[0](x, y)
+    
+    def emit_click(self, x: int = 0, y: int = 0) -> None:
+        """Deliver a left button press."""
+        self.callbacks[1](x, y, "left", True)
+    
+    def emit_press(self, key: Any = "a") -> None:
+        """Deliver a key press."""
+        self.callbacks[2](key)
+
+
+class FakeInhibitor:
+    """Stand-in for DBusInhibitor, taking locks without a bus."""
+    
+    def __init__(self, sleep_lock: bool = True, idle_lock: bool = False):
+        """
+        Initialize inhibitor.
+        
+        Args:
+            sleep_lock: Whether acquire() gets the logind sleep lock
+            idle_lock: Whether acquire() gets the screensaver inhibit; when
+                it does, keep-alive strategies need no activity simulation
+        """
+        self._sleep_lock = sleep_lock
+        self._idle_lock = idle_lock
+        self.holds_sleep_lock = False
+        self.holds_idle_lock = False
+        self.acquisitions = 0
+    
+    def acquire(self, reason: str = "Screen Keeper", sleep: bool = True) -> bool:
+        self.acquisitions += 1
+        self.holds_sleep_lock = self._sleep_lock and sleep
+        self.holds_idle_lock = self._idle_lock
+        return self.holds_sleep_lock or self.holds_idle_lock
+    
+    def release(self) -> None:
+        self.holds_sleep_lock = False
+        self.holds_idle_lock = False
@@ -0,0 +1 @@
+pyinstaller --noconfirm screen-keeper-onedir.spec
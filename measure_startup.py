@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measures launch-to-tray time of Screen Keeper builds.
+
+Launches each command several times and reports how long it takes until the
+application has shown its tray icon and started its event loop, so the
+one-file and one-dir build profiles can be compared:
+
+    ./measure_startup.py dist/screen-keeper dist/screen-keeper-onedir/screen-keeper
+
+The app signals readiness by writing the file named by SCREEN_KEEPER_READY_FILE.
+"""
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+
+READY_FILE_ENV = "SCREEN_KEEPER_READY_FILE"
+
+
+def measure_launch(command: List[str], timeout: float) -> Optional[float]:
+    """
+    Launch a command once and wait for it to report readiness.
+    
+    Args:
+        command: Command line to run
+        timeout: Seconds to wait before giving up
+    
+    Returns:
+        Seconds from launch until the ready file appeared, None on timeout
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        ready_file = os.path.join(tmp, "ready")
+        env = dict(os.environ, **{READY_FILE_ENV: ready_file})
+        
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        elapsed = None
+        try:
+            while time.perf_counter() - start < timeout:
+                if os.path.exists(ready_file):
+                    elapsed = time.perf_counter() - start
+                    break
+                if process.poll() is not None:
+                    break
+                time.sleep(0.005)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=5.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure launch-to-tray time of Screen Keeper builds.")
+    parser.add_argument("commands", nargs="+",
+                        help="commands to compare, e.g. dist/screen-keeper or 'python run.py'")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="launches per command (default: 5)")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="seconds to wait for one launch (default: 30)")
+    args = parser.parse_args()
+    
+    failed = False
+    for command in args.commands:
+        times = []
+        for _ in range(args.runs):
+            elapsed = measure_launch(shlex.split(command), args.timeout)
+            if elapsed is None:
+                failed = True
+                print(f"{command}: did not become ready within {args.timeout}s")
+                break
+            times.append(elapsed)
+        
+        if times:
+            print(f"{command}: median {statistics.median(times) * 1000:.0f} ms, "
+                  f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms "
+                  f"({len(times)} runs)")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
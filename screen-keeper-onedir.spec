@@ -0,0 +1,79 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# One-dir build profile: nothing is unpacked at launch and nothing is
+# UPX-compressed, so startup only pays for loading the libraries it uses.
+# Build with ./linux_build_onedir.sh; the app is dist/screen-keeper-onedir/screen-keeper.
+
+# Qt modules the application never imports
+QT_EXCLUDES = [
+    'PyQt5.QtBluetooth', 'PyQt5.QtDBus', 'PyQt5.QtDesigner', 'PyQt5.QtHelp',
+    'PyQt5.QtLocation', 'PyQt5.QtMultimedia', 'PyQt5.QtMultimediaWidgets',
+    'PyQt5.QtNetwork', 'PyQt5.QtNfc', 'PyQt5.QtOpenGL', 'PyQt5.QtPositioning',
+    'PyQt5.QtPrintSupport', 'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtQuick3D',
+    'PyQt5.QtQuickWidgets', 'PyQt5.QtRemoteObjects', 'PyQt5.QtSensors',
+    'PyQt5.QtSerialPort', 'PyQt5.QtSql', 'PyQt5.QtSvg', 'PyQt5.QtTest',
+    'PyQt5.QtTextToSpeech', 'PyQt5.QtWebChannel', 'PyQt5.QtWebSockets',
+    'PyQt5.QtXml', 'PyQt5.QtXmlPatterns',
+]
+
+# Qt plugin directories that are kept, everything else under plugins/ is dropped
+QT_PLUGINS_KEPT = ('platforms', 'platformthemes', 'styles', 'xcbglintegrations')
+
+
+def keep_qt_file(dest):
+    """Check if a collected file is needed, dropping unused Qt plugins and translations."""
+    parts = dest.replace('\\', '/').split('/')
+    if 'Qt5' not in parts and 'Qt' not in parts:
+        return True
+    if 'translations' in parts:
+        return False
+    if 'plugins' in parts:
+        index = parts.index('plugins')
+        return index + 1 < len(parts) and parts[index + 1] in QT_PLUGINS_KEPT
+    return True
+
+
+a = Analysis(
+    ['run.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('resources', 'resources')],
+    hiddenimports=['pynput.keyboard._xorg', 'pynput.mouse._xorg'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=QT_EXCLUDES + ['tkinter', 'unittest', 'pydoc'],
+    noarchive=False,
+    optimize=0,
+)
+a.binaries = [entry for entry in a.binaries if keep_qt_file(entry[0])]
+a.datas = [entry for entry in a.datas if keep_qt_file(entry[0])]
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='screen-keeper',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=['resources/icons/app.ico'],
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='screen-keeper-onedir',
+)
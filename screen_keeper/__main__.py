@@ -0,0 +1,8 @@
+"""
+Allows running Screen Keeper with `python -m screen_keeper`.
+"""
+
+from screen_keeper.main import main
+
+if __name__ == "__main__":
+    main()
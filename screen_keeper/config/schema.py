@@ -0,0 +1,152 @@
+"""
+Settings schema module.
+Types, defaults, allowed values and version migrations of the settings file.
+"""
+
+import logging
+import math
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SettingField(NamedTuple):
+    """Type, default and allowed values of one setting."""
+    
+    type: type
+    default: Any
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    choices: Optional[Tuple[str, ...]] = None
+    # Decimal places kept of a float setting; None keeps them all
+    decimals: Optional[int] = None
+    
+    def validate(self, key: str, value: Any) -> Any:
+        """
+        Check a value against the field.
+        
+        Args:
+            key: Setting name, used in the error message
+            value: Value to check
+        
+        Returns:
+            The value, with ints converted to float for float settings and
+            rounded to the decimals of the field
+        
+        Raises:
+            ValueError: If the value has the wrong type or is out of range
+        """
+        # bool is an int subclass, but True is not a valid interval
+        if isinstance(value, bool) != (self.type is bool):
+            raise ValueError(f"{key} must be {self.type.__name__}, got {value!r}")
+        if self.type is float and isinstance(value, int):
+            value = float(value)
+        if not isinstance(value, self.type):
+            raise ValueError(f"{key} must be {self.type.__name__}, got {value!r}")
+        if self.type is float and not math.isfinite(value):
+            raise ValueError(f"{key} must be a finite number, got {value!r}")
+        if self.decimals is not None:
+            value = round(value, self.decimals)
+        
+        if self.minimum is not None and value < self.minimum:
+            raise ValueError(f"{key} must be at least {self.minimum}, got {value!r}")
+        if self.maximum is not None and value > self.maximum:
+            raise ValueError(f"{key} must be at most {self.maximum}, got {value!r}")
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{key} must be one of {', '.join(self.choices)}, got {value!r}")
+        return value
+
+
+# Version written to the file; bump it and add a migration when the layout changes
+SCHEMA_VERSION = 1
+VERSION_KEY = "schema_version"
+
+SCHEMA: Dict[str, SettingField] = {
+    # The main window spin boxes take their ranges and decimals from these two
+    "inactivity_timeout": SettingField(float, 60.0, minimum=1.0, maximum=86400.0,
+                                       decimals=1),  # seconds
+    "activity_coalesce_window": SettingField(float, 0.5, minimum=0.0, maximum=60.0),  # seconds
+    "mouse_movement_interval": SettingField(float, 30.0, minimum=1.0, maximum=3600.0,
+                                            decimals=1),  # seconds
+    # Simulate just before the system idle timeout
+    "adaptive_interval": SettingField(bool, False),
+    "system_idle_timeout": SettingField(float, 0.0, minimum=0.0),  # seconds, 0 = detect from the system
+    "idle_safety_margin": SettingField(float, 10.0, minimum=0.0),  # seconds
+    "movement_distance": SettingField(int, 1, minimum=1, maximum=100),  # pixels
+    "prevent_sleep": SettingField(bool, True),
+    "use_activity_detection": SettingField(bool, True),
+    # hooks, idle (system idle counter), or auto
+    "activity_backend": SettingField(str, "auto", choices=("auto", "hooks", "idle")),
+    # Keep a history of active and inactive periods in ~/.screen-keeper; opt-in
+    "record_activity_history": SettingField(bool, False),
+    "auto_start_keeping": SettingField(bool, True),
+    "simulation_mode": SettingField(str, "auto", choices=("auto", "mouse", "keyboard", "both")),
+}
+
+
+class SettingsValues:
+    """
+    Validated setting values as plain attributes.
+    
+    Holds exactly the settings of SCHEMA, always with valid values.
+    """
+    
+    __slots__ = tuple(SCHEMA)
+    
+    def __init__(self):
+        for key, field in SCHEMA.items():
+            setattr(self, key, field.default)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the values as a dictionary."""
+        return {key: getattr(self, key) for key in SCHEMA}
+
+
+def _migrate_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Unversioned files: convert numbers stored as strings.
+    
+    Hand-edited and generated files sometimes quote numbers ("30"), which
+    were previously passed through unchecked.
+    """
+    for key, field in SCHEMA.items():
+        value = data.get(key)
+        if field.type in (int, float) and isinstance(value, str):
+            try:
+                data[key] = field.type(value.strip())
+            except ValueError:
+                pass  # Left for validation to reject
+    return data
+
+
+# Version -> function upgrading a file of that version to the next one
+MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    0: _migrate_v0,
+}
+
+
+def migrate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upgrade settings file contents to SCHEMA_VERSION.
+    
+    Args:
+        data: Contents of the file; files without a version are version 0
+    
+    Returns:
+        Upgraded contents, with the version key removed
+    
+    Raises:
+        ValueError: If the version is not a number
+    """
+    data = dict(data)
+    version = data.pop(VERSION_KEY, 0)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError(f"invalid settings schema version {version!r}")
+    if version > SCHEMA_VERSION:
+        # Written by a newer release; known settings are still validated
+        logger.warning("Settings schema version %s is newer than %s", version, SCHEMA_VERSION)
+    
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
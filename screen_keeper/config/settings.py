@@ -3,30 +3,42 @@ Configuration management module.
 """
 
 import json
+import logging
 import os
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+
+from screen_keeper.config.schema import SCHEMA, SCHEMA_VERSION, VERSION_KEY, SettingsValues, migrate
+from screen_keeper.config.watcher import watch_file
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Marks a key without a value, so that None can be stored
+_MISSING = object()
 
 
 class Settings:
-    """Manages application settings."""
+    """
+    Manages application settings.
     
-    DEFAULT_SETTINGS = {
-        "inactivity_timeout": 60.0,  # seconds
-        "mouse_movement_interval": 30.0,  # seconds
-        "movement_distance": 1,  # pixels
-        "prevent_sleep": True,
-        "use_activity_detection": True,
-        "auto_start_keeping": True,
-        "simulation_mode": "both",  # mouse, keyboard, or both
-    }
+    Settings of the schema are validated when loaded or set and are read as
+    plain attributes of `values`, e.g. `settings.values.inactivity_timeout`.
+    Unknown keys found in the file are kept and written back unchanged.
+    """
     
-    def __init__(self, config_file: Optional[str] = None):
+    DEFAULT_SETTINGS = {key: field.default for key, field in SCHEMA.items()}
+    
+    def __init__(self, config_file: Optional[str] = None, save_delay: float = 1.0,
+                 scheduler: Optional[Scheduler] = None):
         """
         Initialize settings.
         
         Args:
             config_file: Path to configuration file. If None, uses default location.
+            save_delay: Seconds save() waits for further changes before writing
+            scheduler: Scheduler running the delayed writes (default: shared one)
         """
         if config_file is None:
             # Use user's home directory for config
@@ -35,47 +47,293 @@ class Settings:
             config_file = str(config_dir / "config.json")
         
         self.config_file = config_file
-        self._settings = self.DEFAULT_SETTINGS.copy()
+        self.save_delay = save_delay
+        self._scheduler = scheduler
+        self.values = SettingsValues()
+        # Keys not in the schema, preserved as found in the file
+        self._extra: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Keys changed here and not written yet; they win over the file on reload
+        self._dirty_keys = set()
+        self._save_job: Optional[Job] = None
+        self._write_count = 0
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._watcher = None
         self.load()
     
     def load(self) -> None:
-        """Load settings from file."""
+        """
+        Load settings from file.
+        
+        Invalid values are reported and replaced by their defaults, so
+        nothing downstream ever sees them.
+        """
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, "r") as f:
-                    loaded_settings = json.load(f)
-                    # Merge with defaults to ensure all keys exist
-                    self._settings.update(loaded_settings)
+                loaded_settings = self._read_file()
             except Exception as e:
-                print(f"Error loading settings: {e}")
-                # Keep defaults
+                logger.error("Error loading settings: %s", e)
+                # Keep defaults, and keep the broken file from being overwritten
+                self._set_aside(self.config_file)
+                return
+            
+            with self._lock:
+                self._merge(loaded_settings)
     
-    def save(self) -> bool:
-        """Save settings to file."""
+    def _read_file(self) -> Dict[str, Any]:
+        """Read the file and migrate it to the current schema version."""
+        with open(self.config_file, "r") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("settings file does not contain an object")
+        return migrate(data)
+    
+    def _merge(self, data: Dict[str, Any], skip=frozenset()) -> Dict[str, Any]:
+        """
+        Merge file contents into the current values. Called with the lock held.
+        
+        Args:
+            data: Migrated file contents
+            skip: Keys to leave unchanged
+        
+        Returns:
+            Changed schema settings
+        """
+        changes = {}
+        for key, value in data.items():
+            if key in skip:
+                continue
+            
+            field = SCHEMA.get(key)
+            if field is None:
+                self._extra[key] = value
+                continue
+            
+            try:
+                value = field.validate(key, value)
+            except ValueError as e:
+                logger.warning("Ignoring invalid setting: %s", e)
+                continue
+            if getattr(self.values, key) != value:
+                setattr(self.values, key, value)
+                changes[key] = value
+        return changes
+    
+    def reload(self) -> Dict[str, Any]:
+        """
+        Read the file again and notify subscribers of the values that changed.
+        
+        Values changed through set() that are not written yet are kept. An
+        unreadable file is ignored, it may be in the middle of being written.
+        
+        Returns:
+            Changed settings
+        """
         try:
-            config_path = Path(self.config_file)
-            config_path.parent.mkdir(parents=True, exist_ok=True)
+            loaded_settings = self._read_file()
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error("Error reloading settings: %s", e)
+            return {}
+        
+        with self._lock:
+            changes = self._merge(loaded_settings, skip=self._dirty_keys)
+        
+        if changes:
+            logger.info("Settings reloaded: %s", ", ".join(sorted(changes)))
+            self._notify(changes)
+        return changes
+    
+    def watch(self) -> None:
+        """Reload the settings whenever the file changes."""
+        if self._watcher is None:
+            self._watcher = watch_file(self.config_file, self.reload, self._scheduler)
+    
+    def unwatch(self) -> None:
+        """Stop watching the file."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Call a function with the changed settings after every change.
+        
+        Args:
+            callback: Receives a dict of the changed keys and their new
+                values; runs on the thread that made the change, which is
+                a background thread for changes made to the file
+        """
+        self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Stop calling a function subscribed with subscribe()."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+    
+    def _notify(self, changes: Dict[str, Any]) -> None:
+        """Pass changed settings to the subscribers."""
+        for callback in list(self._subscribers):
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error("Error applying settings: %s", e)
+    
+    @staticmethod
+    def _set_aside(path: str) -> None:
+        """Rename an unreadable settings file to <name>.corrupt."""
+        try:
+            os.replace(path, path + ".corrupt")
+            logger.warning("Unreadable settings moved to %s.corrupt", path)
+        except OSError as e:
+            logger.error("Error moving unreadable settings: %s", e)
+    
+    def save(self) -> bool:
+        """
+        Save settings to file in the background.
+        
+        Does nothing if no value changed since the last write. Otherwise the
+        write happens on the scheduler thread once no further save() came in
+        for `save_delay` seconds. Use flush() to write immediately.
+        
+        Returns:
+            True (errors of the delayed write are printed)
+        """
+        with self._lock:
+            if not self._dirty_keys:
+                return True
+            
+            scheduler = self._scheduler or get_scheduler()
+            if self._save_job is None:
+                self._save_job = scheduler.schedule(self.save_delay, self._write_behind)
+            else:
+                scheduler.reschedule(self._save_job, self.save_delay)
+        return True
+    
+    def _write_behind(self) -> None:
+        """Write pending changes; runs on the scheduler thread."""
+        with self._lock:
+            self._save_job = None
+        self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Write pending changes to file now.
+        
+        Returns:
+            True if the file is up to date, False if writing failed
+        """
+        with self._lock:
+            if self._save_job is not None:
+                (self._scheduler or get_scheduler()).cancel(self._save_job)
+                self._save_job = None
+            if not self._dirty_keys:
+                return True
             
-            with open(self.config_file, "w") as f:
-                json.dump(self._settings, f, indent=2)
+            try:
+                data = {VERSION_KEY: SCHEMA_VERSION, **self._extra, **self.values.to_dict()}
+                self._write_atomic(json.dumps(data, indent=2))
+            except Exception as e:
+                logger.error("Error saving settings: %s", e)
+                return False
+            self._dirty_keys.clear()
+            self._write_count += 1
             return True
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-            return False
+    
+    def _write_atomic(self, data: str) -> None:
+        """
+        Replace the settings file with new contents.
+        
+        The data is written to a temporary file and synced before being
+        renamed over the old file, so a crash leaves either the old or the
+        new file, never a truncated one.
+        """
+        config_path = Path(self.config_file)
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.config_file + ".tmp"
+        
+        with open(tmp_file, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+        
+        # Make the rename itself durable where directories can be synced
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(config_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    @property
+    def is_dirty(self) -> bool:
+        """Check if there are changes that have not been written yet."""
+        return bool(self._dirty_keys)
+    
+    @property
+    def write_count(self) -> int:
+        """Number of times the settings file was written."""
+        return self._write_count
     
     def get(self, key: str, default: Any = None) -> Any:
-        """Get a setting value."""
-        return self._settings.get(key, default)
+        """
+        Get a setting value.
+        
+        Prefer reading `values` attributes for settings of the schema.
+        """
+        if key in SCHEMA:
+            return getattr(self.values, key)
+        return self._extra.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
         """Set a setting value."""
-        self._settings[key] = value
+        self.update({key: value})
+    
+    def update(self, values: Dict[str, Any]) -> None:
+        """
+        Set several setting values, notifying subscribers once.
+        
+        Raises:
+            ValueError: If a value is invalid for its setting; nothing is
+                changed then
+        """
+        validated = {
+            key: SCHEMA[key].validate(key, value) if key in SCHEMA else value
+            for key, value in values.items()
+        }
+        
+        changes = {}
+        with self._lock:
+            for key, value in validated.items():
+                if key in SCHEMA:
+                    if getattr(self.values, key) != value:
+                        setattr(self.values, key, value)
+                        changes[key] = value
+                elif self._extra.get(key, _MISSING) != value:
+                    self._extra[key] = value
+                    self._dirty_keys.add(key)
+            self._dirty_keys.update(changes)
+        
+        if changes:
+            self._notify(changes)
     
     def get_all(self) -> Dict[str, Any]:
         """Get all settings as a dictionary."""
-        return self._settings.copy()
+        return {**self._extra, **self.values.to_dict()}
     
     def reset_to_defaults(self) -> None:
         """Reset all settings to defaults."""
-        self._settings = self.DEFAULT_SETTINGS.copy()
+        with self._lock:
+            changes = {
+                key: value for key, value in self.DEFAULT_SETTINGS.items()
+                if getattr(self.values, key) != value
+            }
+            self._dirty_keys.update(changes, self._extra)
+            self.values = SettingsValues()
+            self._extra = {}
+        
+        if changes:
+            self._notify(changes)
 
@@ -0,0 +1,209 @@
+"""
+File watching module.
+Notices changes to the settings file, with inotify where available and a
+cheap stat() poll elsewhere.
+"""
+
+import ctypes
+import logging
+import os
+import select
+import struct
+import threading
+from typing import Callable, Optional
+
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class InotifyWatcher:
+    """
+    Watches a file with Linux inotify.
+    
+    The parent directory is watched rather than the file itself, so files
+    that are replaced by a rename (atomic writes, config management tools)
+    keep being noticed. The watcher thread blocks until an event or stop()
+    arrives and never wakes up otherwise.
+    """
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    # struct inotify_event without the trailing name
+    _EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, path: str, callback: Callable[[], None]):
+        """
+        Initialize watcher.
+        
+        Args:
+            path: File to watch
+            callback: Called on the watcher thread after the file changed
+        """
+        self.path = os.path.abspath(path)
+        self._callback = callback
+        self._inotify_fd: Optional[int] = None
+        self._stop_pipe: Optional[tuple] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @staticmethod
+    def is_available() -> bool:
+        """Check if inotify can be used."""
+        try:
+            return hasattr(ctypes.CDLL(None), "inotify_init1")
+        except (OSError, TypeError):  # no dlopen(NULL) on Windows
+            return False
+    
+    def start(self) -> bool:
+        """Start watching. Returns False if inotify cannot be set up."""
+        if self._thread is not None:
+            return True
+        
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            
+            directory = os.path.dirname(self.path).encode()
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            if libc.inotify_add_watch(fd, directory, mask) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, "inotify_add_watch failed")
+        except (OSError, AttributeError) as e:
+            logger.info("Cannot watch settings with inotify: %s", e)
+            return False
+        
+        self._inotify_fd = fd
+        self._stop_pipe = os.pipe()
+        self._thread = threading.Thread(target=self._watch_loop, name="screen-keeper-watcher",
+                                        daemon=True)
+        self._thread.start()
+        return True
+    
+    def _watch_loop(self) -> None:
+        """Wait for events on the directory and report changes to the file."""
+        name = os.path.basename(self.path).encode()
+        poller = select.poll()
+        poller.register(self._inotify_fd, select.POLLIN)
+        poller.register(self._stop_pipe[0], select.POLLIN)
+        
+        while True:
+            ready = [fd for fd, _ in poller.poll()]
+            if self._stop_pipe[0] in ready:
+                return
+            
+            try:
+                data = os.read(self._inotify_fd, 4096)
+            except BlockingIOError:
+                continue
+            
+            changed = False
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(data):
+                _, _, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b"\0") == name:
+                    changed = True
+                offset += length
+            
+            if changed:
+                try:
+                    self._callback()
+                except Exception as e:
+                    logger.error("Error handling settings change: %s", e)
+    
+    def stop(self) -> None:
+        """Stop watching."""
+        if self._thread is None:
+            return
+        
+        os.write(self._stop_pipe[1], b"\0")
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        for fd in (self._inotify_fd, *self._stop_pipe):
+            os.close(fd)
+        self._inotify_fd = None
+        self._stop_pipe = None
+
+
+class PollingWatcher:
+    """Watches a file by comparing its stat() result every `poll_interval` seconds."""
+    
+    def __init__(self, path: str, callback: Callable[[], None], poll_interval: float = 2.0,
+                 scheduler: Optional[Scheduler] = None):
+        """
+        Initialize watcher.
+        
+        Args:
+            path: File to watch
+            callback: Called on the scheduler thread after the file changed
+            poll_interval: Seconds between two stat() calls
+            scheduler: Scheduler running the polls (default: shared one)
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._callback = callback
+        self._scheduler = scheduler or get_scheduler()
+        self._job: Optional[Job] = None
+        self._signature = None
+    
+    def _stat_signature(self) -> Optional[tuple]:
+        """Get what identifies a version of the file, None if it does not exist."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def start(self) -> bool:
+        """Start watching."""
+        if self._job is None:
+            self._signature = self._stat_signature()
+            self._job = self._scheduler.schedule(self.poll_interval, self._poll)
+        return True
+    
+    def _poll(self) -> Optional[float]:
+        """Check the file once; runs on the scheduler thread."""
+        signature = self._stat_signature()
+        if signature != self._signature:
+            self._signature = signature
+            try:
+                self._callback()
+            except Exception as e:
+                logger.error("Error handling settings change: %s", e)
+        return self.poll_interval
+    
+    def stop(self) -> None:
+        """Stop watching."""
+        self._scheduler.cancel(self._job)
+        self._job = None
+
+
+def watch_file(path: str, callback: Callable[[], None],
+               scheduler: Optional[Scheduler] = None):
+    """
+    Start watching a file for changes.
+    
+    Args:
+        path: File to watch
+        callback: Called from a background thread after the file changed
+        scheduler: Scheduler for the polling fallback (default: shared one)
+    
+    Returns:
+        Started InotifyWatcher, or PollingWatcher where inotify is not
+        available; both have a stop() method
+    """
+    if InotifyWatcher.is_available():
+        watcher = InotifyWatcher(path, callback)
+        if watcher.start():
+            return watcher
+    
+    watcher = PollingWatcher(path, callback, scheduler=scheduler)
+    watcher.start()
+    return watcher
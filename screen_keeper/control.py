@@ -0,0 +1,251 @@
+"""
+Control server module.
+Answers local control clients, such as screen-keeper-ctl and later launches,
+on the socket of the single instance lock with an asyncio event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from screen_keeper.config.schema import SCHEMA
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.events import COMMAND_RECEIVED, STATE_CHANGED
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.instance import InstanceGuard
+
+logger = logging.getLogger(__name__)
+
+# Commands run by the COMMAND_RECEIVED handlers of the application
+APP_COMMANDS = ("show", "start", "stop")
+# All commands a client can send
+COMMANDS = ("status", "get_settings", "set_settings") + APP_COMMANDS
+
+# Longest request line read, in bytes
+MAX_LINE = 64 * 1024
+
+
+class ControlServer:
+    """
+    Line-delimited JSON control server.
+    
+    Every request is one JSON object on one line:
+    {"id": any, "command": name, "settings": {...}, "token": "..."}, where
+    only "command" is required, "settings" is read by set_settings and
+    "token" is required on Windows (see InstanceGuard.token). Each is
+    answered, in order, by {"id": ..., "ok": true, "result": ...} or
+    {"id": ..., "ok": false, "error": "..."}.
+    
+    All clients are served by one asyncio event loop on one thread. status
+    is answered from a snapshot refreshed on every STATE_CHANGED event, and
+    get_settings from the settings in memory, so neither waits for the core.
+    Commands that change something are posted as COMMAND_RECEIVED events and
+    run by their handlers on the event bus consumer (the GUI thread, or the
+    scheduler thread when headless); the connection waits for the result
+    without holding up the loop.
+    """
+    
+    def __init__(self, instance: InstanceGuard, keeper: KeepAliveController, settings: Settings,
+                 timeout: float = 30.0):
+        """
+        Initialize server.
+        
+        Args:
+            instance: Held single instance lock, whose socket is served
+            keeper: Controller whose status is reported; commands are posted
+                on its event bus
+            settings: Settings read and changed by clients
+            timeout: Seconds to wait for a command to run
+        """
+        self.instance = instance
+        self.keeper = keeper
+        self.settings = settings
+        self.timeout = timeout
+        self._status = self._snapshot()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+    
+    def start(self) -> bool:
+        """
+        Start serving on a background thread.
+        
+        Returns:
+            True if serving, False if the instance lock holds no socket
+        """
+        sock = self.instance.listening_socket
+        if sock is None or self._thread is not None:
+            return self._thread is not None
+        
+        bus = self.keeper.event_bus
+        bus.subscribe(STATE_CHANGED, self._refresh_status)
+        bus.subscribe(COMMAND_RECEIVED, self._run_command)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(sock,),
+                                        name="screen-keeper-control", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return True
+    
+    def stop(self) -> None:
+        """Stop serving and close all connections."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        bus = self.keeper.event_bus
+        bus.unsubscribe(STATE_CHANGED, self._refresh_status)
+        bus.unsubscribe(COMMAND_RECEIVED, self._run_command)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        thread.join()
+    
+    def _run(self, sock: socket.socket) -> None:
+        """Run the event loop until stopped."""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            # Many clients may connect at once, e.g. from a provisioning run
+            options = {"sock": sock, "limit": MAX_LINE, "backlog": socket.SOMAXCONN}
+            if sock.family == socket.AF_UNIX:
+                start = asyncio.start_unix_server(self._serve, **options)
+            else:
+                start = asyncio.start_server(self._serve, **options)
+            server = loop.run_until_complete(start)
+        except OSError as e:
+            logger.error("Control server not available: %s", e)
+            self._started.set()
+            loop.close()
+            return
+        
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._shutdown(server))
+            loop.close()
+    
+    @staticmethod
+    async def _shutdown(server: asyncio.AbstractServer) -> None:
+        """Stop accepting, then cancel the connections and wait for them to finish."""
+        server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.wait_closed()
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Take a new status snapshot from the controller."""
+        return {**self.keeper.status(), "pid": os.getpid(), "updated": time.time()}
+    
+    def _refresh_status(self) -> None:
+        """Update the cached status; runs on the event bus consumer."""
+        # Replaced, never changed in place, so the loop reads it without a lock
+        self._status = self._snapshot()
+    
+    def _run_command(self, command: str, args: Dict[str, Any],
+                     future: concurrent.futures.Future) -> None:
+        """Change settings for a client; the application handles the other commands."""
+        if command != "set_settings":
+            return
+        # Settings.update() keeps unknown keys; a misspelled one must not pass silently
+        unknown = sorted(key for key in args if key not in SCHEMA)
+        if unknown:
+            future.set_result(f"unknown setting {', '.join(unknown)}")
+            return
+        try:
+            self.settings.update(args)
+        except ValueError as e:
+            future.set_result(str(e))
+            return
+        self.settings.save()
+        future.set_result(None)
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection until it is closed."""
+        if not self.instance.is_same_user(writer.get_extra_info("socket")):
+            writer.close()
+            return
+        
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._reply(writer, {"id": None, "ok": False, "error": "request too long"})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await self._reply(writer, await self._answer(line))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server stopping; ends the task normally, since asyncio logs an
+            # error for a cancelled connection handler on Python 3.11
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, reply: Dict[str, Any]) -> None:
+        """Send one reply line."""
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+    
+    async def _answer(self, line: bytes) -> Dict[str, Any]:
+        """Answer one request line."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"id": None, "ok": False, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "request must be a JSON object"}
+        
+        reply = {"id": request.get("id")}
+        command = request.get("command")
+        get_metrics().counter("control.requests").inc()
+        if self.instance.token and request.get("token") != self.instance.token:
+            error = "invalid token"
+        elif command not in COMMANDS:
+            error = f"unknown command {command!r}"
+        elif command == "status":
+            return {**reply, "ok": True, "result": self._status}
+        elif command == "get_settings":
+            return {**reply, "ok": True, "result": self.settings.get_all()}
+        else:
+            error = await self._post(command, request.get("settings"))
+        
+        if error is not None:
+            return {**reply, "ok": False, "error": error}
+        return {**reply, "ok": True, "result": None}
+    
+    async def _post(self, command: str, args: Any) -> Optional[str]:
+        """
+        Have a command run by its COMMAND_RECEIVED handler and wait for it.
+        
+        Returns:
+            None, or why the command failed
+        """
+        if command == "set_settings" and not (isinstance(args, dict) and args):
+            return "set_settings needs a non-empty \"settings\" object"
+        
+        future = concurrent.futures.Future()
+        self.keeper.event_bus.post(COMMAND_RECEIVED, command, args or {}, future)
+        try:
+            # Shielded so a timeout does not cancel a command that still runs
+            error = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                           self.timeout)
+        except asyncio.TimeoutError:
+            return f"{command} did not finish within {self.timeout:g}s"
+        if command in ("start", "stop"):
+            # STATE_CHANGED may be handled after the reply; a status request
+            # sent right after it must already see the change
+            self._status = self._snapshot()
+        return error
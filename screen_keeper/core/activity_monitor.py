@@ -3,28 +3,60 @@ Activity monitoring module.
 Detects mouse and keyboard inactivity.
 """
 
-import time
+import logging
 import threading
-from typing import Callable, Optional
-from pynput import mouse, keyboard
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from screen_keeper.core.clock import Clock
+from screen_keeper.core.history import ActivityHistory
+from screen_keeper.core.input_backend import InputBackend, InputListener, PynputBackend
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from pynput import mouse, keyboard
 
 
 class ActivityMonitor:
     """Monitors mouse and keyboard activity."""
     
-    def __init__(self, inactivity_timeout: float = 60.0):
+    def __init__(self, inactivity_timeout: float = 60.0, coalesce_window: float = 0.5,
+                 clock: Optional[Clock] = None, scheduler: Optional[Scheduler] = None,
+                 input_backend: Optional[InputBackend] = None,
+                 history: Optional[ActivityHistory] = None):
         """
         Initialize activity monitor.
         
         Args:
             inactivity_timeout: Time in seconds before considering user inactive
+            coalesce_window: Minimum time in seconds between two runs of the
+                activity handling path; events in between are only stamped
+            clock: Time source (default: the scheduler clock)
+            scheduler: Scheduler running the deadline checks (default: shared one)
+            input_backend: Source of input events (default: pynput)
+            history: History to record transitions and active minutes in
         """
         self.inactivity_timeout = inactivity_timeout
-        self.last_activity_time = time.time()
+        self._input_backend = input_backend or PynputBackend()
+        self._history = history
+        self._scheduler = scheduler or get_scheduler()
+        self._clock = clock or self._scheduler.clock
+        self._now_ns = self._clock.now_ns
+        # Fast path state, written from the listener threads without locking
+        self._last_event_ns = self._now_ns()
+        self._next_update_ns = 0
+        self._coalesce_window_ns = int(coalesce_window * 1e9)
+        self._received_events = 0
+        self._coalesced_events = 0
         self._is_monitoring = False
-        self._mouse_listener: Optional[mouse.Listener] = None
-        self._keyboard_listener: Optional[keyboard.Listener] = None
-        self._monitor_thread: Optional[threading.Thread] = None
+        self._listener: Optional[InputListener] = None
+        self._lock = threading.Lock()
+        self._job: Optional[Job] = None
+        self._suspended_mark = 0
+        self._expected_ns = 0
         self._on_inactive_callback: Optional[Callable[[], None]] = None
         self._on_active_callback: Optional[Callable[[], None]] = None
         self._is_inactive = False
@@ -39,43 +71,119 @@ class ActivityMonitor:
     
     def _on_mouse_move(self, x: int, y: int) -> None:
         """Handle mouse movement."""
-        self._update_activity()
+        self._stamp_activity()
     
-    def _on_mouse_click(self, x: int, y: int, button: mouse.Button, pressed: bool) -> None:
+    def _on_mouse_click(self, x: int, y: int, button: "mouse.Button", pressed: bool) -> None:
         """Handle mouse click."""
-        self._update_activity()
+        self._stamp_activity()
     
-    def _on_key_press(self, key: keyboard.Key) -> None:
+    def _on_key_press(self, key: "keyboard.Key") -> None:
         """Handle key press."""
+        self._stamp_activity()
+    
+    def _stamp_activity(self) -> None:
+        """
+        Record an input event.
+        
+        Only stores a monotonic timestamp; the full activity update runs at
+        most once per coalesce window, and always while inactive so that a
+        window longer than the timeout cannot delay the active transition.
+        No lock is taken: a race between the mouse and keyboard listeners can
+        at worst lose one count.
+        """
+        now = self._now_ns()
+        self._last_event_ns = now
+        self._received_events += 1
+        if now < self._next_update_ns and not self._is_inactive:
+            self._coalesced_events += 1
+            return
+        
+        self._next_update_ns = now + self._coalesce_window_ns
+        if self._history is not None:
+            self._history.mark_active()
         self._update_activity()
     
     def _update_activity(self) -> None:
-        """Update last activity time."""
-        was_inactive = self._is_inactive
-        self.last_activity_time = time.time()
+        """
+        Handle user activity.
+        
+        While the user is active this only pushes the deadline forward; the
+        deadline job picks it up when it runs. When leaving the inactive
+        state the deadline job, which is not scheduled while inactive, is
+        armed again.
+        """
+        if not self._is_inactive:
+            return
         
-        if was_inactive:
+        with self._lock:
+            if not self._is_inactive or not self._is_monitoring:
+                return
             self._is_inactive = False
-            if self._on_active_callback:
-                self._on_active_callback()
+            self._record_transition(True, self._last_event_ns)
+            self._schedule_deadline()
+        
+        if self._on_active_callback:
+            self._on_active_callback()
+    
+    def _schedule_deadline(self) -> None:
+        """Schedule the deadline job. Called with the lock held."""
+        self._scheduler.cancel(self._job)
+        self._job = self._scheduler.schedule(self._arm(), self._check_deadline)
+    
+    def _arm(self) -> float:
+        """Get the delay until the inactivity deadline and remember when it is due."""
+        clock = self._clock
+        deadline_ns = self._last_event_ns + int(self.inactivity_timeout * 1e9)
+        self._suspended_mark = clock.suspended_ns()
+        self._expected_ns = deadline_ns
+        return max(deadline_ns - clock.now_ns(), 0) / 1e9
     
-    def _monitor_loop(self) -> None:
-        """Monitor inactivity in a separate thread."""
-        while self._is_monitoring:
-            time.sleep(1.0)  # Check every second
+    def _check_deadline(self) -> Optional[float]:
+        """
+        Check the inactivity deadline; runs on the scheduler thread.
+        
+        If the system was suspended since the job was armed, the deadline
+        restarts from the resume time, so a resume is not reported as an
+        inactive period.
+        
+        Returns:
+            Delay until the moved deadline, or None once the user is inactive
+        """
+        clock = self._clock
+        with self._lock:
+            if self._is_inactive or not self._is_monitoring:
+                return None
+            
+            if clock.suspend_gap_ns(self._suspended_mark, self._expected_ns):
+                self._last_event_ns = clock.now_ns()
             
-            time_since_activity = time.time() - self.last_activity_time
+            timeout_ns = int(self.inactivity_timeout * 1e9)
+            if self._last_event_ns + timeout_ns > clock.now_ns():
+                return self._arm()
             
-            if time_since_activity >= self.inactivity_timeout:
-                if not self._is_inactive:
-                    self._is_inactive = True
-                    if self._on_inactive_callback:
-                        self._on_inactive_callback()
-            else:
-                if self._is_inactive:
-                    self._is_inactive = False
-                    if self._on_active_callback:
-                        self._on_active_callback()
+            self._is_inactive = True
+            self._record_transition(False, self._last_event_ns)
+        
+        # Run the callback outside the lock so input events are not blocked
+        if self._on_inactive_callback:
+            self._on_inactive_callback()
+        return None
+    
+    def _record_transition(self, active: bool, at_ns: int) -> None:
+        """
+        Record a transition in the history, if any. Called with the lock held.
+        
+        Args:
+            active: True when the user became active
+            at_ns: Clock time of the transition; inactive transitions are
+                recorded at the last input, where the idle period began
+        """
+        if self._history is not None:
+            self._history.append(active, self._wall_ns(at_ns))
+    
+    def _wall_ns(self, at_ns: int) -> int:
+        """Convert a clock time to wall clock time."""
+        return time.time_ns() - (self._clock.now_ns() - at_ns)
     
     def start(self) -> bool:
         """Start monitoring activity."""
@@ -83,29 +191,30 @@ class ActivityMonitor:
             return False
         
         try:
-            self.last_activity_time = time.time()
+            self._last_event_ns = self._now_ns()
+            self._next_update_ns = 0
+            self._received_events = 0
+            self._coalesced_events = 0
+            self._is_inactive = False
             self._is_monitoring = True
             
-            # Start mouse listener
-            self._mouse_listener = mouse.Listener(
-                on_move=self._on_mouse_move,
-                on_click=self._on_mouse_click
-            )
-            self._mouse_listener.start()
+            # Read when a snapshot is taken, the listeners only bump plain ints
+            metrics = get_metrics()
+            metrics.gauge("activity.events_received", lambda: self._received_events)
+            metrics.gauge("activity.events_coalesced", lambda: self._coalesced_events)
             
-            # Start keyboard listener
-            self._keyboard_listener = keyboard.Listener(
-                on_press=self._on_key_press
+            # Start mouse and keyboard listeners
+            self._listener = self._input_backend.listen(
+                self._on_mouse_move, self._on_mouse_click, self._on_key_press
             )
-            self._keyboard_listener.start()
             
-            # Start monitoring thread
-            self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-            self._monitor_thread.start()
+            # Schedule the first inactivity deadline
+            with self._lock:
+                self._schedule_deadline()
             
             return True
         except Exception as e:
-            print(f"Error starting activity monitor: {e}")
+            logger.error("Error starting activity monitor: %s", e)
             self._is_monitoring = False
             return False
     
@@ -114,23 +223,38 @@ class ActivityMonitor:
         if not self._is_monitoring:
             return False
         
-        self._is_monitoring = False
+        with self._lock:
+            self._is_monitoring = False
+            self._scheduler.cancel(self._job)
+            self._job = None
         
         try:
-            if self._mouse_listener:
-                self._mouse_listener.stop()
-            if self._keyboard_listener:
-                self._keyboard_listener.stop()
-            if self._monitor_thread:
-                self._monitor_thread.join(timeout=2.0)
+            if self._listener:
+                self._listener.stop()
+                self._listener = None
         except Exception as e:
-            print(f"Error stopping activity monitor: {e}")
+            logger.error("Error stopping activity monitor: %s", e)
         
         return True
     
+    def note_synthetic_input(self) -> None:
+        """
+        Record that input was just simulated.
+        
+        Input hooks cannot tell simulated input apart, so this does nothing
+        here; idle counter based monitors override it.
+        """
+    
     def set_timeout(self, timeout: float) -> None:
         """Update inactivity timeout."""
         self.inactivity_timeout = timeout
+        with self._lock:
+            if self._job is not None and not self._is_inactive:
+                self._scheduler.reschedule(self._job, self._arm())
+    
+    def set_coalesce_window(self, window: float) -> None:
+        """Update the minimum time between two activity updates."""
+        self._coalesce_window_ns = int(window * 1e9)
     
     @property
     def is_inactive(self) -> bool:
@@ -140,5 +264,20 @@ class ActivityMonitor:
     @property
     def time_since_activity(self) -> float:
         """Get time in seconds since last activity."""
-        return time.time() - self.last_activity_time
+        return (self._now_ns() - self._last_event_ns) / 1e9
+    
+    @property
+    def last_activity_time(self) -> float:
+        """Get monotonic clock time in seconds of the last activity."""
+        return self._last_event_ns / 1e9
+    
+    @property
+    def received_events(self) -> int:
+        """Number of input events received since start()."""
+        return self._received_events
+    
+    @property
+    def coalesced_events(self) -> int:
+        """Number of input events that were only stamped, not fully handled."""
+        return self._coalesced_events
 
@@ -0,0 +1,123 @@
+"""
+Clock module.
+Single monotonic time source for core components, with suspend detection.
+"""
+
+import time
+
+
+class Clock:
+    """Monotonic clock that can tell when the system was suspended."""
+    
+    def __init__(self, suspend_threshold: float = 5.0):
+        """
+        Initialize clock.
+        
+        Args:
+            suspend_threshold: Minimum gap in seconds that is reported as a
+                suspend; shorter scheduling delays are ignored
+        """
+        self._suspend_threshold_ns = int(suspend_threshold * 1e9)
+        # CLOCK_BOOTTIME keeps counting while suspended, CLOCK_MONOTONIC
+        # does not, so their difference grows by the time spent suspended
+        self._boottime_id = getattr(time, "CLOCK_BOOTTIME", None)
+    
+    def now_ns(self) -> int:
+        """Get current monotonic time in nanoseconds."""
+        return time.monotonic_ns()
+    
+    def now(self) -> float:
+        """Get current monotonic time in seconds."""
+        return time.monotonic_ns() / 1e9
+    
+    def sleep(self, seconds: float) -> None:
+        """Block the calling thread for a short time."""
+        time.sleep(seconds)
+    
+    def suspended_ns(self) -> int:
+        """
+        Get total time spent suspended since boot, in nanoseconds.
+        
+        Returns 0 on platforms that cannot measure it (anything without
+        CLOCK_BOOTTIME); suspend_gap_ns then falls back to wakeup overshoot.
+        """
+        if self._boottime_id is None:
+            return 0
+        return time.clock_gettime_ns(self._boottime_id) - time.monotonic_ns()
+    
+    def suspend_gap_ns(self, suspended_mark_ns: int, expected_ns: int = 0) -> int:
+        """
+        Detect a suspend that happened since a wait was started.
+        
+        Args:
+            suspended_mark_ns: Value of suspended_ns() taken before the wait
+            expected_ns: Monotonic time the wait was expected to end at, or 0
+                if the wait had no deadline
+        
+        Returns:
+            Length of the detected suspend in nanoseconds, 0 if none
+        """
+        gap = self.suspended_ns() - suspended_mark_ns
+        if gap >= self._suspend_threshold_ns:
+            return gap
+        
+        if expected_ns:
+            # Where the monotonic clock keeps running during suspend, a
+            # resumed wait overshoots its deadline by the suspend length
+            overshoot = self.now_ns() - expected_ns
+            if overshoot >= self._suspend_threshold_ns:
+                return overshoot
+        
+        return 0
+
+
+class VirtualClock(Clock):
+    """
+    Clock that only moves when told to, for simulations.
+    
+    Time advances through advance(), sleep() and a Scheduler driven by hand
+    with run_until(); it never goes backwards. suspend() behaves like a
+    system suspend on Linux, where the monotonic clock stops meanwhile.
+    """
+    
+    def __init__(self, start: float = 0.0, suspend_threshold: float = 5.0):
+        """
+        Initialize clock.
+        
+        Args:
+            start: Initial time in seconds
+            suspend_threshold: Minimum gap in seconds that is reported as a
+                suspend
+        """
+        super().__init__(suspend_threshold)
+        self._now_ns = int(start * 1e9)
+        self._suspended_ns = 0
+    
+    def now_ns(self) -> int:
+        """Get current virtual time in nanoseconds."""
+        return self._now_ns
+    
+    def now(self) -> float:
+        """Get current virtual time in seconds."""
+        return self._now_ns / 1e9
+    
+    def sleep(self, seconds: float) -> None:
+        """Advance the time instead of blocking."""
+        self.advance(seconds)
+    
+    def suspended_ns(self) -> int:
+        """Get total simulated suspend time in nanoseconds."""
+        return self._suspended_ns
+    
+    def advance(self, seconds: float) -> None:
+        """Move the time forward."""
+        self.advance_to_ns(self._now_ns + int(seconds * 1e9))
+    
+    def advance_to_ns(self, now_ns: int) -> None:
+        """Move the time forward to a point; earlier points are ignored."""
+        if now_ns > self._now_ns:
+            self._now_ns = now_ns
+    
+    def suspend(self, seconds: float) -> None:
+        """Simulate a system suspend of some length, which the monotonic time skips."""
+        self._suspended_ns += int(seconds * 1e9)
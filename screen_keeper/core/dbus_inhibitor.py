@@ -0,0 +1,173 @@
+"""
+D-Bus inhibitor module.
+Takes logind and freedesktop ScreenSaver inhibitor locks on Linux.
+"""
+
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# jeepney names, imported by _load_jeepney() on first use
+DBusAddress = new_method_call = open_dbus_connection = unwrap_msg = None
+
+
+# Desktops disagree on the object path of the ScreenSaver service
+SCREENSAVER_PATHS = ("/org/freedesktop/ScreenSaver", "/ScreenSaver")
+
+
+def _load_jeepney() -> bool:
+    """Import jeepney on first use. Returns False if it is not installed."""
+    global DBusAddress, new_method_call, open_dbus_connection, unwrap_msg
+    if open_dbus_connection is None:
+        try:
+            from jeepney import DBusAddress, new_method_call
+            from jeepney.io.blocking import open_dbus_connection
+            from jeepney.wrappers import unwrap_msg
+        except ImportError:  # jeepney is only required on Linux
+            return False
+    return True
+
+
+def _screensaver_address(path: str) -> "DBusAddress":
+    """Get the address of the ScreenSaver service at the given object path."""
+    return DBusAddress(path, bus_name="org.freedesktop.ScreenSaver",
+                       interface="org.freedesktop.ScreenSaver")
+
+
+class DBusInhibitor:
+    """
+    Holds sleep and idle inhibitor locks for the lifetime of a session.
+    
+    The logind lock is a file descriptor that stays valid until it is closed.
+    The ScreenSaver lock is tied to the session bus connection, which is
+    therefore kept open until release() is called.
+    """
+    
+    def __init__(self, app_name: str = "Screen Keeper",
+                 system_bus: str = "SYSTEM", session_bus: str = "SESSION"):
+        """
+        Initialize inhibitor.
+        
+        Args:
+            app_name: Application name reported to logind and the screensaver
+            system_bus: Bus for logind - "SYSTEM" or a D-Bus address
+            session_bus: Bus for the screensaver - "SESSION" or a D-Bus address
+        """
+        self.app_name = app_name
+        self.system_bus = system_bus
+        self.session_bus = session_bus
+        self._login1_fd: Optional[int] = None
+        self._session_conn = None
+        self._screensaver_path: Optional[str] = None
+        self._screensaver_cookie: Optional[int] = None
+    
+    @staticmethod
+    def is_available() -> bool:
+        """Check if the D-Bus client library is installed."""
+        return _load_jeepney()
+    
+    def acquire(self, reason: str = "Screen Keeper", sleep: bool = True) -> bool:
+        """
+        Take the inhibitor locks.
+        
+        Args:
+            reason: Human readable reason shown by the desktop
+            sleep: Also take the logind sleep/idle lock; False only takes
+                the ScreenSaver inhibit
+        
+        Returns:
+            True if at least one lock is held, False otherwise
+        """
+        if not self.is_available():
+            logger.info("D-Bus inhibitor unavailable: jeepney is not installed")
+            return False
+        
+        if sleep and self._login1_fd is None:
+            self._login1_fd = self._inhibit_login1(reason)
+        if self._screensaver_cookie is None:
+            self._inhibit_screensaver(reason)
+        
+        return self.holds_sleep_lock or self.holds_idle_lock
+    
+    def _inhibit_login1(self, reason: str) -> Optional[int]:
+        """Take a logind sleep/idle block lock and return its descriptor."""
+        try:
+            conn = open_dbus_connection(bus=self.system_bus, enable_fds=True)
+        except Exception as e:
+            logger.info("Cannot connect to system bus: %s", e)
+            return None
+        
+        try:
+            login1 = DBusAddress("/org/freedesktop/login1",
+                                 bus_name="org.freedesktop.login1",
+                                 interface="org.freedesktop.login1.Manager")
+            msg = new_method_call(login1, "Inhibit", "ssss",
+                                  ("sleep:idle", self.app_name, reason, "block"))
+            fd = unwrap_msg(conn.send_and_get_reply(msg, timeout=5.0))[0]
+            # The descriptor outlives the connection; logind only drops the
+            # lock once every copy of it is closed, so take it over rather
+            # than copying it (jeepney >= 0.7 returns a FileDescriptor)
+            return fd.to_raw_fd()
+        except Exception as e:
+            logger.warning("logind Inhibit failed: %s", e)
+            return None
+        finally:
+            conn.close()
+    
+    def _inhibit_screensaver(self, reason: str) -> None:
+        """Take a ScreenSaver inhibit cookie over the session bus."""
+        try:
+            conn = open_dbus_connection(bus=self.session_bus)
+        except Exception as e:
+            logger.info("Cannot connect to session bus: %s", e)
+            return
+        
+        for path in SCREENSAVER_PATHS:
+            try:
+                msg = new_method_call(_screensaver_address(path), "Inhibit", "ss",
+                                      (self.app_name, reason))
+                cookie = unwrap_msg(conn.send_and_get_reply(msg, timeout=5.0))[0]
+            except Exception as e:
+                logger.warning("ScreenSaver Inhibit on %s failed: %s", path, e)
+                continue
+            
+            self._session_conn = conn
+            self._screensaver_path = path
+            self._screensaver_cookie = cookie
+            return
+        
+        conn.close()
+    
+    def release(self) -> None:
+        """Release all held locks."""
+        if self._login1_fd is not None:
+            try:
+                os.close(self._login1_fd)
+            except OSError as e:
+                logger.error("Error releasing logind lock: %s", e)
+            self._login1_fd = None
+        
+        if self._session_conn is not None:
+            try:
+                msg = new_method_call(_screensaver_address(self._screensaver_path),
+                                      "UnInhibit", "u", (self._screensaver_cookie,))
+                unwrap_msg(self._session_conn.send_and_get_reply(msg, timeout=5.0))
+            except Exception as e:
+                # Closing the connection below drops the inhibit anyway
+                logger.error("ScreenSaver UnInhibit failed: %s", e)
+            self._session_conn.close()
+            self._session_conn = None
+            self._screensaver_path = None
+            self._screensaver_cookie = None
+    
+    @property
+    def holds_sleep_lock(self) -> bool:
+        """Check if the logind sleep/idle lock is held."""
+        return self._login1_fd is not None
+    
+    @property
+    def holds_idle_lock(self) -> bool:
+        """Check if the screensaver inhibit is held."""
+        return self._screensaver_cookie is not None
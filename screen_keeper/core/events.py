@@ -0,0 +1,118 @@
+"""
+Event bus module.
+Hands events raised on core threads (input hooks, the scheduler) over to a
+single consumer thread, so that no handler runs on the thread that raised it.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.scheduler import Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Events posted by the core
+USER_ACTIVE = "user_active"  # args: the activity monitor that saw the input
+USER_INACTIVE = "user_inactive"  # args: the activity monitor that timed out
+STATE_CHANGED = "state_changed"  # the keeper started, stopped or changed activity state
+COMMAND_RECEIVED = "command_received"  # args: command, its arguments, and a Future for the error or None
+
+
+class EventBus:
+    """
+    Thread-safe event queue with subscribed handlers.
+    
+    post() only appends to a queue and never runs a handler, so it is safe to
+    call from input hook threads that must not block. Handlers run when the
+    consumer calls dispatch_pending(). By default the consumer is the shared
+    scheduler thread; set_wakeup() hands delivery to another event loop, such
+    as the Qt GUI thread.
+    """
+    
+    def __init__(self, scheduler: Optional[Scheduler] = None):
+        """
+        Initialize event bus.
+        
+        Args:
+            scheduler: Scheduler delivering events when no other wakeup is
+                set (default: shared one)
+        """
+        self._scheduler = scheduler or get_scheduler()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Tuple[Callable[..., None], ...]] = {}
+        self._wakeup: Callable[[], None] = self._wake_scheduler
+        self._wakeup_pending = False
+    
+    def subscribe(self, event: str, handler: Callable[..., None]) -> None:
+        """Call a handler, with the posted arguments, for every event of a kind."""
+        with self._lock:
+            self._handlers[event] = self._handlers.get(event, ()) + (handler,)
+    
+    def unsubscribe(self, event: str, handler: Callable[..., None]) -> None:
+        """Stop calling a handler."""
+        with self._lock:
+            self._handlers[event] = tuple(h for h in self._handlers.get(event, ()) if h != handler)
+    
+    def set_wakeup(self, wakeup: Optional[Callable[[], None]]) -> None:
+        """
+        Set how the consumer is woken up.
+        
+        Args:
+            wakeup: Called from the posting thread when the first event is
+                queued; must make the consumer thread call dispatch_pending().
+                None delivers on the scheduler thread again.
+        """
+        with self._lock:
+            self._wakeup = wakeup or self._wake_scheduler
+            pending = bool(self._queue)
+        if pending:
+            (wakeup or self._wake_scheduler)()
+    
+    def post(self, event: str, *args) -> None:
+        """Queue an event. Safe to call from any thread, never blocks on handlers."""
+        with self._lock:
+            self._queue.append((event, args, time.monotonic_ns()))
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+            wakeup = self._wakeup
+        wakeup()
+    
+    def dispatch_pending(self) -> int:
+        """
+        Run the handlers of all queued events on the calling thread.
+        
+        The time each event waited in the queue is recorded in the
+        "events.delivery_seconds" histogram.
+        
+        Returns:
+            Number of events dispatched
+        """
+        with self._lock:
+            events = list(self._queue)
+            self._queue.clear()
+            self._wakeup_pending = False
+            handlers = self._handlers
+        
+        delivery = get_metrics().histogram("events.delivery_seconds")
+        for event, args, posted_ns in events:
+            delivery.observe((time.monotonic_ns() - posted_ns) / 1e9)
+            for handler in handlers.get(event, ()):
+                try:
+                    handler(*args)
+                except Exception as e:
+                    logger.error("Error handling %s event: %s", event, e)
+        return len(events)
+    
+    def _wake_scheduler(self) -> None:
+        """Deliver queued events on the scheduler thread."""
+        self._scheduler.schedule(0, self._dispatch_job)
+    
+    def _dispatch_job(self) -> None:
+        """Scheduler job delivering the queued events once."""
+        self.dispatch_pending()
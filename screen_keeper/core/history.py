@@ -0,0 +1,220 @@
+"""
+Activity history module.
+Keeps a fixed-size record of activity transitions and of the minutes with
+input, in a memory-mapped file that survives restarts.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SKHIST\x00\x00"
+_VERSION = 1
+# magic, version, transition capacity, minutes, transitions written, last marked minute
+_HEADER = struct.Struct("<8sIIIxxxxqq")
+_HEADER_SIZE = 64
+# Transitions, and header fields updated in place. A transition is the wall
+# time in milliseconds shifted left by one, with the low bit set if active.
+_INT64 = struct.Struct("<q")
+_COUNT_OFFSET = 24
+_LAST_MINUTE_OFFSET = 32
+_MINUTE_NS = 60_000_000_000
+
+
+def default_history_path() -> str:
+    """Get the history file in the user's configuration directory."""
+    config_dir = Path.home() / ".screen-keeper"
+    config_dir.mkdir(exist_ok=True)
+    return str(config_dir / "activity-history.bin")
+
+
+class ActivityHistory:
+    """
+    Ring buffer of active/inactive transitions and per-minute activity bitmap.
+    
+    Both live in one preallocated memory-mapped file: a header, `capacity`
+    transitions of 8 bytes each, then one bit for each of the last `minutes`
+    minutes. Appending writes a few bytes in place, so it is O(1) and grows
+    nothing; reopening the file only checks the header. Times are wall clock
+    times, so the history stays meaningful across reboots.
+    """
+    
+    def __init__(self, path: Optional[str] = None, capacity: int = 4096,
+                 minutes: int = 7 * 24 * 60):
+        """
+        Open or create a history.
+        
+        Args:
+            path: History file; None keeps the history in memory only. A file
+                of another layout or size is started over.
+            capacity: Number of transitions kept
+            minutes: Number of minutes the activity bitmap covers
+        
+        Raises:
+            OSError: If the file cannot be created or mapped
+        """
+        self.path = path
+        self.capacity = capacity
+        self.minutes = minutes
+        self._bitmap_offset = _HEADER_SIZE + capacity * _INT64.size
+        size = self._bitmap_offset + (minutes + 7) // 8
+        self._lock = threading.Lock()
+        
+        if path is None:
+            self._map, fresh = mmap.mmap(-1, size), True
+        else:
+            self._map, fresh = self._open_file(path, size)
+        if fresh:
+            _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, capacity, minutes, 0, 0)
+        
+        _, _, _, _, self._count, self._last_minute = _HEADER.unpack_from(self._map)
+        # Minute set last, so later input in the same minute returns at once
+        self._marked_minute = self._last_minute
+    
+    def _open_file(self, path: str, size: int) -> Tuple[mmap.mmap, bool]:
+        """
+        Map the file, clearing it if its layout does not match.
+        
+        Returns:
+            The mapping, and whether the history starts empty
+        """
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fresh = os.fstat(fd).st_size != size
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            mapped = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        
+        if not fresh:
+            magic, version, capacity, minutes, _, _ = _HEADER.unpack_from(mapped)
+            fresh = (magic, version, capacity, minutes) != (_MAGIC, _VERSION, self.capacity, self.minutes)
+            if fresh:
+                logger.warning("Activity history %s has another layout, starting over", path)
+                mapped[:] = bytes(size)
+        return mapped, fresh
+    
+    def append(self, active: bool, wall_ns: Optional[int] = None) -> None:
+        """
+        Record a transition, overwriting the oldest one when full.
+        
+        Args:
+            active: True when the user became active, False when inactive
+            wall_ns: Wall clock time of the transition (default: now)
+        """
+        if wall_ns is None:
+            wall_ns = time.time_ns()
+        with self._lock:
+            count = self._count
+            offset = _HEADER_SIZE + (count % self.capacity) * _INT64.size
+            _INT64.pack_into(self._map, offset, (wall_ns // 1_000_000) << 1 | bool(active))
+            # The count is written last, so a reader never sees a partial record
+            self._count = count + 1
+            _INT64.pack_into(self._map, _COUNT_OFFSET, self._count)
+    
+    def mark_active(self, wall_ns: Optional[int] = None) -> None:
+        """
+        Mark a minute as having had input.
+        
+        Cheap enough for input listener threads: after the first call in a
+        minute, the others return after one comparison.
+        
+        Args:
+            wall_ns: Wall clock time of the input (default: now)
+        """
+        minute = (time.time_ns() if wall_ns is None else wall_ns) // _MINUTE_NS
+        if minute == self._marked_minute:
+            return
+        
+        with self._lock:
+            last = self._last_minute
+            if minute <= last - self.minutes:
+                return
+            if minute > last:
+                # Minutes skipped since the last mark had no input; each is
+                # cleared once, so this is O(1) amortized
+                for skipped in range(max(last + 1, minute - self.minutes + 1), minute):
+                    self._set_bit(skipped, False)
+                self._last_minute = minute
+                _INT64.pack_into(self._map, _LAST_MINUTE_OFFSET, minute)
+            self._set_bit(minute, True)
+            if minute == self._last_minute:
+                self._marked_minute = minute
+    
+    def _set_bit(self, minute: int, value: bool) -> None:
+        """Set the bit of a minute. Called with the lock held."""
+        index = minute % self.minutes
+        offset = self._bitmap_offset + index // 8
+        mask = 1 << (index % 8)
+        if value:
+            self._map[offset] |= mask
+        else:
+            self._map[offset] &= ~mask & 0xFF
+    
+    def transitions(self) -> List[Tuple[float, bool]]:
+        """
+        Get the recorded transitions, oldest first.
+        
+        Returns:
+            (wall clock time in seconds, True if the user became active) pairs
+        """
+        with self._lock:
+            count = self._count
+            first = max(count - self.capacity, 0)
+            records = []
+            for i in range(first, count):
+                offset = _HEADER_SIZE + (i % self.capacity) * _INT64.size
+                (value,) = _INT64.unpack_from(self._map, offset)
+                records.append(((value >> 1) / 1000, bool(value & 1)))
+        return records
+    
+    def active_minutes(self, since: float, until: Optional[float] = None) -> List[bool]:
+        """
+        Get which minutes had input.
+        
+        Args:
+            since: Wall clock time in seconds of the first minute
+            until: Wall clock time in seconds of the last minute (default: now)
+        
+        Returns:
+            One entry per minute; minutes outside the bitmap are False
+        """
+        first = int(since // 60)
+        last = int((time.time() if until is None else until) // 60)
+        with self._lock:
+            newest = self._last_minute
+            oldest = newest - self.minutes + 1
+            result = []
+            for minute in range(first, last + 1):
+                if oldest <= minute <= newest:
+                    index = minute % self.minutes
+                    result.append(bool(self._map[self._bitmap_offset + index // 8] & (1 << (index % 8))))
+                else:
+                    result.append(False)
+        return result
+    
+    def flush(self) -> None:
+        """Write the history to its file now instead of when the system gets to it."""
+        if self.path is not None:
+            self._map.flush()
+    
+    def close(self) -> None:
+        """Flush and unmap the history."""
+        with self._lock:
+            if not self._map.closed:
+                self.flush()
+                self._map.close()
+    
+    @property
+    def transition_count(self) -> int:
+        """Number of transitions recorded since the history was created."""
+        return self._count
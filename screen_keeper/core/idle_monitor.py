@@ -0,0 +1,234 @@
+"""
+Idle counter activity monitoring module.
+Detects inactivity from the system idle counter instead of input hooks.
+"""
+
+import ctypes
+import logging
+import platform
+from typing import Optional
+
+from screen_keeper.core.activity_monitor import ActivityMonitor
+from screen_keeper.core.clock import Clock
+from screen_keeper.core.history import ActivityHistory
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.x11 import X11Display
+
+logger = logging.getLogger(__name__)
+
+
+class LASTINPUTINFO(ctypes.Structure):
+    """LASTINPUTINFO structure for GetLastInputInfo."""
+    
+    _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+
+class WindowsIdleCounter:
+    """Idle counter backed by GetLastInputInfo."""
+    
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._info = LASTINPUTINFO(cbSize=ctypes.sizeof(LASTINPUTINFO))
+    
+    def get_idle_time_ms(self) -> Optional[int]:
+        """Get the time since the last input event in milliseconds."""
+        if not self._user32.GetLastInputInfo(ctypes.byref(self._info)):
+            return None
+        # Both are 32-bit millisecond tick counts that wrap together
+        return (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+    
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def open_idle_counter():
+    """
+    Open the system idle counter.
+    
+    Returns:
+        Object with get_idle_time_ms() and close() methods (X11Display or
+        WindowsIdleCounter), or None if no idle counter is available
+    """
+    system = platform.system()
+    if system == "Windows":
+        return WindowsIdleCounter()
+    
+    if system == "Linux":
+        display = X11Display.open()
+        if display is None:
+            return None
+        if display.get_idle_time_ms() is None:
+            display.close()
+            return None
+        return display
+    
+    return None
+
+
+def idle_seconds(counter) -> Optional[float]:
+    """Read an idle counter in seconds, None if the read failed."""
+    idle_ms = counter.get_idle_time_ms()
+    return None if idle_ms is None else idle_ms / 1000.0
+
+
+class IdleActivityMonitor(ActivityMonitor):
+    """
+    Monitors activity by reading the system idle counter.
+    
+    Uses XScreenSaverQueryInfo on X11 and GetLastInputInfo on Windows. No
+    input hooks are installed, so input events cost nothing in this process.
+    While the user is active the counter is read once per inactivity deadline;
+    while inactive it is polled every `poll_interval` seconds.
+    """
+    
+    # Input within this time after a simulated input is attributed to it
+    SYNTHETIC_INPUT_GRACE = 0.5
+    # Jitter of the last input time computed from a millisecond counter
+    COUNTER_TOLERANCE_NS = 10_000_000
+    
+    def __init__(self, inactivity_timeout: float = 60.0, poll_interval: float = 1.0,
+                 clock: Optional[Clock] = None, scheduler: Optional[Scheduler] = None,
+                 history: Optional[ActivityHistory] = None):
+        """
+        Initialize idle counter monitor.
+        
+        Args:
+            inactivity_timeout: Time in seconds before considering user inactive
+            poll_interval: Time in seconds between idle counter reads while inactive
+            clock: Time source (default: the scheduler clock)
+            scheduler: Scheduler running the counter reads (default: shared one)
+            history: History to record transitions in; only the minutes of
+                the inputs seen by a counter read are marked active
+        """
+        super().__init__(inactivity_timeout, clock=clock, scheduler=scheduler, history=history)
+        self.poll_interval = poll_interval
+        self._idle_counter = None
+        self._synthetic_input_ns = 0
+        self._resume_ns = 0
+    
+    @staticmethod
+    def is_available() -> bool:
+        """Check if the system idle counter can be read."""
+        counter = open_idle_counter()
+        if counter is None:
+            return False
+        counter.close()
+        return True
+    
+    def note_synthetic_input(self) -> None:
+        """
+        Record that input was just simulated.
+        
+        Simulated input resets the system idle counter like real input would,
+        so it is ignored when deciding whether the user came back.
+        """
+        self._synthetic_input_ns = self._clock.now_ns()
+    
+    def _poll(self) -> Optional[float]:
+        """
+        Read the idle counter; runs on the scheduler thread.
+        
+        Returns:
+            Delay until the next read: the time left until the inactivity
+            deadline while active, `poll_interval` while inactive
+        """
+        clock = self._clock
+        grace_ns = int(self.SYNTHETIC_INPUT_GRACE * 1e9)
+        callback = None
+        with self._lock:
+            if not self._is_monitoring:
+                return None
+            
+            idle_ms = self._idle_counter.get_idle_time_ms()
+            get_metrics().counter("activity.idle_counter_reads").inc()
+            if idle_ms is None:
+                logger.error("Error reading idle counter, stopping idle monitor")
+                return None
+            
+            if clock.suspend_gap_ns(self._suspended_mark, self._expected_ns):
+                self._resume_ns = clock.now_ns()
+            
+            # The idle counter may keep running while suspended, so idle
+            # time is never counted from before the last resume
+            now_ns = clock.now_ns()
+            last_input_ns = max(now_ns - idle_ms * 1_000_000, self._resume_ns)
+            idle_ns = now_ns - last_input_ns
+            timeout_ns = int(self.inactivity_timeout * 1e9)
+            
+            if self._is_inactive:
+                newer_input = last_input_ns > self._last_event_ns + self.COUNTER_TOLERANCE_NS
+                if newer_input and last_input_ns > self._synthetic_input_ns + grace_ns:
+                    self._last_event_ns = last_input_ns
+                    self._is_inactive = False
+                    self._mark_input(last_input_ns)
+                    self._record_transition(True, last_input_ns)
+                    callback = self._on_active_callback
+                    delay = timeout_ns / 1e9
+                else:
+                    delay = self.poll_interval
+            else:
+                if last_input_ns > self._last_event_ns:
+                    self._mark_input(last_input_ns)
+                self._last_event_ns = last_input_ns
+                if idle_ns >= timeout_ns:
+                    self._is_inactive = True
+                    self._record_transition(False, last_input_ns)
+                    callback = self._on_inactive_callback
+                    delay = self.poll_interval
+                else:
+                    delay = (timeout_ns - idle_ns) / 1e9
+            
+            self._suspended_mark = clock.suspended_ns()
+            self._expected_ns = clock.now_ns() + int(delay * 1e9)
+        
+        # Run the callback outside the lock
+        if callback:
+            callback()
+        return delay
+    
+    def _mark_input(self, at_ns: int) -> None:
+        """Mark the minute of an input read from the counter as active."""
+        if self._history is not None:
+            self._history.mark_active(self._wall_ns(at_ns))
+    
+    def start(self) -> bool:
+        """Start monitoring the idle counter."""
+        if self._is_monitoring:
+            return False
+        
+        self._idle_counter = open_idle_counter()
+        if self._idle_counter is None:
+            logger.error("Error starting idle monitor: no system idle counter")
+            return False
+        
+        with self._lock:
+            self._last_event_ns = self._clock.now_ns()
+            self._resume_ns = self._last_event_ns
+            self._is_inactive = False
+            self._is_monitoring = True
+            self._suspended_mark = self._clock.suspended_ns()
+            self._expected_ns = 0
+            self._job = self._scheduler.schedule(0.0, self._poll)
+        return True
+    
+    def stop(self) -> bool:
+        """Stop monitoring the idle counter."""
+        if not self._is_monitoring:
+            return False
+        
+        with self._lock:
+            self._is_monitoring = False
+            self._scheduler.cancel(self._job)
+            self._job = None
+            self._idle_counter.close()
+            self._idle_counter = None
+        return True
+    
+    def set_timeout(self, timeout: float) -> None:
+        """Update inactivity timeout."""
+        self.inactivity_timeout = timeout
+        with self._lock:
+            if self._job is not None and not self._is_inactive:
+                self._scheduler.reschedule(self._job, 0.0)
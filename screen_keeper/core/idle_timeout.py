@@ -0,0 +1,61 @@
+"""
+Idle timeout detection module.
+Reads how long the system waits without input before blanking the screen.
+"""
+
+import ctypes
+import logging
+import platform
+from typing import Optional
+
+from screen_keeper.core.x11 import X11Display
+
+logger = logging.getLogger(__name__)
+
+
+def detect_idle_timeout() -> Optional[float]:
+    """
+    Detect the effective system idle timeout.
+    
+    Returns:
+        Seconds of inactivity after which the screen blanks or powers down,
+        or None if it cannot be determined or blanking is disabled
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            return _detect_idle_timeout_windows()
+        elif system == "Linux":
+            return _detect_idle_timeout_x11()
+    except Exception as e:
+        logger.error("Error detecting idle timeout: %s", e)
+    return None
+
+
+def _detect_idle_timeout_windows() -> Optional[float]:
+    """Read the screensaver timeout with SystemParametersInfo."""
+    SPI_GETSCREENSAVEACTIVE = 0x0010
+    SPI_GETSCREENSAVETIMEOUT = 0x000E
+    
+    active = ctypes.c_int()
+    ctypes.windll.user32.SystemParametersInfoW(SPI_GETSCREENSAVEACTIVE, 0, ctypes.byref(active), 0)
+    if not active.value:
+        return None
+    
+    timeout = ctypes.c_int()
+    ctypes.windll.user32.SystemParametersInfoW(SPI_GETSCREENSAVETIMEOUT, 0, ctypes.byref(timeout), 0)
+    return float(timeout.value) if timeout.value > 0 else None
+
+
+def _detect_idle_timeout_x11() -> Optional[float]:
+    """Read the X server screensaver and DPMS timeouts."""
+    display = X11Display.open()
+    if display is None:
+        return None
+    
+    try:
+        timeouts = [t for t in (display.get_screensaver_timeout(), display.get_dpms_timeout()) if t > 0]
+    finally:
+        display.close()
+    
+    return float(min(timeouts)) if timeouts else None
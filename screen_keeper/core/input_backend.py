@@ -0,0 +1,99 @@
+"""
+Input backend module.
+Where input events come from and where simulated input goes, so the
+activity monitor and simulator can run without a display server.
+"""
+
+from typing import Any, Callable
+
+
+class InputListener:
+    """Handle of running input listeners."""
+    
+    def stop(self) -> None:
+        """Stop delivering events."""
+        raise NotImplementedError
+
+
+class InputBackend:
+    """
+    Source of input events and sink of simulated input.
+    
+    The mouse controller has a read/write `position` (x, y); the keyboard
+    controller has press(key) and release(key).
+    """
+    
+    def listen(self, on_move: Callable[[int, int], None],
+               on_click: Callable[[int, int, Any, bool], None],
+               on_press: Callable[[Any], None]) -> InputListener:
+        """
+        Start delivering input events to callbacks.
+        
+        Args:
+            on_move: Called with x, y for mouse movement
+            on_click: Called with x, y, button, pressed for mouse clicks
+            on_press: Called with the key for key presses
+        
+        Returns:
+            Handle stopping the listeners
+        """
+        raise NotImplementedError
+    
+    def mouse_controller(self) -> Any:
+        """Create a controller moving the mouse cursor."""
+        raise NotImplementedError
+    
+    def keyboard_controller(self) -> Any:
+        """Create a controller pressing keys."""
+        raise NotImplementedError
+    
+    @property
+    def scroll_lock_key(self) -> Any:
+        """Get the key toggled by keyboard simulation."""
+        raise NotImplementedError
+
+
+class _PynputListener(InputListener):
+    """Mouse and keyboard listeners of pynput."""
+    
+    def __init__(self, mouse_listener, keyboard_listener):
+        self._listeners = (mouse_listener, keyboard_listener)
+    
+    def stop(self) -> None:
+        for listener in self._listeners:
+            listener.stop()
+
+
+class PynputBackend(InputBackend):
+    """
+    Real input through pynput.
+    
+    pynput is imported on first use rather than at module level, since it
+    connects to the display server on import.
+    """
+    
+    def listen(self, on_move, on_click, on_press) -> InputListener:
+        from pynput import mouse, keyboard
+        
+        mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click)
+        mouse_listener.start()
+        try:
+            keyboard_listener = keyboard.Listener(on_press=on_press)
+            keyboard_listener.start()
+        except Exception:
+            mouse_listener.stop()
+            raise
+        return _PynputListener(mouse_listener, keyboard_listener)
+    
+    def mouse_controller(self):
+        from pynput.mouse import Controller
+        return Controller()
+    
+    def keyboard_controller(self):
+        from pynput.keyboard import Controller
+        return Controller()
+    
+    @property
+    def scroll_lock_key(self):
+        from pynput.keyboard import Key
+        return Key.scroll_lock
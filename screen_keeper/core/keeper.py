@@ -0,0 +1,403 @@
+"""
+Keep-alive controller module.
+Runs sleep prevention, activity monitoring and activity simulation together,
+independently of any user interface.
+"""
+
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.activity_monitor import ActivityMonitor
+from screen_keeper.core.events import STATE_CHANGED, USER_ACTIVE, USER_INACTIVE, EventBus
+from screen_keeper.core.history import ActivityHistory, default_history_path
+from screen_keeper.core.idle_monitor import IdleActivityMonitor, idle_seconds, open_idle_counter
+from screen_keeper.core.input_backend import InputBackend
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.sleep_preventer import SleepPreventer
+from screen_keeper.core.strategies import KeepAliveStrategy, StrategyEngine
+
+logger = logging.getLogger(__name__)
+
+
+class KeepAliveController:
+    """
+    Keeps the screen alive according to the settings.
+    
+    Owns the SleepPreventer, the selected keep-alive strategy and, for
+    periodic strategies, the ActivityMonitor and MouseMover. Used by both the
+    main window and the headless mode.
+    
+    Activity monitor callbacks only post to the event bus, so starting and
+    stopping the MouseMover never runs on an input hook thread; state
+    changes are posted as STATE_CHANGED events.
+    """
+    
+    # Settings that only take effect through a full restart
+    RESTART_SETTINGS = frozenset({
+        "prevent_sleep", "use_activity_detection", "activity_backend",
+        "adaptive_interval", "system_idle_timeout", "idle_safety_margin",
+        "record_activity_history",
+    })
+    
+    def __init__(self, settings: Settings, sleep_preventer: Optional[SleepPreventer] = None,
+                 event_bus: Optional[EventBus] = None, input_backend: Optional[InputBackend] = None,
+                 scheduler: Optional[Scheduler] = None,
+                 activity_history: Optional[ActivityHistory] = None):
+        """
+        Initialize controller.
+        
+        Args:
+            settings: Application settings, read on every start()
+            sleep_preventer: Sleep preventer to use (default: a new one)
+            event_bus: Bus delivering activity events and carrying state
+                changes (default: a new one, delivering on the scheduler thread)
+            input_backend: Input hooks and simulated input (default: pynput)
+            scheduler: Scheduler running the timers of all components
+                (default: shared one)
+            activity_history: History the activity monitors record in while
+                record_activity_history is set (default: opened from the
+                user's configuration directory on first use)
+        """
+        self.settings = settings
+        self.scheduler = scheduler
+        self.sleep_preventer = sleep_preventer or SleepPreventer(scheduler=scheduler)
+        self.event_bus = event_bus or EventBus(scheduler)
+        self.input_backend = input_backend
+        self.activity_history = activity_history
+        self.event_bus.subscribe(USER_INACTIVE, self.on_user_inactive)
+        self.event_bus.subscribe(USER_ACTIVE, self.on_user_active)
+        self.activity_monitor: Optional[ActivityMonitor] = None
+        self.mouse_mover: Optional[MouseMover] = None
+        self.strategy_engine: Optional[StrategyEngine] = None
+        self.idle_counter = None
+        self.last_error: Optional[str] = None
+        self._is_running = False
+        self._lock = threading.RLock()
+        self._on_warning_callback: Optional[Callable[[str], None]] = None
+        # Warnings raised with the lock held, passed on once it is released
+        self._pending_warnings: List[str] = []
+    
+    def set_warning_callback(self, callback: Callable[[str], None]) -> None:
+        """
+        Set callback for problems that do not stop the controller from running.
+        
+        It is called on the thread that started or reconfigured the
+        controller, after the controller lock is released, so it may block
+        (e.g. on a message box) without holding up status() or the events.
+        """
+        self._on_warning_callback = callback
+    
+    def _notify_state(self) -> None:
+        """Report a state change: started, stopped, restarted, user active or inactive."""
+        self.event_bus.post(STATE_CHANGED)
+    
+    def _warn(self, message: str) -> None:
+        """Report a non-fatal problem. Called with the lock held."""
+        logger.warning("%s", message)
+        self._pending_warnings.append(message)
+    
+    def _emit_warnings(self) -> None:
+        """Pass the warnings collected under the lock to the callback. Called without the lock."""
+        with self._lock:
+            warnings, self._pending_warnings = self._pending_warnings, []
+        if self._on_warning_callback:
+            for message in warnings:
+                self._on_warning_callback(message)
+    
+    def start(self) -> bool:
+        """
+        Start keeping the screen alive.
+        
+        Returns:
+            True if running afterwards; on failure `last_error` says why
+        """
+        with self._lock:
+            started = self._start()
+        get_metrics().counter("keeper.starts" if started else "keeper.start_failures").inc()
+        self._notify_state()
+        self._emit_warnings()
+        return started
+    
+    def _start(self) -> bool:
+        """Start with the lock held."""
+        if self._is_running:
+            return True
+        
+        self.last_error = None
+        
+        # Prevent sleep if enabled
+        if self.settings.values.prevent_sleep:
+            if not self.sleep_preventer.prevent_sleep():
+                self._warn("Failed to prevent system sleep. Mouse movement will still work.")
+        
+        # Pick the cheapest way of keeping the screen on
+        self.strategy_engine = StrategyEngine.for_mode(
+            self.sleep_preventer,
+            self.settings.values.mouse_movement_interval,
+            self.settings.values.simulation_mode,
+            self.settings.values.prevent_sleep
+        )
+        strategy = self.strategy_engine.select()
+        if strategy is None:
+            self.last_error = "No keep-alive method works on this system."
+            self.strategy_engine = None
+            self.sleep_preventer.allow_sleep()
+            return False
+        
+        # Only periodic strategies need input monitoring and simulation
+        self._is_running = True
+        if strategy.is_periodic and not self.start_simulation(strategy.mode):
+            self._stop()
+            self.last_error = "Failed to start mouse movement."
+            return False
+        
+        return True
+    
+    def start_simulation(self, mode: str) -> bool:
+        """
+        Start activity monitoring and simulation.
+        
+        Args:
+            mode: MouseMover simulation mode
+        
+        Returns:
+            False if simulation could not be started
+        """
+        # Setup activity monitoring if enabled
+        if self.settings.values.use_activity_detection:
+            monitor = self.create_activity_monitor()
+            monitor.set_inactivity_callback(functools.partial(self.event_bus.post, USER_INACTIVE, monitor))
+            monitor.set_activity_callback(functools.partial(self.event_bus.post, USER_ACTIVE, monitor))
+            self.activity_monitor = monitor
+            
+            if not self.activity_monitor.start():
+                self._warn("Failed to start activity monitoring. Mouse will move continuously.")
+                self.activity_monitor = None
+        
+        # Setup mouse mover with selected simulation mode
+        self.mouse_mover = MouseMover(
+            interval=self.settings.values.mouse_movement_interval,
+            mode=mode,
+            adaptive=self.settings.values.adaptive_interval,
+            idle_timeout=self.settings.values.system_idle_timeout or None,
+            safety_margin=self.settings.values.idle_safety_margin,
+            scheduler=self.scheduler,
+            input_backend=self.input_backend
+        )
+        
+        # Start mouse mover based on activity detection
+        if self.activity_monitor:
+            monitor = self.activity_monitor
+            self.mouse_mover.set_simulation_callback(monitor.note_synthetic_input)
+            self.mouse_mover.set_activity_source(lambda: monitor.time_since_activity)
+            # Only move when inactive
+            return True  # Will be started in on_user_inactive callback
+        
+        # Move continuously, skipping simulations while the user is active
+        self.idle_counter = open_idle_counter()
+        if self.idle_counter:
+            counter = self.idle_counter
+            self.mouse_mover.set_activity_source(lambda: idle_seconds(counter))
+        return self.mouse_mover.start()
+    
+    def create_activity_monitor(self) -> ActivityMonitor:
+        """Create the activity monitor for the configured backend."""
+        backend = self.settings.values.activity_backend
+        timeout = self.settings.values.inactivity_timeout
+        history = self.open_activity_history()
+        
+        # The idle counter avoids global input hooks where the system has one
+        if backend == "idle" or (backend == "auto" and IdleActivityMonitor.is_available()):
+            return IdleActivityMonitor(inactivity_timeout=timeout, scheduler=self.scheduler,
+                                       history=history)
+        
+        return ActivityMonitor(
+            inactivity_timeout=timeout,
+            coalesce_window=self.settings.values.activity_coalesce_window,
+            scheduler=self.scheduler,
+            input_backend=self.input_backend,
+            history=history
+        )
+    
+    def open_activity_history(self) -> Optional[ActivityHistory]:
+        """Get the activity history if it is enabled, opening it on first use."""
+        if not self.settings.values.record_activity_history:
+            return None
+        
+        if self.activity_history is None:
+            try:
+                self.activity_history = ActivityHistory(default_history_path())
+            except OSError as e:
+                logger.warning("Activity history not recorded: %s", e)
+        return self.activity_history
+    
+    def stop(self) -> None:
+        """Stop keeping the screen alive."""
+        with self._lock:
+            self._stop()
+        self._notify_state()
+    
+    def _stop(self) -> None:
+        """Stop with the lock held."""
+        if not self._is_running:
+            return
+        
+        # Stop mouse mover
+        if self.mouse_mover:
+            self.mouse_mover.stop()
+            self.mouse_mover = None
+        
+        # Stop activity monitor
+        if self.activity_monitor:
+            self.activity_monitor.stop()
+            self.activity_monitor = None
+        
+        if self.idle_counter:
+            self.idle_counter.close()
+            self.idle_counter = None
+        
+        if self.activity_history is not None:
+            self.activity_history.flush()
+        
+        # Release the keep-alive strategy and allow sleep
+        if self.strategy_engine:
+            self.strategy_engine.release()
+            self.strategy_engine = None
+        self.sleep_preventer.allow_sleep()
+        
+        self._is_running = False
+    
+    def apply_settings(self, changes: Dict[str, Any]) -> None:
+        """
+        Apply changed settings to the running components.
+        
+        Timeout, interval and simulation mode changes are applied in place,
+        without restarting the monitor or simulator. Changes that need a
+        different setup restart the controller.
+        
+        Args:
+            changes: Changed setting keys and their new values, as passed to
+                Settings subscribers
+        """
+        with self._lock:
+            self._apply_settings(changes)
+        self._emit_warnings()
+    
+    def _apply_settings(self, changes: Dict[str, Any]) -> None:
+        """Apply settings with the lock held."""
+        if not self._is_running:
+            return
+        
+        mode = changes.get("simulation_mode")
+        mode_in_place = mode is None or (self.mouse_mover is not None and mode in MouseMover.MODES)
+        if self.RESTART_SETTINGS & changes.keys() or not mode_in_place:
+            logger.info("Restarting to apply settings")
+            get_metrics().counter("keeper.restarts").inc()
+            self._stop()
+            if not self._start():
+                logger.error("%s", self.last_error)
+            self._notify_state()
+            return
+        
+        if self.activity_monitor:
+            if "inactivity_timeout" in changes:
+                self.activity_monitor.set_timeout(changes["inactivity_timeout"])
+            if "activity_coalesce_window" in changes:
+                self.activity_monitor.set_coalesce_window(changes["activity_coalesce_window"])
+        
+        if self.mouse_mover:
+            if "mouse_movement_interval" in changes:
+                self.mouse_mover.set_interval(changes["mouse_movement_interval"])
+            if mode is not None:
+                self.mouse_mover.set_mode(mode)
+                self._reselect_strategy(mode)
+    
+    def _reselect_strategy(self, mode: str) -> None:
+        """Make the active strategy match a simulation mode applied in place. Called with the lock held."""
+        engine = StrategyEngine.for_mode(
+            self.sleep_preventer,
+            self.settings.values.mouse_movement_interval,
+            mode,
+            self.settings.values.prevent_sleep
+        )
+        # Periodic strategies only need the MouseMover, which already runs the mode
+        if engine.select() is None:
+            logger.warning("No keep-alive strategy for simulation mode %s", mode)
+            return
+        self.strategy_engine.release()
+        self.strategy_engine = engine
+        self._notify_state()
+    
+    def on_user_inactive(self, monitor: Optional[ActivityMonitor] = None) -> None:
+        """
+        Called when user becomes inactive.
+        
+        Args:
+            monitor: Monitor that reported it; reports of a monitor that has
+                since been replaced are ignored
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if monitor is not None and monitor is not self.activity_monitor:
+                return
+            if self.mouse_mover and not self.mouse_mover.is_running:
+                idle_elapsed = self.activity_monitor.time_since_activity if self.activity_monitor else 0.0
+                self.mouse_mover.start(idle_elapsed=idle_elapsed)
+        self._record_transition("keeper.user_inactive", start)
+    
+    def on_user_active(self, monitor: Optional[ActivityMonitor] = None) -> None:
+        """
+        Called when user becomes active.
+        
+        Args:
+            monitor: Monitor that reported it; reports of a monitor that has
+                since been replaced are ignored
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if monitor is not None and monitor is not self.activity_monitor:
+                return
+            if self.mouse_mover and self.mouse_mover.is_running:
+                self.mouse_mover.stop()
+        self._record_transition("keeper.user_active", start)
+    
+    def _record_transition(self, name: str, start: float) -> None:
+        """Count an activity state transition, record how long it took and report it."""
+        metrics = get_metrics()
+        metrics.counter(name).inc()
+        metrics.histogram("keeper.transition_seconds").observe(time.perf_counter() - start)
+        self._notify_state()
+    
+    @property
+    def is_running(self) -> bool:
+        """Check if the controller is keeping the screen alive."""
+        return self._is_running
+    
+    @property
+    def strategy(self) -> Optional[KeepAliveStrategy]:
+        """Get the active keep-alive strategy."""
+        return self.strategy_engine.active if self.strategy_engine else None
+    
+    def status(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the controller state.
+        
+        Returns:
+            running, strategy (name or None), user_inactive, simulating and
+            last_error
+        """
+        with self._lock:
+            strategy = self.strategy
+            return {
+                "running": self._is_running,
+                "strategy": strategy.name if strategy else None,
+                "user_inactive": bool(self.activity_monitor and self.activity_monitor.is_inactive),
+                "simulating": bool(self.mouse_mover and self.mouse_mover.is_running),
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,214 @@
+"""
+Metrics module.
+In-process counters and histograms of the keep-alive internals, with JSON
+snapshots written to a file.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, for latencies from microseconds to seconds
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Counter:
+    """Monotonically increasing count."""
+    
+    __slots__ = ("name", "_value", "_lock")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: int = 1) -> None:
+        """Add to the count."""
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> int:
+        """Get the count."""
+        return self._value
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+    
+    __slots__ = ("name", "bounds", "_counts", "_count", "_sum", "_min", "_max", "_lock")
+    
+    def __init__(self, name: str, bounds: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            name: Metric name
+            bounds: Sorted upper bounds of the buckets; larger values go to
+                an overflow bucket
+        """
+        self.name = name
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+    
+    def snapshot(self) -> dict:
+        """Get count, sum, extremes and bucket counts."""
+        with self._lock:
+            buckets = {str(bound): count for bound, count in zip(self.bounds, self._counts)}
+            buckets["+Inf"] = self._counts[-1]
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "min": self._min,
+                "max": self._max,
+                "buckets": buckets,
+            }
+
+
+class MetricsRegistry:
+    """
+    Named counters, histograms and gauges.
+    
+    Counters and histograms are created on first use and then updated by the
+    components; gauges are functions read when a snapshot is taken, for
+    values a component already keeps.
+    """
+    
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+    
+    def counter(self, name: str) -> Counter:
+        """Get the counter of a name, creating it on first use."""
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = Counter(name)
+            return counter
+    
+    def histogram(self, name: str, bounds: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get the histogram of a name, creating it with `bounds` on first use."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name, bounds)
+            return histogram
+    
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Report the value returned by `read` under a name, replacing an earlier gauge."""
+        with self._lock:
+            self._gauges[name] = read
+    
+    def snapshot(self) -> dict:
+        """Get the current value of every metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+        
+        gauge_values = {}
+        for name, read in gauges.items():
+            try:
+                gauge_values[name] = read()
+            except Exception as e:
+                logger.warning("Error reading gauge %s: %s", name, e)
+        
+        return {
+            "timestamp": time.time(),
+            "counters": {name: counter.value for name, counter in sorted(counters.items())},
+            "gauges": dict(sorted(gauge_values.items())),
+            "histograms": {name: h.snapshot() for name, h in sorted(histograms.items())},
+        }
+    
+    def write_snapshot(self, path: str) -> bool:
+        """
+        Write a snapshot to a JSON file, replacing it atomically.
+        
+        Returns:
+            True if written
+        """
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.error("Error writing metrics to %s: %s", path, e)
+            return False
+
+
+class SnapshotWriter:
+    """Writes metrics snapshots to a file every `interval` seconds."""
+    
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 60.0,
+                 scheduler: Optional[Scheduler] = None):
+        """
+        Initialize writer.
+        
+        Args:
+            registry: Metrics to write
+            path: Snapshot file
+            interval: Seconds between two snapshots
+            scheduler: Scheduler running the writes (default: shared one)
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._scheduler = scheduler or get_scheduler()
+        self._job: Optional[Job] = None
+    
+    def start(self) -> None:
+        """Write a snapshot now and then every interval."""
+        if self._job is None:
+            self._job = self._scheduler.schedule(0, self._write)
+    
+    def _write(self) -> float:
+        """Write one snapshot; runs on the scheduler thread."""
+        self.registry.write_snapshot(self.path)
+        return self.interval
+    
+    def stop(self) -> None:
+        """Stop writing and write a last snapshot."""
+        self._scheduler.cancel(self._job)
+        self._job = None
+        self.registry.write_snapshot(self.path)
+
+
+_shared_registry = MetricsRegistry()
+_shared_registry.gauge("scheduler.wakeups", lambda: get_scheduler().wakeups)
+_shared_registry.gauge("scheduler.wakeups_per_hour", lambda: get_scheduler().wakeups_per_hour)
+_shared_registry.gauge("scheduler.jobs_run", lambda: get_scheduler().jobs_run)
+_shared_registry.gauge("scheduler.pending_jobs", lambda: get_scheduler().pending_jobs)
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the registry shared by all components."""
+    return _shared_registry
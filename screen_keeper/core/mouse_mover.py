@@ -3,12 +3,18 @@ Mouse movement module.
 Moves mouse cursor to prevent screen from turning off.
 """
 
-import time
-import threading
+import logging
 import random
-from typing import Optional
-from pynput.mouse import Controller as MouseController
-from pynput.keyboard import Controller as KeyboardController, Key
+from typing import Callable, Optional
+
+from screen_keeper.core.clock import Clock
+from screen_keeper.core.idle_timeout import detect_idle_timeout
+from screen_keeper.core.input_backend import InputBackend, PynputBackend
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+from screen_keeper.core.x11 import X11Display
+
+logger = logging.getLogger(__name__)
 
 
 class MouseMover:
@@ -18,39 +24,111 @@ class MouseMover:
     MODE_MOUSE = "mouse"
     MODE_KEYBOARD = "keyboard"
     MODE_BOTH = "both"
+    MODE_SCREENSAVER = "screensaver"
+    MODES = (MODE_MOUSE, MODE_KEYBOARD, MODE_BOTH, MODE_SCREENSAVER)
+    
+    # Shortest interval used in adaptive mode
+    MIN_ADAPTIVE_INTERVAL = 5.0
+    
+    # Seconds between moving away and back, or between the two Scroll Lock toggles
+    INPUT_PAUSE = 0.1
     
-    def __init__(self, interval: float = 30.0, movement_distance: int = 1, mode: str = MODE_BOTH):
+    def __init__(self, interval: float = 30.0, movement_distance: int = 1, mode: str = MODE_BOTH,
+                 clock: Optional[Clock] = None, adaptive: bool = False,
+                 idle_timeout: Optional[float] = None, safety_margin: float = 10.0,
+                 scheduler: Optional[Scheduler] = None, input_backend: Optional[InputBackend] = None):
         """
         Initialize activity simulator.
         
         Args:
             interval: Time in seconds between activity simulations
             movement_distance: Distance in pixels to move mouse (default: 1 pixel)
-            mode: Simulation mode - "mouse", "keyboard", or "both" (default: "both")
+            mode: Simulation mode - "mouse", "keyboard", "both" or "screensaver"
+                (X11 screensaver timer reset, no input injected) (default: "both")
+            clock: Time source (default: the scheduler clock)
+            adaptive: Schedule each simulation just before the system idle
+                timeout instead of every `interval` seconds
+            idle_timeout: System idle timeout in seconds for adaptive mode;
+                detected from the system when None
+            safety_margin: Seconds before the idle timeout to simulate at
+            scheduler: Scheduler running the simulations (default: shared one)
+            input_backend: Sink of simulated input (default: pynput)
         """
         self.interval = interval
+        self._input_backend = input_backend or PynputBackend()
+        self._scheduler = scheduler or get_scheduler()
+        self._clock = clock or self._scheduler.clock
+        self.adaptive = adaptive
+        self.idle_timeout = idle_timeout
+        self.safety_margin = safety_margin
+        self._last_reset_ns = 0
+        self._suspended_mark = 0
+        self._expected_ns = 0
+        self._on_simulated_callback: Optional[Callable[[], None]] = None
+        self._activity_source: Optional[Callable[[], Optional[float]]] = None
+        self._skipped_simulations = 0
         self.movement_distance = movement_distance
         self.mode = mode
         self._is_running = False
-        self._thread: Optional[threading.Thread] = None
-        self._mouse = MouseController()
-        self._keyboard = KeyboardController()
+        self._job: Optional[Job] = None
+        # Input controllers, created on start for the modes that need them
+        self._mouse = None
+        self._keyboard = None
+        self._scroll_lock = None
         self._original_position: Optional[tuple] = None
+        self._x11: Optional[X11Display] = None
         
-    def start(self) -> bool:
-        """Start simulating activity periodically."""
+    def set_simulation_callback(self, callback: Callable[[], None]) -> None:
+        """Set callback to be called after each activity simulation."""
+        self._on_simulated_callback = callback
+    
+    def set_activity_source(self, source: Optional[Callable[[], Optional[float]]]) -> None:
+        """
+        Set the source of real user activity.
+        
+        Args:
+            source: Function returning seconds since the last real input (or
+                None if unknown), e.g. from an ActivityMonitor or the system
+                idle counter.
+                Simulations are skipped while the user was active since the
+                previous one.
+        """
+        self._activity_source = source
+    
+    def start(self, idle_elapsed: float = 0.0) -> bool:
+        """
+        Start simulating activity periodically.
+        
+        Args:
+            idle_elapsed: Seconds the user has already been idle; in adaptive
+                mode the first simulation is brought forward by this amount
+        """
         if self._is_running:
             return False
         
         try:
+            if self.adaptive and self.idle_timeout is None:
+                # 0 means unknown, so detection is not retried on every start
+                self.idle_timeout = detect_idle_timeout() or 0.0
+                logger.info("Detected system idle timeout: %ss", self.idle_timeout)
+            
+            if self.mode == self.MODE_SCREENSAVER:
+                self._x11 = X11Display.open()
+                if self._x11 is None:
+                    logger.error("Error starting activity simulator: no X11 display")
+                    return False
+            
+            self._open_controllers()
             self._is_running = True
-            self._original_position = self._mouse.position
-            self._thread = threading.Thread(target=self._activity_loop, daemon=True)
-            self._thread.start()
-            print(f"Activity simulator started (mode: {self.mode})")
+            self._last_reset_ns = self._clock.now_ns()
+            if self.adaptive:
+                self._last_reset_ns -= int(idle_elapsed * 1e9)
+            self._original_position = self._mouse.position if self._mouse is not None else None
+            self._job = self._scheduler.schedule(self._arm(), self._tick)
+            logger.info("Activity simulator started (mode: %s)", self.mode)
             return True
         except Exception as e:
-            print(f"Error starting activity simulator: {e}")
+            logger.error("Error starting activity simulator: %s", e)
             self._is_running = False
             return False
     
@@ -60,41 +138,125 @@ class MouseMover:
             return False
         
         self._is_running = False
+        self._scheduler.cancel(self._job)
+        self._job = None
         
         try:
-            if self._thread:
-                self._thread.join(timeout=2.0)
-            
             # Return mouse to original position if possible
             if self._original_position and self.mode in [self.MODE_MOUSE, self.MODE_BOTH]:
                 try:
                     self._mouse.position = self._original_position
                 except:
                     pass
+            
+            if self._x11:
+                self._x11.close()
+                self._x11 = None
         except Exception as e:
-            print(f"Error stopping activity simulator: {e}")
+            logger.error("Error stopping activity simulator: %s", e)
         
-        print("Activity simulator stopped")
+        logger.info("Activity simulator stopped")
         return True
     
-    def _activity_loop(self) -> None:
-        """Main loop that simulates activity periodically."""
-        while self._is_running:
-            time.sleep(self.interval)
+    def _open_controllers(self) -> None:
+        """
+        Create the input controllers the current mode needs.
+        
+        Only created on demand, since the pynput backend connects to the
+        display server and the screensaver mode never uses it.
+        """
+        if self.mode in (self.MODE_MOUSE, self.MODE_BOTH) and self._mouse is None:
+            self._mouse = self._input_backend.mouse_controller()
+        
+        if self.mode in (self.MODE_KEYBOARD, self.MODE_BOTH) and self._keyboard is None:
+            self._keyboard = self._input_backend.keyboard_controller()
+            self._scroll_lock = self._input_backend.scroll_lock_key
+    
+    def _arm(self) -> float:
+        """Get the delay until the next simulation and remember when it is due."""
+        delay = self._next_delay()
+        self._suspended_mark = self._clock.suspended_ns()
+        self._expected_ns = self._clock.now_ns() + int(delay * 1e9)
+        return delay
+    
+    def _tick(self) -> Optional[float]:
+        """
+        Simulate activity once; runs on the scheduler thread.
+        
+        Returns:
+            Delay in seconds until the next simulation
+        """
+        clock = self._clock
+        
+        # Right after a resume, restart the interval instead of injecting
+        if clock.suspend_gap_ns(self._suspended_mark, self._expected_ns):
+            self._last_reset_ns = clock.now_ns()
+            get_metrics().counter("simulations.after_resume_skipped").inc()
+            return self._arm()
+        
+        # Real input already reset the idle timer, wait a full interval from it
+        last_input_ns = self._last_input_ns()
+        # 0 means unknown, not input at time 0, which an adaptive start with
+        # idle_elapsed can move the reset time before
+        if last_input_ns and last_input_ns > self._last_reset_ns:
+            self._last_reset_ns = last_input_ns
+            self._skipped_simulations += 1
+            get_metrics().counter("simulations.user_active_skipped").inc()
+            return self._arm()
+        
+        try:
+            # Simulate activity based on mode
+            if self.mode in [self.MODE_KEYBOARD, self.MODE_BOTH]:
+                self._simulate_keyboard()
             
-            if not self._is_running:
-                break
+            if self.mode in [self.MODE_MOUSE, self.MODE_BOTH]:
+                self._simulate_mouse()
             
-            try:
-                # Simulate activity based on mode
-                if self.mode in [self.MODE_KEYBOARD, self.MODE_BOTH]:
-                    self._simulate_keyboard()
+            if self.mode == self.MODE_SCREENSAVER:
+                self._reset_screensaver()
+            
+            if self._on_simulated_callback:
+                self._on_simulated_callback()
                 
-                if self.mode in [self.MODE_MOUSE, self.MODE_BOTH]:
-                    self._simulate_mouse()
-                    
-            except Exception as e:
-                print(f"Error simulating activity: {e}")
+        except Exception as e:
+            logger.error("Error simulating activity: %s", e)
+        
+        # Set after simulating, so our own input is not taken for the user's
+        self._last_reset_ns = clock.now_ns()
+        return self._arm()
+    
+    def _last_input_ns(self) -> int:
+        """Get the clock time of the last real input, 0 if unknown."""
+        if self._activity_source is None:
+            return 0
+        
+        try:
+            idle = self._activity_source()
+        except Exception as e:
+            logger.error("Error reading user activity: %s", e)
+            return 0
+        
+        if idle is None:
+            return 0
+        return self._clock.now_ns() - int(idle * 1e9)
+    
+    def _next_delay(self) -> float:
+        """Get seconds until the next simulation is due."""
+        elapsed = (self._clock.now_ns() - self._last_reset_ns) / 1e9
+        return max(self.effective_interval - elapsed, 0.0)
+    
+    @property
+    def effective_interval(self) -> float:
+        """
+        Get the time in seconds between simulations.
+        
+        In adaptive mode this is the idle timeout minus the safety margin, so
+        each simulation lands just before the screen would blank. Falls back
+        to `interval` when the idle timeout is unknown.
+        """
+        if not self.adaptive or not self.idle_timeout:
+            return self.interval
+        return max(self.idle_timeout - self.safety_margin, self.MIN_ADAPTIVE_INTERVAL)
     
     def _simulate_keyboard(self) -> None:
         """
@@ -103,14 +265,16 @@ class MouseMover:
         """
         try:
             # Toggle Scroll Lock twice (on then off) to return to original state
-            self._keyboard.press(Key.scroll_lock)
-            self._keyboard.release(Key.scroll_lock)
-            time.sleep(0.1)
-            self._keyboard.press(Key.scroll_lock)
-            self._keyboard.release(Key.scroll_lock)
-            print("Keyboard activity simulated (Scroll Lock toggled)")
+            self._keyboard.press(self._scroll_lock)
+            self._keyboard.release(self._scroll_lock)
+            self._clock.sleep(self.INPUT_PAUSE)
+            self._keyboard.press(self._scroll_lock)
+            self._keyboard.release(self._scroll_lock)
+            logger.debug("Keyboard activity simulated (Scroll Lock toggled)")
+            get_metrics().counter("simulations.keyboard").inc()
         except Exception as e:
-            print(f"Error simulating keyboard activity: {e}")
+            logger.error("Error simulating keyboard activity: %s", e)
+            get_metrics().counter("simulations.errors").inc()
     
     def _simulate_mouse(self) -> None:
         """
@@ -128,29 +292,69 @@ class MouseMover:
             self._mouse.position = (new_x, new_y)
             
             # Move back immediately to original position
-            time.sleep(0.1)
+            self._clock.sleep(self.INPUT_PAUSE)
             self._mouse.position = current_pos
-            print("Mouse activity simulated (1 pixel movement)")
+            logger.debug("Mouse activity simulated (%s pixel movement)", self.movement_distance)
+            get_metrics().counter("simulations.mouse").inc()
             
         except Exception as e:
-            print(f"Error simulating mouse activity: {e}")
+            logger.error("Error simulating mouse activity: %s", e)
+            get_metrics().counter("simulations.errors").inc()
+    
+    def _reset_screensaver(self) -> None:
+        """
+        Reset the X server screensaver timer.
+        
+        Has the same effect on blanking as real input, without moving the
+        cursor or touching the keyboard state.
+        """
+        try:
+            self._x11.reset_screensaver()
+            logger.debug("Screensaver timer reset")
+            get_metrics().counter("simulations.screensaver").inc()
+        except Exception as e:
+            logger.error("Error resetting screensaver: %s", e)
+            get_metrics().counter("simulations.errors").inc()
     
     def set_interval(self, interval: float) -> None:
         """Update activity simulation interval."""
         self.interval = interval
+        if self._job is not None:
+            self._scheduler.reschedule(self._job, self._arm())
     
     def set_mode(self, mode: str) -> None:
         """
         Update simulation mode.
         
         Args:
-            mode: "mouse", "keyboard", or "both"
+            mode: "mouse", "keyboard", "both" or "screensaver"
         """
-        if mode in [self.MODE_MOUSE, self.MODE_KEYBOARD, self.MODE_BOTH]:
-            self.mode = mode
-            print(f"Simulation mode changed to: {mode}")
-        else:
-            print(f"Invalid mode: {mode}. Using current mode: {self.mode}")
+        if mode not in self.MODES:
+            logger.warning("Invalid mode: %s. Using current mode: %s", mode, self.mode)
+            return
+        
+        if self._is_running and mode == self.MODE_SCREENSAVER and self._x11 is None:
+            # Opened before the mode changes, so the next simulation finds it
+            self._x11 = X11Display.open()
+            if self._x11 is None:
+                logger.error("Cannot change simulation mode to %s: no X11 display", mode)
+                return
+        
+        self.mode = mode
+        if self._is_running:
+            self._open_controllers()
+            if self._original_position is None and self._mouse is not None:
+                # Restored on stop, as if the mode had been set at start
+                self._original_position = self._mouse.position
+            if mode != self.MODE_SCREENSAVER and self._x11 is not None:
+                self._x11.close()
+                self._x11 = None
+        logger.info("Simulation mode changed to: %s", mode)
+    
+    @property
+    def skipped_simulations(self) -> int:
+        """Number of simulations skipped because the user was active."""
+        return self._skipped_simulations
     
     @property
     def is_running(self) -> bool:
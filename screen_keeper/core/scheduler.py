@@ -0,0 +1,263 @@
+"""
+Scheduler module.
+Runs the periodic work of all core components on one shared thread.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from screen_keeper.core.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    A scheduled callback.
+    
+    The callback returns the delay in seconds until it should run again, or
+    None when it is done; the job is finished then.
+    """
+    
+    __slots__ = ("callback", "deadline_ns", "cancelled", "finished", "_seq")
+    
+    def __init__(self, callback: Callable[[], Optional[float]], deadline_ns: int, seq: int):
+        self.callback = callback
+        self.deadline_ns = deadline_ns
+        self.cancelled = False
+        self.finished = False
+        self._seq = seq
+    
+    def __lt__(self, other: "Job") -> bool:
+        return (self.deadline_ns, self._seq) < (other.deadline_ns, other._seq)
+
+
+class Scheduler:
+    """
+    Heap based timer service with a single worker thread.
+    
+    Jobs whose deadlines fall within `coalesce_window` of the earliest one run
+    in the same wakeup. With no jobs scheduled the thread waits without a
+    timeout, so an idle scheduler never wakes up.
+    
+    A scheduler created with threaded=False on a VirtualClock has no thread;
+    run_until() runs its jobs on the calling thread in virtual time instead.
+    """
+    
+    def __init__(self, clock: Optional[Clock] = None, coalesce_window: float = 0.25,
+                 threaded: bool = True):
+        """
+        Initialize scheduler.
+        
+        Args:
+            clock: Time source (default: a new monotonic Clock)
+            coalesce_window: Seconds by which a job may run early to share a
+                wakeup with an earlier one
+            threaded: Run jobs on a worker thread; False leaves running them
+                to run_until()
+        """
+        self._clock = clock or Clock()
+        self._threaded = threaded
+        self._coalesce_window_ns = int(coalesce_window * 1e9)
+        self._heap: List[Job] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._started_ns = self._clock.now_ns()
+        self._wakeups = 0
+        self._jobs_run = 0
+    
+    @property
+    def clock(self) -> Clock:
+        """Get the time source of the scheduler."""
+        return self._clock
+    
+    def schedule(self, delay: float, callback: Callable[[], Optional[float]]) -> Job:
+        """
+        Run a callback after a delay.
+        
+        Args:
+            delay: Seconds until the first run
+            callback: Function to run on the scheduler thread; returns the
+                delay until its next run, or None to stop
+        
+        Returns:
+            Job handle, used to cancel or reschedule it
+        """
+        job = Job(callback, self._clock.now_ns() + int(delay * 1e9), next(self._seq))
+        with self._condition:
+            heapq.heappush(self._heap, job)
+            self._ensure_thread()
+            self._condition.notify()
+        return job
+    
+    def reschedule(self, job: Job, delay: float) -> None:
+        """
+        Move a job to run `delay` seconds from now.
+        
+        A job that is running is run again after the delay, whatever its
+        callback returns. Cancelled and finished jobs are left as they are.
+        """
+        with self._condition:
+            if job.cancelled or job.finished:
+                return
+            job.deadline_ns = self._clock.now_ns() + int(delay * 1e9)
+            if job in self._heap:
+                heapq.heapify(self._heap)
+            else:
+                heapq.heappush(self._heap, job)
+            self._condition.notify()
+    
+    def cancel(self, job: Optional[Job]) -> None:
+        """Cancel a job. A run already in progress is not interrupted."""
+        if job is None:
+            return
+        with self._condition:
+            job.cancelled = True
+            # Leave the entry in the heap, it is dropped when it comes up
+    
+    def _ensure_thread(self) -> None:
+        """Start the worker thread on first use."""
+        if not self._threaded:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="screen-keeper-scheduler",
+                                            daemon=True)
+            self._thread.start()
+    
+    def _pop_due(self) -> Tuple[List[Job], Optional[int]]:
+        """
+        Remove the jobs that are due. Called with the lock held.
+        
+        Returns:
+            Due jobs, and the time in nanoseconds until the next deadline
+            (None if nothing else is scheduled)
+        """
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+        if not heap:
+            return [], None
+        
+        now_ns = self._clock.now_ns()
+        if heap[0].deadline_ns > now_ns:
+            return [], heap[0].deadline_ns - now_ns
+        
+        due = []
+        horizon_ns = now_ns + self._coalesce_window_ns
+        while heap and heap[0].deadline_ns <= horizon_ns:
+            job = heapq.heappop(heap)
+            if not job.cancelled:
+                due.append(job)
+        return due, None
+    
+    def _run_jobs(self, jobs: List[Job]) -> None:
+        """Run due jobs and re-arm those that ask for it."""
+        for job in jobs:
+            if job.cancelled:
+                continue
+            try:
+                delay = job.callback()
+            except Exception as e:
+                logger.error("Error in scheduled job %s: %s", job.callback, e)
+                delay = None
+            
+            self._jobs_run += 1
+            with self._condition:
+                # A job rescheduled while it ran is already back in the heap
+                if job in self._heap:
+                    continue
+                if delay is None:
+                    job.finished = True
+                elif not job.cancelled:
+                    job.deadline_ns = self._clock.now_ns() + int(delay * 1e9)
+                    heapq.heappush(self._heap, job)
+    
+    def _run(self) -> None:
+        """Worker thread loop."""
+        while True:
+            with self._condition:
+                due, wait_ns = self._pop_due()
+                if not due:
+                    self._condition.wait(None if wait_ns is None else wait_ns / 1e9)
+                    continue
+                self._wakeups += 1
+            self._run_jobs(due)
+    
+    def run_until(self, deadline_ns: int) -> int:
+        """
+        Run the jobs due up to a point in time on the calling thread.
+        
+        Only for schedulers without a thread, on a VirtualClock. The clock is
+        moved to each wakeup in turn, so every job sees the time it would
+        have run at, and is left at `deadline_ns`.
+        
+        Args:
+            deadline_ns: Clock time in nanoseconds to run up to
+        
+        Returns:
+            Number of wakeups
+        """
+        if self._threaded:
+            raise RuntimeError("a threaded scheduler runs its jobs by itself")
+        
+        wakeups = 0
+        while True:
+            with self._condition:
+                heap = self._heap
+                while heap and heap[0].cancelled:
+                    heapq.heappop(heap)
+                if not heap or heap[0].deadline_ns > deadline_ns:
+                    break
+                self._clock.advance_to_ns(heap[0].deadline_ns)
+                due, _ = self._pop_due()
+                self._wakeups += 1
+            self._run_jobs(due)
+            wakeups += 1
+        
+        self._clock.advance_to_ns(deadline_ns)
+        return wakeups
+    
+    def advance(self, seconds: float) -> int:
+        """Run the jobs due within the next `seconds`, see run_until()."""
+        return self.run_until(self._clock.now_ns() + int(seconds * 1e9))
+    
+    @property
+    def pending_jobs(self) -> int:
+        """Number of scheduled jobs."""
+        with self._condition:
+            return sum(1 for job in self._heap if not job.cancelled)
+    
+    @property
+    def jobs_run(self) -> int:
+        """Number of job runs."""
+        return self._jobs_run
+    
+    @property
+    def wakeups(self) -> int:
+        """Number of wakeups that ran at least one job."""
+        return self._wakeups
+    
+    @property
+    def wakeups_per_hour(self) -> float:
+        """Average number of wakeups per hour since the scheduler was created."""
+        elapsed_ns = self._clock.now_ns() - self._started_ns
+        if elapsed_ns <= 0:
+            return 0.0
+        return self._wakeups * 3600e9 / elapsed_ns
+
+
+_shared_scheduler: Optional[Scheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """Get the scheduler shared by all core components."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = Scheduler()
+        return _shared_scheduler
@@ -0,0 +1,304 @@
+"""
+Simulation module.
+Replays input traces through the keep-alive controller in virtual time, so
+hours of activity take milliseconds and timeouts can be tuned offline.
+"""
+
+import os
+import random
+import tempfile
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.events import USER_ACTIVE, USER_INACTIVE
+from screen_keeper.core.input_backend import InputBackend, InputListener
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.scheduler import Scheduler
+
+# Input event kinds of a trace
+MOVE = "move"
+CLICK = "click"
+PRESS = "press"
+EVENT_KINDS = (MOVE, CLICK, PRESS)
+
+# An input event: seconds since the start of the trace, and its kind
+TraceEvent = Tuple[float, str]
+
+
+def load_trace(path: str) -> List[TraceEvent]:
+    """
+    Read a recorded input trace.
+    
+    The file has one event per line: seconds since the start of the
+    recording, optionally followed by the kind ("move", "click" or "press",
+    default "move"). Blank lines and lines starting with # are skipped.
+    
+    Raises:
+        ValueError: If a line cannot be parsed
+    """
+    events = []
+    with open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            kind = fields[1] if len(fields) > 1 else MOVE
+            if kind not in EVENT_KINDS:
+                raise ValueError(f"{path}:{number}: unknown event kind {kind!r}")
+            try:
+                events.append((float(fields[0]), kind))
+            except ValueError:
+                raise ValueError(f"{path}:{number}: invalid time {fields[0]!r}") from None
+    events.sort()
+    return events
+
+
+def synthetic_trace(duration: float, active_mean: float = 600.0, idle_mean: float = 300.0,
+                    event_interval: float = 2.0, seed: Optional[int] = None) -> List[TraceEvent]:
+    """
+    Generate a trace of alternating active and idle periods.
+    
+    Period lengths are exponentially distributed around their means; while
+    active, events arrive at exponentially distributed intervals as well.
+    
+    Args:
+        duration: Length of the trace in seconds
+        active_mean: Mean length of an active period in seconds
+        idle_mean: Mean length of an idle period in seconds
+        event_interval: Mean time between two events while active
+        seed: Random seed, for reproducible traces
+    """
+    rng = random.Random(seed)
+    events = []
+    t = 0.0
+    while t < duration:
+        end = min(t + rng.expovariate(1 / active_mean), duration)
+        while t < end:
+            events.append((t, rng.choice(EVENT_KINDS)))
+            t += rng.expovariate(1 / event_interval)
+        t = end + rng.expovariate(1 / idle_mean)
+    return events
+
+
+class SimulatedInput(InputBackend):
+    """
+    Input backend of a simulation.
+    
+    Delivers trace events to the input hooks and counts the simulated
+    inputs. With `echo` set, simulated inputs reach the hooks as well, as
+    they do with real global input hooks.
+    """
+    
+    def __init__(self, echo: bool = True):
+        self.echo = echo
+        self.mouse_moves = 0
+        self.key_presses = 0
+        self._callbacks: Optional[tuple] = None
+        self._position = (0, 0)
+    
+    def listen(self, on_move, on_click, on_press) -> InputListener:
+        self._callbacks = (on_move, on_click, on_press)
+        return _SimulatedListener(self)
+    
+    def mouse_controller(self) -> "SimulatedInput":
+        return self
+    
+    def keyboard_controller(self) -> "SimulatedInput":
+        return self
+    
+    @property
+    def scroll_lock_key(self) -> str:
+        return "scroll_lock"
+    
+    @property
+    def position(self) -> Tuple[int, int]:
+        return self._position
+    
+    @position.setter
+    def position(self, position: Tuple[int, int]) -> None:
+        self._position = position
+        self.mouse_moves += 1
+        if self.echo:
+            self.deliver(MOVE)
+    
+    def press(self, key: Any) -> None:
+        self.key_presses += 1
+        if self.echo:
+            self.deliver(PRESS)
+    
+    def release(self, key: Any) -> None:
+        pass
+    
+    @property
+    def injections(self) -> int:
+        """Number of simulated inputs; each moves the mouse or presses Scroll Lock twice."""
+        return self.mouse_moves // 2 + self.key_presses // 2
+    
+    def deliver(self, kind: str) -> None:
+        """Pass an input event to the hooks, if they are listening."""
+        if self._callbacks is None:
+            return
+        on_move, on_click, on_press = self._callbacks
+        if kind == MOVE:
+            on_move(*self._position)
+        elif kind == CLICK:
+            on_click(*self._position, "left", True)
+        else:
+            on_press("a")
+
+
+class _SimulatedListener(InputListener):
+    """Listener handle of a SimulatedInput."""
+    
+    def __init__(self, backend: SimulatedInput):
+        self._backend = backend
+    
+    def stop(self) -> None:
+        self._backend._callbacks = None
+
+
+class SimulationReport(NamedTuple):
+    """Outcome of a simulation run."""
+    
+    duration: float
+    input_events: int
+    injections: int
+    wasted_injections: int
+    wakeups: int
+    inactive_transitions: int
+    active_transitions: int
+    false_inactive_transitions: int
+    blank_gaps: int
+
+
+class KeepAliveSimulation:
+    """
+    Runs a KeepAliveController in virtual time against an input trace.
+    
+    The controller, its activity monitor and its simulator share a
+    VirtualClock and a Scheduler without a thread, driven from replay(), so
+    a run is deterministic and takes no real time. Activity is detected
+    through the input hooks of a SimulatedInput; sleep prevention is off.
+    """
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, echo: bool = True,
+                 screen_timeout: Optional[float] = None):
+        """
+        Initialize simulation.
+        
+        Args:
+            settings: Setting values to simulate, over the defaults;
+                simulation_mode must be "mouse", "keyboard" or "both"
+                (default: "mouse")
+            echo: Deliver simulated inputs to the input hooks, like real
+                global hooks do
+            screen_timeout: Display idle timeout in seconds; gaps without
+                any input longer than this are counted as blank screens
+        """
+        self.settings = {"simulation_mode": "mouse", **(settings or {})}
+        if self.settings["simulation_mode"] not in ("mouse", "keyboard", "both"):
+            raise ValueError("simulation_mode must be mouse, keyboard or both")
+        self.echo = echo
+        self.screen_timeout = screen_timeout
+    
+    def replay(self, trace: Iterable[TraceEvent], duration: Optional[float] = None) -> SimulationReport:
+        """
+        Run the controller against a trace.
+        
+        Args:
+            trace: Input events, sorted by time
+            duration: Seconds to simulate (default: until the last event)
+        
+        Returns:
+            Counts of what happened during the run
+        """
+        trace = list(trace)
+        if duration is None:
+            duration = trace[-1][0] if trace else 0.0
+        
+        clock = VirtualClock()
+        scheduler = Scheduler(clock, threaded=False)
+        backend = SimulatedInput(self.echo)
+        
+        with tempfile.TemporaryDirectory() as config_dir:
+            settings = Settings(os.path.join(config_dir, "config.json"), scheduler=scheduler)
+            settings.update({
+                **self.settings,
+                "prevent_sleep": False,
+                "use_activity_detection": True,
+                "activity_backend": "hooks",
+                "record_activity_history": False,
+            })
+            keeper = KeepAliveController(settings, input_backend=backend, scheduler=scheduler)
+            return self._run(keeper, scheduler, clock, backend, trace, duration)
+    
+    def _run(self, keeper: KeepAliveController, scheduler: Scheduler, clock: VirtualClock,
+             backend: SimulatedInput, trace: List[TraceEvent], duration: float) -> SimulationReport:
+        """Replay a trace through a controller that is not started yet."""
+        timeout_ns = int(keeper.settings.values.inactivity_timeout * 1e9)
+        # Clock times of the last real input and of the last input of any kind
+        last_real_ns = 0
+        last_input_ns = 0
+        counts = {"inactive": 0, "active": 0, "false_inactive": 0, "wasted": 0, "blank": 0}
+        
+        def note_input(now_ns: int) -> None:
+            nonlocal last_input_ns
+            if self.screen_timeout is not None and now_ns - last_input_ns > self.screen_timeout * 1e9:
+                counts["blank"] += 1
+            last_input_ns = now_ns
+        
+        def on_inactive(monitor) -> None:
+            counts["inactive"] += 1
+            if clock.now_ns() - last_real_ns < timeout_ns:
+                counts["false_inactive"] += 1
+        
+        def on_active(monitor) -> None:
+            counts["active"] += 1
+        
+        def on_simulated() -> None:
+            note_input(clock.now_ns())
+            if clock.now_ns() - last_real_ns < timeout_ns:
+                counts["wasted"] += 1
+        
+        keeper.event_bus.subscribe(USER_INACTIVE, on_inactive)
+        keeper.event_bus.subscribe(USER_ACTIVE, on_active)
+        if not keeper.start():
+            raise RuntimeError(f"Controller did not start: {keeper.last_error}")
+        
+        # The simulator lives until the controller stops; count its
+        # simulations before passing them on to the monitor as usual
+        monitor = keeper.activity_monitor
+        
+        def on_simulated_input() -> None:
+            on_simulated()
+            monitor.note_synthetic_input()
+        keeper.mouse_mover.set_simulation_callback(on_simulated_input)
+        
+        events = 0
+        for t, kind in trace:
+            if t > duration:
+                break
+            scheduler.run_until(int(t * 1e9))
+            last_real_ns = clock.now_ns()
+            note_input(last_real_ns)
+            backend.deliver(kind)
+            events += 1
+        
+        scheduler.run_until(int(duration * 1e9))
+        keeper.stop()
+        # Deliver the events of the stop
+        scheduler.run_until(clock.now_ns())
+        note_input(int(duration * 1e9))
+        
+        return SimulationReport(
+            duration=duration,
+            input_events=events,
+            injections=backend.injections,
+            wasted_injections=counts["wasted"],
+            wakeups=scheduler.wakeups,
+            inactive_transitions=counts["inactive"],
+            active_transitions=counts["active"],
+            false_inactive_transitions=counts["false_inactive"],
+            blank_gaps=counts["blank"],
+        )
@@ -3,28 +3,61 @@ Cross-platform sleep prevention module.
 Uses system APIs to prevent sleep on Windows and Linux.
 """
 
+import logging
 import platform
 import ctypes
-import threading
-from typing import Optional
+from typing import Callable, Optional
+
+from screen_keeper.core.dbus_inhibitor import DBusInhibitor
+from screen_keeper.core.metrics import get_metrics
+from screen_keeper.core.scheduler import Job, Scheduler, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# SetThreadExecutionState flags
+ES_CONTINUOUS = 0x80000000
+ES_SYSTEM_REQUIRED = 0x00000001
+ES_DISPLAY_REQUIRED = 0x00000002
 
 
 class SleepPreventer:
     """Prevents system from going to sleep."""
     
-    def __init__(self):
+    def __init__(self, system_bus: str = "SYSTEM", session_bus: str = "SESSION",
+                 scheduler: Optional[Scheduler] = None,
+                 inhibitor_factory: Optional[Callable[[], DBusInhibitor]] = None):
+        """
+        Initialize sleep preventer.
+        
+        Args:
+            system_bus: D-Bus bus for logind on Linux - "SYSTEM" or an address
+            session_bus: D-Bus bus for the screensaver on Linux - "SESSION" or an address
+            scheduler: Scheduler running the Windows reassertion (default: shared one)
+            inhibitor_factory: Creates the inhibitor taken on Linux (default: a
+                DBusInhibitor on the two buses)
+        """
         self.system = platform.system()
+        self.system_bus = system_bus
+        self.session_bus = session_bus
         self._handle: Optional[ctypes.c_void_p] = None
         self._is_active = False
-        self._timer: Optional[threading.Timer] = None
+        self._scheduler = scheduler or get_scheduler()
+        self._timer: Optional[Job] = None
         self._timer_interval = 30.0  # Reassert every 30 seconds
+        self._inhibitor: Optional[DBusInhibitor] = None
+        self._block_sleep = True
+        self._inhibitor_factory = inhibitor_factory or (
+            lambda: DBusInhibitor(system_bus=self.system_bus, session_bus=self.session_bus)
+        )
         
-    def prevent_sleep(self, reason: str = "Screen Keeper") -> bool:
+    def prevent_sleep(self, reason: str = "Screen Keeper", block_sleep: bool = True) -> bool:
         """
         Prevent system from sleeping.
         
         Args:
             reason: Reason for preventing sleep (used on Linux)
+            block_sleep: Also block system sleep; False only keeps the
+                display on (ScreenSaver inhibit, ES_DISPLAY_REQUIRED)
             
         Returns:
             True if successful, False otherwise
@@ -32,6 +65,7 @@ class SleepPreventer:
         if self._is_active:
             return True
             
+        self._block_sleep = block_sleep
         try:
             if self.system == "Windows":
                 return self._prevent_sleep_windows()
@@ -41,28 +75,30 @@ class SleepPreventer:
                 # macOS or other - not implemented
                 return False
         except Exception as e:
-            print(f"Error preventing sleep: {e}")
+            logger.error("Error preventing sleep: %s", e)
             return False
     
     def _prevent_sleep_windows(self) -> bool:
-        """Prevent sleep on Windows using SetThreadExecutionState."""
+        """
+        Prevent sleep on Windows using SetThreadExecutionState.
+        
+        The execution state belongs to the thread that sets it, and the
+        caller may be any thread, so it is only checked here and then held by
+        the scheduler thread, which also reasserts and finally resets it.
+        """
         try:
-            # ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
             # ES_DISPLAY_REQUIRED prevents display from turning off
             # ES_SYSTEM_REQUIRED prevents system from sleeping
-            ES_CONTINUOUS = 0x80000000
-            ES_SYSTEM_REQUIRED = 0x00000001
-            ES_DISPLAY_REQUIRED = 0x00000002
-            
-            # Set the execution state
-            ret = ctypes.windll.kernel32.SetThreadExecutionState(
-                ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
-            )
+            kernel32 = ctypes.windll.kernel32
+            ret = kernel32.SetThreadExecutionState(self._execution_state)
             if ret == 0:
-                print("SetThreadExecutionState failed - return value is 0")
+                logger.error("SetThreadExecutionState failed - return value is 0")
                 return False
+            # Undone on this thread, the scheduler thread takes over right away
+            kernel32.SetThreadExecutionState(ES_CONTINUOUS)
             
-            print(f"SetThreadExecutionState succeeded - return value: {ret}")
+            logger.info("SetThreadExecutionState succeeded - return value: %s", ret)
+            get_metrics().counter("inhibitor.acquisitions").inc()
             self._is_active = True
             
             # Start periodic reassertion timer for Windows 10/11 compatibility
@@ -70,79 +106,96 @@ class SleepPreventer:
             
             return True
         except Exception as e:
-            print(f"Windows sleep prevention failed: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Windows sleep prevention failed: %s", e)
             return False
     
     def _start_reassertion_timer(self):
-        """Start a timer to periodically reassert the execution state."""
+        """Schedule the assertion of the execution state, repeated periodically."""
         if self.system != "Windows":
             return
             
         # Cancel existing timer if any
-        if self._timer is not None:
-            self._timer.cancel()
+        self._scheduler.cancel(self._timer)
         
-        # Create and start new timer
-        self._timer = threading.Timer(self._timer_interval, self._reassert_execution_state)
-        self._timer.daemon = True
-        self._timer.start()
-        print(f"Started reassertion timer (interval: {self._timer_interval}s)")
+        self._timer = self._scheduler.schedule(0, self._reassert_execution_state)
+        logger.debug("Started reassertion timer (interval: %ss)", self._timer_interval)
     
-    def _reassert_execution_state(self):
-        """Periodically reassert the execution state flags."""
+    def _reassert_execution_state(self) -> Optional[float]:
+        """
+        Reassert the execution state flags; runs on the scheduler thread.
+        
+        Returns:
+            Delay until the next reassertion, None once sleep is allowed
+        """
         if not self._is_active:
-            return
+            return None
         
         try:
-            ES_CONTINUOUS = 0x80000000
-            ES_SYSTEM_REQUIRED = 0x00000001
-            ES_DISPLAY_REQUIRED = 0x00000002
-            
-            ret = ctypes.windll.kernel32.SetThreadExecutionState(
-                ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
-            )
+            ret = ctypes.windll.kernel32.SetThreadExecutionState(self._execution_state)
             
             if ret == 0:
-                print("WARNING: SetThreadExecutionState reassertion failed")
+                logger.warning("SetThreadExecutionState reassertion failed")
+                get_metrics().counter("inhibitor.reassertion_failures").inc()
             else:
-                print(f"SetThreadExecutionState reasserted successfully (return: {ret})")
+                logger.debug("SetThreadExecutionState reasserted successfully (return: %s)", ret)
+                get_metrics().counter("inhibitor.reassertions").inc()
             
-            # Schedule next reassertion
-            if self._is_active:
-                self._start_reassertion_timer()
-                
         except Exception as e:
-            print(f"Error during execution state reassertion: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error during execution state reassertion: %s", e)
+        
+        # Schedule next reassertion
+        return self._timer_interval if self._is_active else None
+    
+    @property
+    def _execution_state(self) -> int:
+        """Get the execution state flags to hold."""
+        flags = ES_CONTINUOUS | ES_DISPLAY_REQUIRED
+        return flags | ES_SYSTEM_REQUIRED if self._block_sleep else flags
+    
+    def _reset_execution_state(self) -> None:
+        """Clear the execution state flags; runs on the scheduler thread, which holds them."""
+        try:
+            ret = ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS)
+            if ret == 0:
+                logger.warning("SetThreadExecutionState reset failed")
+            else:
+                logger.info("SetThreadExecutionState reset successfully (return: %s)", ret)
+        except Exception as e:
+            logger.exception("Error resetting execution state: %s", e)
     
     def _prevent_sleep_linux(self, reason: str) -> bool:
-        """Prevent sleep on Linux using systemd/logind via DBus."""
+        """
+        Prevent sleep on Linux using systemd/logind via DBus.
+        
+        Holds a logind sleep/idle lock and a freedesktop ScreenSaver inhibit
+        until allow_sleep() is called. If neither can be taken, sleep
+        prevention relies on activity simulation.
+        """
         try:
-            # Try to use systemd-inhibit if available
-            import subprocess
-            result = subprocess.run(
-                ["which", "systemd-inhibit"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                # systemd-inhibit is available, but we can't easily control it from Python
-                # For now, we'll rely on mouse movement
-                # In a production app, you might want to use python-dbus
-                self._is_active = True
-                return True
+            inhibitor = self._inhibitor_factory()
+            if inhibitor.acquire(reason, sleep=self._block_sleep):
+                self._inhibitor = inhibitor
+                logger.info("D-Bus inhibitor acquired (sleep: %s, idle: %s)",
+                            inhibitor.holds_sleep_lock, inhibitor.holds_idle_lock)
+                get_metrics().counter("inhibitor.acquisitions").inc()
             else:
-                # Fallback: just mark as active, rely on mouse movement
-                self._is_active = True
-                return True
+                logger.info("No D-Bus inhibitor available, relying on activity simulation")
         except Exception as e:
-            print(f"Linux sleep prevention failed: {e}")
-            # Still mark as active, mouse movement will help
-            self._is_active = True
-            return True
+            logger.error("Linux sleep prevention failed: %s", e)
+        
+        # Mark as active either way, mouse movement will help
+        self._is_active = True
+        return True
+    
+    def _allow_sleep_linux(self) -> bool:
+        """Allow sleep on Linux by releasing the D-Bus inhibitor locks."""
+        if self._inhibitor is not None:
+            self._inhibitor.release()
+            self._inhibitor = None
+            logger.info("D-Bus inhibitor released")
+        
+        self._is_active = False
+        return True
     
     def allow_sleep(self) -> bool:
         """
@@ -158,42 +211,42 @@ class SleepPreventer:
             if self.system == "Windows":
                 return self._allow_sleep_windows()
             elif self.system == "Linux":
-                self._is_active = False
-                return True
+                return self._allow_sleep_linux()
             else:
                 return False
         except Exception as e:
-            print(f"Error allowing sleep: {e}")
+            logger.error("Error allowing sleep: %s", e)
             return False
     
     def _allow_sleep_windows(self) -> bool:
         """Allow sleep on Windows."""
-        try:
-            # Cancel the reassertion timer
-            if self._timer is not None:
-                self._timer.cancel()
-                self._timer = None
-                print("Cancelled reassertion timer")
-            
-            # Reset execution state to allow sleep
-            ES_CONTINUOUS = 0x80000000
-            ret = ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS)
-            
-            if ret == 0:
-                print("WARNING: SetThreadExecutionState reset failed")
-            else:
-                print(f"SetThreadExecutionState reset successfully (return: {ret})")
-            
-            self._is_active = False
-            return True
-        except Exception as e:
-            print(f"Windows sleep allowance failed: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        # Cancel the reassertion timer
+        if self._timer is not None:
+            self._scheduler.cancel(self._timer)
+            self._timer = None
+            logger.debug("Cancelled reassertion timer")
+        
+        # Reset execution state to allow sleep, on the thread that set it
+        self._is_active = False
+        self._scheduler.schedule(0, self._reset_execution_state)
+        return True
     
     @property
     def is_active(self) -> bool:
         """Check if sleep prevention is currently active."""
         return self._is_active
+    
+    @property
+    def blocks_idle(self) -> bool:
+        """
+        Check if the OS itself is told to keep the display on.
+        
+        When True, activity simulation is not needed to stop the screen from
+        blanking.
+        """
+        if not self._is_active:
+            return False
+        if self.system == "Windows":
+            return True  # ES_DISPLAY_REQUIRED
+        return self._inhibitor is not None and self._inhibitor.holds_idle_lock
 
@@ -0,0 +1,243 @@
+"""
+Keep-alive strategy module.
+Ranks the available ways to keep the screen on by cost and picks the cheapest
+one that works on this system.
+"""
+
+import logging
+import platform
+from typing import Dict, Iterable, List, NamedTuple, Optional, Type
+
+from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.sleep_preventer import SleepPreventer
+from screen_keeper.core.x11 import X11Display
+
+logger = logging.getLogger(__name__)
+
+
+class StrategyCost(NamedTuple):
+    """Runtime cost of a keep-alive strategy."""
+    
+    wakeups_per_hour: float
+    syscalls_per_wakeup: int
+    visible_side_effects: bool
+    
+    def rank(self) -> tuple:
+        """Sort key: invisible strategies first, then fewest syscalls per hour."""
+        return (self.visible_side_effects, self.wakeups_per_hour * self.syscalls_per_wakeup)
+
+
+class KeepAliveStrategy:
+    """
+    Base class for a way of keeping the screen on.
+    
+    Periodic strategies set `mode` to the MouseMover mode that performs their
+    work; the others keep the screen on by themselves once activated.
+    """
+    
+    name = ""
+    mode: Optional[str] = None
+    
+    def __init__(self, sleep_preventer: SleepPreventer, interval: float, block_sleep: bool = True):
+        """
+        Initialize strategy.
+        
+        Args:
+            sleep_preventer: Shared sleep preventer of the application
+            interval: Simulation interval in seconds, used for cost estimates
+            block_sleep: Whether the user wants system sleep prevented
+                (the prevent_sleep setting); without it a strategy may keep
+                the display on but must not block sleep
+        """
+        self.sleep_preventer = sleep_preventer
+        self.interval = interval
+        self.block_sleep = block_sleep
+    
+    @property
+    def is_periodic(self) -> bool:
+        """Check if the strategy needs a MouseMover running."""
+        return self.mode is not None
+    
+    def cost(self) -> StrategyCost:
+        """Get the estimated cost of the strategy."""
+        raise NotImplementedError
+    
+    def probe(self) -> bool:
+        """Check cheaply if the strategy can work on this system."""
+        return True
+    
+    def activate(self) -> bool:
+        """Activate the strategy. Returns True if it is now in effect."""
+        return True
+    
+    def deactivate(self) -> None:
+        """Undo activate()."""
+
+
+STRATEGIES: Dict[str, Type[KeepAliveStrategy]] = {}
+
+
+def register_strategy(cls: Type[KeepAliveStrategy]) -> Type[KeepAliveStrategy]:
+    """Class decorator adding a strategy to the registry."""
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+@register_strategy
+class InhibitorStrategy(KeepAliveStrategy):
+    """OS display inhibitor (SetThreadExecutionState or D-Bus ScreenSaver)."""
+    
+    name = "inhibitor"
+    
+    def __init__(self, sleep_preventer: SleepPreventer, interval: float, block_sleep: bool = True):
+        super().__init__(sleep_preventer, interval, block_sleep)
+        self._owns_preventer = False
+    
+    def cost(self) -> StrategyCost:
+        # Windows reasserts the execution state every 30 seconds
+        wakeups = 3600.0 / 30.0 if self.sleep_preventer.system == "Windows" else 0.0
+        return StrategyCost(wakeups, 1, False)
+    
+    def probe(self) -> bool:
+        return self.sleep_preventer.system in ("Windows", "Linux")
+    
+    def activate(self) -> bool:
+        if not self.sleep_preventer.is_active:
+            # Only the display inhibit, unless the user asked to prevent sleep
+            if not self.sleep_preventer.prevent_sleep(block_sleep=self.block_sleep):
+                return False
+            self._owns_preventer = True
+        
+        if self.sleep_preventer.blocks_idle:
+            return True
+        
+        self.deactivate()
+        return False
+    
+    def deactivate(self) -> None:
+        if self._owns_preventer:
+            self.sleep_preventer.allow_sleep()
+            self._owns_preventer = False
+
+
+@register_strategy
+class ScreensaverResetStrategy(KeepAliveStrategy):
+    """Periodic XResetScreenSaver call on the X server."""
+    
+    name = "screensaver"
+    mode = MouseMover.MODE_SCREENSAVER
+    
+    def cost(self) -> StrategyCost:
+        return StrategyCost(3600.0 / self.interval, 2, False)
+    
+    def probe(self) -> bool:
+        if platform.system() != "Linux":
+            return False
+        display = X11Display.open()
+        if display is None:
+            return False
+        display.close()
+        return True
+
+
+@register_strategy
+class KeyboardStrategy(KeepAliveStrategy):
+    """Synthetic Scroll Lock double toggle."""
+    
+    name = "keyboard"
+    mode = MouseMover.MODE_KEYBOARD
+    
+    def cost(self) -> StrategyCost:
+        return StrategyCost(3600.0 / self.interval, 4, True)
+
+
+@register_strategy
+class MouseStrategy(KeepAliveStrategy):
+    """Synthetic one pixel cursor move and return."""
+    
+    name = "mouse"
+    mode = MouseMover.MODE_MOUSE
+    
+    def cost(self) -> StrategyCost:
+        return StrategyCost(3600.0 / self.interval, 4, True)
+
+
+@register_strategy
+class BothStrategy(KeepAliveStrategy):
+    """Synthetic keyboard and mouse input together."""
+    
+    name = "both"
+    mode = MouseMover.MODE_BOTH
+    
+    def cost(self) -> StrategyCost:
+        return StrategyCost(3600.0 / self.interval, 8, True)
+
+
+class StrategyEngine:
+    """Selects the cheapest working keep-alive strategy."""
+    
+    # Simulation mode setting -> strategies the engine may choose from
+    MODE_CANDIDATES = {
+        "auto": ("inhibitor", "screensaver", "keyboard", "mouse"),
+        "mouse": ("mouse",),
+        "keyboard": ("keyboard",),
+        "both": ("both",),
+    }
+    
+    def __init__(self, sleep_preventer: SleepPreventer, interval: float,
+                 candidates: Optional[Iterable[str]] = None, block_sleep: bool = True):
+        """
+        Initialize strategy engine.
+        
+        Args:
+            sleep_preventer: Shared sleep preventer of the application
+            interval: Simulation interval in seconds
+            candidates: Names of the strategies to consider (default: all registered)
+            block_sleep: Whether system sleep may be blocked, see KeepAliveStrategy
+        """
+        names = STRATEGIES.keys() if candidates is None else candidates
+        self.strategies: List[KeepAliveStrategy] = [
+            STRATEGIES[name](sleep_preventer, interval, block_sleep) for name in names
+        ]
+        self.strategies.sort(key=lambda strategy: strategy.cost().rank())
+        self._active: Optional[KeepAliveStrategy] = None
+    
+    @classmethod
+    def for_mode(cls, sleep_preventer: SleepPreventer, interval: float,
+                 mode: str, block_sleep: bool = True) -> "StrategyEngine":
+        """Create an engine for the simulation mode and prevent sleep settings."""
+        candidates = cls.MODE_CANDIDATES.get(mode, cls.MODE_CANDIDATES["auto"])
+        return cls(sleep_preventer, interval, candidates, block_sleep)
+    
+    def select(self) -> Optional[KeepAliveStrategy]:
+        """
+        Activate the cheapest strategy that probes and activates successfully.
+        
+        Returns:
+            The active strategy, or None if none of them works
+        """
+        self.release()
+        
+        for strategy in self.strategies:
+            try:
+                if strategy.probe() and strategy.activate():
+                    logger.info("Keep-alive strategy selected: %s (%s)", strategy.name, strategy.cost())
+                    self._active = strategy
+                    return strategy
+            except Exception as e:
+                logger.warning("Keep-alive strategy %s failed: %s", strategy.name, e)
+            
+            logger.debug("Keep-alive strategy unavailable: %s", strategy.name)
+        
+        return None
+    
+    def release(self) -> None:
+        """Deactivate the active strategy, if any."""
+        if self._active is not None:
+            self._active.deactivate()
+            self._active = None
+    
+    @property
+    def active(self) -> Optional[KeepAliveStrategy]:
+        """Get the active strategy."""
+        return self._active
@@ -0,0 +1,165 @@
+"""
+X11 helper module.
+Minimal ctypes bindings for the X server screensaver controls.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class XScreenSaverInfo(ctypes.Structure):
+    """XScreenSaverInfo structure of the MIT-SCREEN-SAVER extension."""
+    
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("eventMask", ctypes.c_ulong),
+    ]
+
+
+class X11Display:
+    """Connection to the X server used for screensaver control."""
+    
+    def __init__(self, lib: ctypes.CDLL, display: int):
+        """
+        Initialize display wrapper. Use X11Display.open() instead.
+        
+        Args:
+            lib: Loaded libX11
+            display: Display pointer returned by XOpenDisplay
+        """
+        self._lib = lib
+        self._display = display
+        self._xss: Optional[ctypes.CDLL] = None
+        self._xss_info = None
+    
+    @classmethod
+    def open(cls) -> Optional["X11Display"]:
+        """
+        Connect to the X server named by $DISPLAY.
+        
+        Returns:
+            Display wrapper, or None if there is no X server or no libX11
+        """
+        if not os.environ.get("DISPLAY"):
+            return None
+        
+        lib_path = ctypes.util.find_library("X11")
+        if lib_path is None:
+            return None
+        
+        try:
+            lib = ctypes.CDLL(lib_path)
+            lib.XOpenDisplay.restype = ctypes.c_void_p
+            lib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            lib.XResetScreenSaver.argtypes = [ctypes.c_void_p]
+            lib.XFlush.argtypes = [ctypes.c_void_p]
+            lib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+            lib.XFree.argtypes = [ctypes.c_void_p]
+            lib.XGetScreenSaver.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+            lib.XDefaultRootWindow.restype = ctypes.c_ulong
+            lib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            display = lib.XOpenDisplay(None)
+        except (OSError, AttributeError) as e:
+            logger.info("Cannot load libX11: %s", e)
+            return None
+        
+        if not display:
+            return None
+        return cls(lib, display)
+    
+    def reset_screensaver(self) -> None:
+        """Restart the server idle timer, like real input would."""
+        self._lib.XResetScreenSaver(self._display)
+        self._lib.XFlush(self._display)
+    
+    def get_screensaver_timeout(self) -> int:
+        """Get the server screensaver timeout in seconds (0 if disabled)."""
+        timeout, interval = ctypes.c_int(), ctypes.c_int()
+        prefer_blanking, allow_exposures = ctypes.c_int(), ctypes.c_int()
+        self._lib.XGetScreenSaver(self._display, ctypes.byref(timeout), ctypes.byref(interval),
+                                  ctypes.byref(prefer_blanking), ctypes.byref(allow_exposures))
+        return timeout.value
+    
+    def get_dpms_timeout(self) -> int:
+        """
+        Get the shortest enabled DPMS timeout in seconds.
+        
+        Returns:
+            Seconds until the display powers down, 0 if DPMS is disabled or
+            not supported by the server
+        """
+        lib_path = ctypes.util.find_library("Xext")
+        if lib_path is None:
+            return 0
+        
+        try:
+            ext = ctypes.CDLL(lib_path)
+            ext.DPMSCapable.argtypes = [ctypes.c_void_p]
+            ext.DPMSInfo.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ushort),
+                                     ctypes.POINTER(ctypes.c_ubyte)]
+            ext.DPMSGetTimeouts.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ushort)] * 3
+        except (OSError, AttributeError):
+            return 0
+        
+        if not ext.DPMSCapable(self._display):
+            return 0
+        
+        power_level, enabled = ctypes.c_ushort(), ctypes.c_ubyte()
+        ext.DPMSInfo(self._display, ctypes.byref(power_level), ctypes.byref(enabled))
+        if not enabled.value:
+            return 0
+        
+        standby, suspend, off = ctypes.c_ushort(), ctypes.c_ushort(), ctypes.c_ushort()
+        ext.DPMSGetTimeouts(self._display, ctypes.byref(standby), ctypes.byref(suspend),
+                            ctypes.byref(off))
+        timeouts = [t.value for t in (standby, suspend, off) if t.value]
+        return min(timeouts) if timeouts else 0
+    
+    def get_idle_time_ms(self) -> Optional[int]:
+        """
+        Get the time since the last input event from the server idle counter.
+        
+        Returns:
+            Idle time in milliseconds, or None if the MIT-SCREEN-SAVER
+            extension is not available
+        """
+        if self._xss_info is None:
+            lib_path = ctypes.util.find_library("Xss")
+            if lib_path is None:
+                return None
+            
+            try:
+                xss = ctypes.CDLL(lib_path)
+                xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+                xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                                      ctypes.POINTER(XScreenSaverInfo)]
+                info = xss.XScreenSaverAllocInfo()
+            except (OSError, AttributeError):
+                return None
+            
+            if not info:
+                return None
+            self._xss, self._xss_info = xss, info
+        
+        root = self._lib.XDefaultRootWindow(self._display)
+        if not self._xss.XScreenSaverQueryInfo(self._display, root, self._xss_info):
+            return None
+        return self._xss_info.contents.idle
+    
+    def close(self) -> None:
+        """Close the connection to the X server."""
+        if self._display:
+            self._lib.XCloseDisplay(self._display)
+            self._display = None
+        if self._xss_info is not None:
+            self._lib.XFree(self._xss_info)
+            self._xss_info = None
@@ -0,0 +1,118 @@
+"""
+Control client for Screen Keeper.
+Sends commands to the running instance over its control socket. Imports
+nothing but the standard library, so it starts fast and works without Qt.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional
+
+from screen_keeper.instance import InstanceGuard
+
+
+class ControlError(Exception):
+    """The running instance cannot be reached or did not answer."""
+
+
+def request(command: str, settings: Optional[Dict[str, Any]] = None,
+            instance: Optional[InstanceGuard] = None, timeout: float = 35.0) -> Dict[str, Any]:
+    """
+    Send one request to the running instance and wait for its reply.
+    
+    Args:
+        command: Command, see screen_keeper.control.COMMANDS
+        settings: Settings to change, for set_settings
+        instance: Guard of the instance to reach (default: the usual one)
+        timeout: Seconds to wait for the reply; longer than the server's
+            own command timeout, so its error is seen instead
+    
+    Returns:
+        The reply: "ok", and "result" or "error"
+    
+    Raises:
+        ControlError: If no instance runs or it does not answer
+    """
+    instance = instance or InstanceGuard()
+    conn = instance.connect(timeout)
+    if conn is None:
+        raise ControlError("Screen Keeper is not running")
+    
+    message = {"id": 1, "command": command}
+    if settings is not None:
+        message["settings"] = settings
+    if instance.token:
+        message["token"] = instance.token
+    try:
+        with conn, conn.makefile("rb") as replies:
+            conn.sendall(json.dumps(message).encode() + b"\n")
+            line = replies.readline()
+        return json.loads(line)
+    except (OSError, ValueError) as e:
+        raise ControlError(f"Screen Keeper does not answer: {e}") from None
+
+
+def _parse_assignment(assignment: str) -> tuple:
+    """Split key=value, reading the value as JSON if it is valid JSON."""
+    key, separator, value = assignment.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {assignment!r}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main(argv: Optional[list] = None) -> int:
+    """
+    Run screen-keeper-ctl.
+    
+    Prints the result as JSON, or the error on stderr.
+    
+    Returns:
+        Process exit code: 0 on success, 1 on failure
+    """
+    parser = argparse.ArgumentParser(prog="screen-keeper-ctl",
+                                     description="Control the running Screen Keeper.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+    commands.add_parser("status", help="print whether and how the screen is kept alive")
+    commands.add_parser("start", help="start keeping the screen alive")
+    commands.add_parser("stop", help="stop keeping the screen alive")
+    commands.add_parser("show", help="show the window")
+    get_parser = commands.add_parser("get", help="print the settings, or one of them")
+    get_parser.add_argument("key", nargs="?", help="setting to print")
+    set_parser = commands.add_parser("set", help="change settings, e.g. inactivity_timeout=120")
+    set_parser.add_argument("assignments", nargs="+", type=_parse_assignment, metavar="key=value")
+    args = parser.parse_args(argv)
+    
+    if args.command == "get":
+        command, settings = "get_settings", None
+    elif args.command == "set":
+        command, settings = "set_settings", dict(args.assignments)
+    else:
+        command, settings = args.command, None
+    
+    try:
+        reply = request(command, settings)
+    except ControlError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not reply.get("ok"):
+        print(f"Error: {reply.get('error')}", file=sys.stderr)
+        return 1
+    
+    result = reply.get("result")
+    if args.command == "get" and args.key:
+        if args.key not in result:
+            print(f"Error: unknown setting {args.key!r}", file=sys.stderr)
+            return 1
+        result = result[args.key]
+    if result is not None:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
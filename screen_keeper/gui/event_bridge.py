@@ -0,0 +1,42 @@
+"""
+Qt event bridge module.
+Delivers core events on the GUI thread.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from screen_keeper.core.events import EventBus
+
+
+class QtEventBridge(QObject):
+    """
+    Makes an EventBus deliver its events on the Qt GUI thread.
+    
+    Posting threads only emit a signal, which Qt queues to the thread this
+    object lives in; the handlers then run from the Qt event loop.
+    """
+    
+    # Emitted from the posting thread when events are waiting
+    _events_waiting = pyqtSignal()
+    
+    def __init__(self, bus: EventBus, parent: QObject = None):
+        """
+        Initialize bridge. Must be created on the GUI thread.
+        
+        Args:
+            bus: Event bus to deliver
+            parent: Owning Qt object
+        """
+        super().__init__(parent)
+        self.bus = bus
+        self._events_waiting.connect(self._dispatch)
+        bus.set_wakeup(self._events_waiting.emit)
+    
+    @pyqtSlot()
+    def _dispatch(self):
+        """Run the handlers of the queued events on the GUI thread."""
+        self.bus.dispatch_pending()
+    
+    def detach(self):
+        """Deliver events on the scheduler thread again, e.g. before the event loop exits."""
+        self.bus.set_wakeup(None)
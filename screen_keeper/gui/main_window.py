@@ -5,7 +5,6 @@ Main GUI window for Screen Keeper application.
 import sys
 import os
 from pathlib import Path
-from typing import Optional
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QSpinBox, QDoubleSpinBox, QCheckBox,
@@ -15,17 +14,24 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
 from PyQt5.QtGui import QIcon
 
-from screen_keeper.core.sleep_preventer import SleepPreventer
-from screen_keeper.core.activity_monitor import ActivityMonitor
-from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.events import COMMAND_RECEIVED, STATE_CHANGED, EventBus
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.config.schema import SCHEMA
 from screen_keeper.config.settings import Settings
-from screen_keeper.gui.styles import DARK_THEME
+from screen_keeper.gui.event_bridge import QtEventBridge
+from screen_keeper.gui.styles import DARK_THEME, set_style_state
 
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
     
+    # Simulation modes in the order of the simulation mode combo box
+    SIMULATION_MODES = ["mouse", "keyboard", "both", "auto"]
+    
+    # Emitted with the changed settings, from whichever thread changed them
+    settings_changed = pyqtSignal(dict)
+    
     def get_resource_path(self, relative_path: str) -> str:
         """Get absolute path to resource, works for dev and for PyInstaller."""
         try:
@@ -33,25 +39,52 @@ class MainWindow(QMainWindow):
             base_path = sys._MEIPASS
         except Exception:
             base_path = os.path.abspath(".")
-            
+        
         return os.path.join(base_path, relative_path)
     
-    def __init__(self):
+    def __init__(self, settings: Settings = None):
+        """
+        Initialize window.
+        
+        Args:
+            settings: Application settings (default: loaded from the default file)
+        """
         super().__init__()
-        self.settings = Settings()
-        self.sleep_preventer = SleepPreventer()
-        self.activity_monitor: Optional[ActivityMonitor] = None
-        self.mouse_mover: Optional[MouseMover] = None
-        self.is_running = False
-
+        self.settings = settings or Settings()
+        # Core events are handled on the GUI thread
+        self.event_bridge = QtEventBridge(EventBus(), self)
+        self.keeper = KeepAliveController(self.settings, event_bus=self.event_bridge.bus)
+        self.keeper.set_warning_callback(self.on_keeper_warning)
+        
+        # Last rendered status, only changed properties are set on the labels
+        self._rendered_status = {}
         
+        # Styled before the widgets exist, so each is polished only once
+        self.apply_styles()
         self.init_ui()
         self.load_settings()
         
-        # Status update timer
+        # Apply settings changes while running, whether made here or in the file
+        self.settings_changed.connect(self.on_settings_changed)
+        self.settings.subscribe(self.settings_changed.emit)
+        self.settings.watch()
+        for widget in self.settings_widgets():
+            if isinstance(widget, QDoubleSpinBox):
+                # Applied when editing is finished, not on every keystroke
+                widget.setKeyboardTracking(False)
+            signal = widget.toggled if isinstance(widget, QCheckBox) else (
+                widget.currentIndexChanged if isinstance(widget, QComboBox) else widget.valueChanged
+            )
+            signal.connect(self.save_settings)
+        
+        # The status is redrawn on state changes; the timer only counts up
+        # the inactivity time, and only while the window is shown
         self.status_timer = QTimer()
+        self.status_timer.setInterval(1000)
         self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start(1000)  # Update every second
+        self.event_bridge.bus.subscribe(STATE_CHANGED, self.update_status)
+        self.event_bridge.bus.subscribe(COMMAND_RECEIVED, self.on_command)
+        self.update_status()
         
         # System tray
         self.setup_system_tray()
@@ -59,11 +92,8 @@ class MainWindow(QMainWindow):
         # Menu Bar
         self.setup_menu_bar()
         
-        # Apply Styles
-        self.apply_styles()
-        
         # Auto Start Logic
-        if self.settings.get("auto_start_keeping", True):
+        if self.settings.values.auto_start_keeping:
             self.start_keeping()
             # Minimize to tray if auto-started
             QTimer.singleShot(0, self.hide)
@@ -83,7 +113,7 @@ class MainWindow(QMainWindow):
         icon_path = self.get_resource_path(os.path.join("resources", "icons", "app.png"))
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
-            
+        
         # self.setGeometry(100, 100, 500, 600) # Removed fixed size
         
         # Central widget
@@ -95,7 +125,7 @@ class MainWindow(QMainWindow):
         
         # Title
         title_label = QLabel("Screen Keeper")
-        title_label.setStyleSheet("font-size: 24px; font-weight: bold;")
+        title_label.setObjectName("title_label")
         layout.addWidget(title_label)
         
         # Status group
@@ -103,11 +133,11 @@ class MainWindow(QMainWindow):
         status_layout = QVBoxLayout()
         
         self.status_label = QLabel("Status: Stopped")
-        self.status_label.setStyleSheet("font-size: 14px; padding: 5px;")
+        self.status_label.setObjectName("status_label")
         status_layout.addWidget(self.status_label)
         
         self.activity_label = QLabel("Activity: Monitoring...")
-        self.activity_label.setStyleSheet("font-size: 12px; color: #666;")
+        self.activity_label.setObjectName("activity_label")
         status_layout.addWidget(self.activity_label)
         
         status_group.setLayout(status_layout)
@@ -121,9 +151,9 @@ class MainWindow(QMainWindow):
         timeout_layout = QHBoxLayout()
         timeout_layout.addWidget(QLabel("Inactivity Timeout (seconds):"))
         self.inactivity_timeout_spin = QDoubleSpinBox()
-        self.inactivity_timeout_spin.setRange(10.0, 600.0)
+        self.inactivity_timeout_spin.setRange(*self.schema_range("inactivity_timeout"))
         self.inactivity_timeout_spin.setSuffix(" sec")
-        self.inactivity_timeout_spin.setDecimals(0)
+        self.inactivity_timeout_spin.setDecimals(SCHEMA["inactivity_timeout"].decimals)
         timeout_layout.addWidget(self.inactivity_timeout_spin)
         settings_layout.addLayout(timeout_layout)
         
@@ -131,9 +161,9 @@ class MainWindow(QMainWindow):
         interval_layout = QHBoxLayout()
         interval_layout.addWidget(QLabel("Mouse Movement Interval (seconds):"))
         self.movement_interval_spin = QDoubleSpinBox()
-        self.movement_interval_spin.setRange(5.0, 300.0)
+        self.movement_interval_spin.setRange(*self.schema_range("mouse_movement_interval"))
         self.movement_interval_spin.setSuffix(" sec")
-        self.movement_interval_spin.setDecimals(0)
+        self.movement_interval_spin.setDecimals(SCHEMA["mouse_movement_interval"].decimals)
         interval_layout.addWidget(self.movement_interval_spin)
         settings_layout.addLayout(interval_layout)
         
@@ -144,13 +174,16 @@ class MainWindow(QMainWindow):
         self.simulation_mode_combo.addItems([
             "Mouse Movement",
             "Keyboard Input",
-            "Both (Recommended)"
+            "Both",
+            "Automatic (Recommended)"
         ])
-        self.simulation_mode_combo.setCurrentIndex(2)  # Default to "Both"
+        self.simulation_mode_combo.setCurrentIndex(3)  # Default to "Automatic"
         self.simulation_mode_combo.setToolTip(
             "Mouse Movement: Move cursor slightly\n"
             "Keyboard Input: Toggle Scroll Lock (for SecretNet)\n"
-            "Both: Use both methods for maximum compatibility"
+            "Both: Use both methods for maximum compatibility\n"
+            "Automatic: Use the cheapest method that works, preferring\n"
+            "OS inhibitors over simulated input"
         )
         mode_layout.addWidget(self.simulation_mode_combo)
         settings_layout.addLayout(mode_layout)
@@ -164,6 +197,13 @@ class MainWindow(QMainWindow):
         self.activity_detection_check.setChecked(True)
         settings_layout.addWidget(self.activity_detection_check)
         
+        self.adaptive_interval_check = QCheckBox("Adaptive Interval")
+        self.adaptive_interval_check.setToolTip(
+            "Simulate activity just before the system idle timeout\n"
+            "instead of every movement interval"
+        )
+        settings_layout.addWidget(self.adaptive_interval_check)
+        
         self.auto_start_check = QCheckBox("Auto-start Active & Minimized")
         self.auto_start_check.setToolTip("Automatically start keeping screen alive and minimize to tray on launch")
         settings_layout.addWidget(self.auto_start_check)
@@ -226,151 +266,194 @@ class MainWindow(QMainWindow):
     def tray_icon_activated(self, reason):
         """Handle system tray icon activation."""
         if reason == QSystemTrayIcon.DoubleClick:
-            self.show()
-            self.raise_()
-            self.activateWindow()
+            self.show_window()
+    
+    def show_window(self):
+        """Show the window in front, also when it is hidden in the tray or minimized."""
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
+    def on_command(self, command: str, args: dict, future):
+        """Run a command of a control client and resolve its future with the error or None."""
+        if command == "show":
+            self.show_window()
+        elif command == "start":
+            # No message box, the client reports the error
+            if not self.try_start_keeping():
+                future.set_result(self.keeper.last_error)
+                return
+        elif command == "stop":
+            self.stop_keeping()
+        else:
+            return
+        future.set_result(None)
     
     def load_settings(self):
         """Load settings into UI."""
-        self.inactivity_timeout_spin.setValue(self.settings.get("inactivity_timeout", 60.0))
-        self.movement_interval_spin.setValue(self.settings.get("mouse_movement_interval", 30.0))
-        self.prevent_sleep_check.setChecked(self.settings.get("prevent_sleep", True))
-        self.activity_detection_check.setChecked(self.settings.get("use_activity_detection", True))
-        self.auto_start_check.setChecked(self.settings.get("auto_start_keeping", True))
+        self.inactivity_timeout_spin.setValue(self.settings.values.inactivity_timeout)
+        self.movement_interval_spin.setValue(self.settings.values.mouse_movement_interval)
+        self.prevent_sleep_check.setChecked(self.settings.values.prevent_sleep)
+        self.activity_detection_check.setChecked(self.settings.values.use_activity_detection)
+        self.adaptive_interval_check.setChecked(self.settings.values.adaptive_interval)
+        self.auto_start_check.setChecked(self.settings.values.auto_start_keeping)
         
         # Load simulation mode
-        mode = self.settings.get("simulation_mode", "both")
-        mode_index = {"mouse": 0, "keyboard": 1, "both": 2}.get(mode, 2)
-        self.simulation_mode_combo.setCurrentIndex(mode_index)
+        mode = self.settings.values.simulation_mode
+        if mode not in self.SIMULATION_MODES:
+            mode = "auto"
+        self.simulation_mode_combo.setCurrentIndex(self.SIMULATION_MODES.index(mode))
     
     def save_settings(self):
         """Save current UI settings."""
-        self.settings.set("inactivity_timeout", self.inactivity_timeout_spin.value())
-        self.settings.set("mouse_movement_interval", self.movement_interval_spin.value())
-        self.settings.set("prevent_sleep", self.prevent_sleep_check.isChecked())
-        self.settings.set("use_activity_detection", self.activity_detection_check.isChecked())
-        self.settings.set("auto_start_keeping", self.auto_start_check.isChecked())
-        
-        # Save simulation mode
-        mode_index = self.simulation_mode_combo.currentIndex()
-        mode = ["mouse", "keyboard", "both"][mode_index]
-        self.settings.set("simulation_mode", mode)
+        self.settings.update({
+            "inactivity_timeout": self.inactivity_timeout_spin.value(),
+            "mouse_movement_interval": self.movement_interval_spin.value(),
+            "prevent_sleep": self.prevent_sleep_check.isChecked(),
+            "use_activity_detection": self.activity_detection_check.isChecked(),
+            "adaptive_interval": self.adaptive_interval_check.isChecked(),
+            "auto_start_keeping": self.auto_start_check.isChecked(),
+            "simulation_mode": self.SIMULATION_MODES[self.simulation_mode_combo.currentIndex()],
+        })
         
         self.settings.save()
     
+    @staticmethod
+    def schema_range(key: str) -> tuple:
+        """Get the allowed range of a setting, so the widget accepts every valid value."""
+        field = SCHEMA[key]
+        return field.minimum, field.maximum
+    
+    def settings_widgets(self) -> list:
+        """Get the widgets that edit settings."""
+        return [
+            self.inactivity_timeout_spin, self.movement_interval_spin,
+            self.simulation_mode_combo, self.prevent_sleep_check,
+            self.activity_detection_check, self.adaptive_interval_check,
+            self.auto_start_check,
+        ]
+    
+    def on_settings_changed(self, changes: dict):
+        """Show changed settings and apply them to the running keeper."""
+        widgets = self.settings_widgets()
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.load_settings()
+        for widget in widgets:
+            widget.blockSignals(False)
+        
+        self.keeper.apply_settings(changes)
+        self.update_ui_state()
+    
     def start_keeping(self):
         """Start keeping screen alive."""
+        if not self.try_start_keeping():
+            QMessageBox.critical(self, "Error", self.keeper.last_error)
+    
+    def try_start_keeping(self) -> bool:
+        """
+        Start keeping screen alive without reporting errors.
+        
+        Returns:
+            True if running afterwards; on failure keeper.last_error says why
+        """
         if self.is_running:
-            return
+            return True
         
         self.save_settings()
         
-        # Prevent sleep if enabled
-        if self.prevent_sleep_check.isChecked():
-            if not self.sleep_preventer.prevent_sleep():
-                QMessageBox.warning(self, "Warning", "Failed to prevent system sleep. Mouse movement will still work.")
-        
-        # Setup activity monitoring if enabled
-        if self.activity_detection_check.isChecked():
-            self.activity_monitor = ActivityMonitor(
-                inactivity_timeout=self.inactivity_timeout_spin.value()
-            )
-            self.activity_monitor.set_inactivity_callback(self.on_user_inactive)
-            self.activity_monitor.set_activity_callback(self.on_user_active)
-            
-            if not self.activity_monitor.start():
-                QMessageBox.warning(self, "Warning", "Failed to start activity monitoring. Mouse will move continuously.")
-                self.activity_monitor = None
-        
-        # Setup mouse mover with selected simulation mode
-        mode_index = self.simulation_mode_combo.currentIndex()
-        mode = ["mouse", "keyboard", "both"][mode_index]
-        self.mouse_mover = MouseMover(
-            interval=self.movement_interval_spin.value(),
-            mode=mode
-        )
-        
-        # Start mouse mover based on activity detection
-        if self.activity_detection_check.isChecked() and self.activity_monitor:
-            # Only move when inactive
-            pass  # Will be started in on_user_inactive callback
-        else:
-            # Move continuously
-            if not self.mouse_mover.start():
-                QMessageBox.critical(self, "Error", "Failed to start mouse movement.")
-                self.stop_keeping()
-                return
+        if not self.keeper.start():
+            return False
         
-        self.is_running = True
         self.update_ui_state()
-        self.statusBar().showMessage("Screen Keeper is active")
+        self.statusBar().showMessage(f"Screen Keeper is active ({self.keeper.strategy.name})")
+        return True
+    
+    def on_keeper_warning(self, message: str):
+        """Show a problem reported by the keep-alive controller."""
+        QMessageBox.warning(self, "Warning", message)
     
     def update_ui_state(self):
         """Update UI elements based on running state."""
+        # Settings stay editable, changes are applied while running
         self.start_btn.setEnabled(not self.is_running)
         self.stop_btn.setEnabled(self.is_running)
-        
-        # Disable settings when running
-        self.inactivity_timeout_spin.setEnabled(not self.is_running)
-        self.movement_interval_spin.setEnabled(not self.is_running)
-        self.simulation_mode_combo.setEnabled(not self.is_running)
-        self.prevent_sleep_check.setEnabled(not self.is_running)
-        self.activity_detection_check.setEnabled(not self.is_running)
-        self.auto_start_check.setEnabled(not self.is_running)
     
     def stop_keeping(self):
         """Stop keeping screen alive."""
         if not self.is_running:
             return
         
-        # Stop mouse mover
-        if self.mouse_mover:
-            self.mouse_mover.stop()
-            self.mouse_mover = None
-        
-        # Stop activity monitor
-        if self.activity_monitor:
-            self.activity_monitor.stop()
-            self.activity_monitor = None
-        
-        # Allow sleep
-        self.sleep_preventer.allow_sleep()
-        
-        self.is_running = False
+        self.keeper.stop()
         self.update_ui_state()
         self.statusBar().showMessage("Screen Keeper stopped")
     
-    def on_user_inactive(self):
-        """Called when user becomes inactive."""
-        if self.mouse_mover and not self.mouse_mover.is_running:
-            self.mouse_mover.start()
+    @property
+    def is_running(self) -> bool:
+        """Check if the screen is being kept alive."""
+        return self.keeper.is_running
     
-    def on_user_active(self):
-        """Called when user becomes active."""
-        if self.mouse_mover and self.mouse_mover.is_running:
-            self.mouse_mover.stop()
+    def status_view(self) -> dict:
+        """
+        Get the status to display.
+        
+        Returns:
+            Status text, activity text, activity style state (see the theme),
+            and whether the text counts up every second
+        """
+        if not self.is_running:
+            return {"status": "Status: Stopped", "activity": "Activity: Not monitoring",
+                    "state": "stopped", "ticking": False}
+        
+        activity_monitor = self.keeper.activity_monitor
+        if activity_monitor and activity_monitor.is_inactive:
+            activity = f"Activity: Inactive ({int(activity_monitor.time_since_activity)}s)"
+            return {"status": "Status: Running", "activity": activity,
+                    "state": "inactive", "ticking": True}
+        if activity_monitor:
+            activity, state = "Activity: Active", "active"
+        elif self.keeper.mouse_mover:
+            activity, state = "Activity: Continuous mode", "kept"
+        else:
+            activity, state = "Activity: Kept awake by the OS", "kept"
+        return {"status": "Status: Running", "activity": activity, "state": state, "ticking": False}
     
     def update_status(self):
-        """Update status display."""
-        if self.is_running:
-            self.status_label.setText("Status: Running")
-            
-            if self.activity_monitor:
-                if self.activity_monitor.is_inactive:
-                    self.activity_label.setText(
-                        f"Activity: Inactive ({int(self.activity_monitor.time_since_activity)}s)"
-                    )
-                    self.activity_label.setStyleSheet("font-size: 12px; color: #f44336;")
-                else:
-                    self.activity_label.setText("Activity: Active")
-                    self.activity_label.setStyleSheet("font-size: 12px; color: #4CAF50;")
-            else:
-                self.activity_label.setText("Activity: Continuous mode")
-                self.activity_label.setStyleSheet("font-size: 12px; color: #2196F3;")
-        else:
-            self.status_label.setText("Status: Stopped")
-            self.activity_label.setText("Activity: Not monitoring")
-            self.activity_label.setStyleSheet("font-size: 12px; color: #666;")
+        """Update status display, touching only what changed since the last update."""
+        if not self.is_status_visible:
+            # Redrawn by showEvent
+            self.status_timer.stop()
+            return
+        
+        view = self.status_view()
+        rendered = self._rendered_status
+        if view["status"] != rendered.get("status"):
+            self.status_label.setText(view["status"])
+        if view["activity"] != rendered.get("activity"):
+            self.activity_label.setText(view["activity"])
+        if view["state"] != rendered.get("state"):
+            set_style_state(self.activity_label, view["state"])
+        self._rendered_status = view
+        
+        if not view["ticking"]:
+            self.status_timer.stop()
+        elif not self.status_timer.isActive():
+            self.status_timer.start()
+    
+    @property
+    def is_status_visible(self) -> bool:
+        """Check if the status can be seen, i.e. the window is neither hidden nor minimized."""
+        return self.isVisible() and not self.isMinimized()
+    
+    def showEvent(self, event):
+        """Bring the status up to date when the window is shown."""
+        super().showEvent(event)
+        self.update_status()
+    
+    def hideEvent(self, event):
+        """Pause status updates while the window is hidden."""
+        super().hideEvent(event)
+        self.status_timer.stop()
     
     
     def setup_menu_bar(self):
@@ -396,11 +479,9 @@ class MainWindow(QMainWindow):
     
     def apply_styles(self):
         """Apply modern dark theme."""
+        # The only stylesheet of the window; runtime changes use set_style_state()
         self.setStyleSheet(DARK_THEME)
-        
-        # Specific button styling if needed, but QSS handles most classes
-        pass
-
+    
     def closeEvent(self, event):
         """Handle window close event."""
         # Clean up existing close logic to simpler "Minimize to Tray"
@@ -429,7 +510,7 @@ class MainWindow(QMainWindow):
                  event.accept()
              else:
                  event.ignore()
-
+    
     def show_about(self):
         """Show about dialog."""
         QMessageBox.about(
@@ -443,9 +524,13 @@ class MainWindow(QMainWindow):
             "- Smart Mouse Movement\n"
             "- System Tray Support"
         )
-
+    
     def close_application(self):
         """Close application completely."""
         self.stop_keeping()
+        # Settings are written in the background, write what is pending now
+        self.settings.unwatch()
+        self.settings.flush()
+        self.event_bridge.detach()
         QApplication.quit()
 
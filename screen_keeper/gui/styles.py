@@ -1,7 +1,13 @@
 """
 Modern Dark Theme QSS Styles for Screen Keeper.
+
+Widgets that change appearance at runtime are styled through a dynamic
+"state" property instead of their own stylesheets, so a change is a
+property toggle and re-polish rather than parsing new QSS.
 """
 
+from PyQt5.QtWidgets import QWidget
+
 DARK_THEME = """
 /* Main Window */
 QMainWindow {
@@ -38,6 +44,34 @@ QLabel {
     background-color: transparent;
 }
 
+/* Status */
+QLabel#title_label {
+    font-size: 24px;
+    font-weight: bold;
+}
+
+QLabel#status_label {
+    font-size: 14px;
+    padding: 5px;
+}
+
+QLabel#activity_label {
+    font-size: 12px;
+    color: #666666;
+}
+
+QLabel#activity_label[state="active"] {
+    color: #4CAF50;
+}
+
+QLabel#activity_label[state="inactive"] {
+    color: #f44336;
+}
+
+QLabel#activity_label[state="kept"] {
+    color: #2196F3;
+}
+
 /* Buttons */
 QPushButton {
     background-color: #404040;
@@ -183,3 +217,20 @@ QStatusBar {
     color: #999999;
 }
 """
+
+
+def set_style_state(widget: QWidget, state: str) -> None:
+    """
+    Switch a widget to one of its [state="..."] rules of the theme.
+    
+    Args:
+        widget: Widget styled by the theme
+        state: New value of the "state" property
+    """
+    if widget.property("state") == state:
+        return
+    widget.setProperty("state", state)
+    # Qt does not re-evaluate property selectors on its own. Polishing drops
+    # the cached rules of the widget; the usual unpolish() first only resets
+    # what polish() sets again.
+    widget.style().polish(widget)
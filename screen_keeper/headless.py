@@ -0,0 +1,152 @@
+"""
+Headless mode for Screen Keeper.
+Keeps the screen alive without a window and without importing PyQt5.
+"""
+
+import concurrent.futures
+import functools
+import os
+import signal
+import time
+from typing import Optional
+
+from screen_keeper import startup_profile
+from screen_keeper.config.settings import Settings
+from screen_keeper.control import ControlServer
+from screen_keeper.core.events import COMMAND_RECEIVED
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.metrics import SnapshotWriter, get_metrics
+from screen_keeper.instance import InstanceGuard
+
+
+# Control signals on POSIX systems, see run_headless()
+CONTROL_SIGNALS = {
+    "SIGUSR1": "start",
+    "SIGUSR2": "stop",
+    "SIGHUP": "reload",
+    "SIGTERM": "quit",
+    "SIGINT": "quit",
+}
+
+
+def _control_signals() -> dict:
+    """Map the control signals available on this system to their commands."""
+    return {
+        getattr(signal, name): command
+        for name, command in CONTROL_SIGNALS.items()
+        if hasattr(signal, name)
+    }
+
+
+def run_headless(config_file: Optional[str] = None, metrics_file: Optional[str] = None,
+                 instance: Optional[InstanceGuard] = None) -> int:
+    """
+    Keep the screen alive until told to quit.
+    
+    Starts keeping the screen alive right away. On POSIX systems the process
+    is controlled with signals: SIGUSR1 starts, SIGUSR2 stops, SIGHUP reloads
+    the settings and SIGTERM or SIGINT quits. Elsewhere it runs until Ctrl+C.
+    Changes to the settings file are picked up without a reload signal, and
+    control clients (screen-keeper-ctl, later launches with --start or
+    --stop) can start and stop it and change the settings.
+    
+    Args:
+        config_file: Path to the configuration file (default: the usual one)
+        metrics_file: File to write metrics snapshots to, None for no snapshots
+        instance: Held single instance lock, served to control clients
+    
+    Returns:
+        Process exit code
+    """
+    signals = _control_signals()
+    posix = hasattr(signal, "pthread_sigmask")
+    if posix:
+        # Block before any thread is started so every thread inherits the
+        # mask and the signals are only ever taken by sigwait() below
+        signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+    
+    snapshots = SnapshotWriter(get_metrics(), metrics_file) if metrics_file else None
+    if snapshots:
+        snapshots.start()
+    
+    settings = Settings(config_file)
+    keeper = KeepAliveController(settings)
+    settings.subscribe(keeper.apply_settings)
+    settings.watch()
+    
+    if not keeper.start():
+        print(f"Error: {keeper.last_error}")
+        settings.unwatch()
+        if snapshots:
+            snapshots.stop()
+        return 1
+    print(f"Screen Keeper running headless (pid {os.getpid()}, strategy: {keeper.strategy.name})")
+    # Commands are run one at a time off the scheduler thread, which the
+    # D-Bus and X11 calls of start() would otherwise hold up
+    commands = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                     thread_name_prefix="screen-keeper-command")
+    on_command = functools.partial(commands.submit, _run_command, keeper)
+    keeper.event_bus.subscribe(COMMAND_RECEIVED, on_command)
+    control = ControlServer(instance, keeper, settings) if instance else None
+    if control:
+        control.start()
+    startup_profile.startup_complete("keep-alive started")
+    
+    try:
+        if not posix:
+            while True:
+                time.sleep(3600)
+        
+        while True:
+            command = signals[signal.sigwait(signals)]
+            if command == "quit":
+                break
+            
+            if command == "start":
+                if not keeper.start():
+                    print(f"Error: {keeper.last_error}")
+            elif command == "stop":
+                keeper.stop()
+            elif command == "reload":
+                # Changes are applied by the subscription above
+                settings.reload()
+            
+            print(f"Screen Keeper {'running' if keeper.is_running else 'stopped'}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if control:
+            control.stop()
+        keeper.event_bus.unsubscribe(COMMAND_RECEIVED, on_command)
+        commands.shutdown()
+        settings.unwatch()
+        # Changes from control clients are written in the background, write what is pending now
+        settings.flush()
+        keeper.stop()
+        if snapshots:
+            snapshots.stop()
+    
+    print("Screen Keeper exited")
+    return 0
+
+
+def _run_command(keeper: KeepAliveController, command: str, args: dict,
+                 future: concurrent.futures.Future) -> None:
+    """
+    Run a command of a control client; runs on the command worker thread.
+    
+    Resolves the future with None, or with why the command failed.
+    """
+    if command == "show":
+        future.set_result("running headless, there is no window")
+        return
+    if command == "start":
+        if not keeper.start():
+            future.set_result(keeper.last_error)
+            return
+    elif command == "stop":
+        keeper.stop()
+    else:
+        return
+    print(f"Screen Keeper {'running' if keeper.is_running else 'stopped'}")
+    future.set_result(None)
@@ -0,0 +1,192 @@
+"""
+Single instance module.
+Lets only one Screen Keeper run per user and owns the local socket that
+later launches and control clients connect to. Imports nothing but the
+standard library, so a second launch exits without loading Qt.
+"""
+
+import errno
+import logging
+import os
+import secrets
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _config_dir() -> Path:
+    """Get the per-user configuration directory, as used for the settings."""
+    config_dir = Path.home() / ".screen-keeper"
+    config_dir.mkdir(exist_ok=True)
+    return config_dir
+
+
+class InstanceGuard:
+    """
+    Per-user single instance lock with a listening socket.
+    
+    On Linux the lock is an abstract Unix socket named after the user id,
+    which the kernel releases when the process dies, so there is never a
+    stale lock. Other POSIX systems use a Unix socket file in the user's
+    configuration directory; Windows uses a loopback TCP port recorded there
+    with a random token that clients must send (see `token`).
+    
+    The instance holding the lock serves the socket (see ControlServer);
+    other processes connect() to it.
+    """
+    
+    def __init__(self, name: str = "screen-keeper"):
+        """
+        Initialize guard.
+        
+        Args:
+            name: Name of the lock, per user
+        """
+        self.name = name
+        self._server: Optional[socket.socket] = None
+        self._socket_file: Optional[Path] = None
+        self._token = ""
+        if sys.platform.startswith("linux"):
+            self._family = socket.AF_UNIX
+            self._address = f"\0{name}-{os.getuid()}"
+        elif hasattr(socket, "AF_UNIX"):
+            self._family = socket.AF_UNIX
+            self._socket_file = _config_dir() / f"{name}.sock"
+            self._address = str(self._socket_file)
+        else:
+            self._family = socket.AF_INET
+            self._address = None
+            self._port_file = _config_dir() / f"{name}.port"
+    
+    def acquire(self) -> bool:
+        """
+        Become the running instance.
+        
+        Returns:
+            True if no other instance runs, including when the lock could
+            not be set up for another reason (then reported and not held);
+            False if another instance holds it
+        """
+        try:
+            if self._family == socket.AF_INET:
+                return self._acquire_tcp()
+            return self._acquire_unix()
+        except OSError as e:
+            logger.warning("Single instance lock not available: %s", e)
+            return True
+    
+    def _acquire_unix(self) -> bool:
+        """Bind the Unix socket, taking over a socket file left by a crash."""
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self._address)
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                server.close()
+                raise
+            if self._socket_file is None or self._is_answering():
+                server.close()
+                return False
+            # Nobody listens on the file, its owner exited without removing it
+            self._socket_file.unlink()
+            server.bind(self._address)
+        if self._socket_file is not None:
+            os.chmod(self._address, 0o600)
+        server.listen(4)
+        self._server = server
+        return True
+    
+    def _acquire_tcp(self) -> bool:
+        """Bind a loopback port and record it, unless the recorded one answers."""
+        if self._load_port() and self._is_answering():
+            return False
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(4)
+        self._token = secrets.token_hex(16)
+        self._address = server.getsockname()
+        self._port_file.write_text(f"{self._address[1]} {self._token}\n")
+        self._server = server
+        return True
+    
+    def _load_port(self) -> bool:
+        """Read the port and token of the running instance on Windows."""
+        try:
+            port, self._token = self._port_file.read_text().split()
+            self._address = ("127.0.0.1", int(port))
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def _is_answering(self) -> bool:
+        """Check if a running instance accepts connections."""
+        try:
+            with socket.socket(self._family, socket.SOCK_STREAM) as conn:
+                conn.settimeout(1.0)
+                conn.connect(self._address)
+            return True
+        except OSError:
+            return False
+    
+    @property
+    def listening_socket(self) -> Optional[socket.socket]:
+        """Get the socket clients connect to, while the lock is held."""
+        return self._server
+    
+    @property
+    def token(self) -> str:
+        """Get the token clients must send on Windows; empty elsewhere."""
+        return self._token
+    
+    def is_same_user(self, conn: socket.socket) -> bool:
+        """Check that a client runs as the same user; abstract sockets are open to all."""
+        if not hasattr(socket, "SO_PEERCRED") or self._family != socket.AF_UNIX:
+            return True
+        credentials = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+        if uid != os.getuid():
+            logger.warning("Ignoring client of user %s", uid)
+            return False
+        return True
+    
+    def connect(self, timeout: float = 2.0) -> Optional[socket.socket]:
+        """
+        Connect to the running instance.
+        
+        On Windows this also loads its `token`.
+        
+        Args:
+            timeout: Timeout in seconds of the socket operations
+        
+        Returns:
+            Connected socket, or None if no instance runs
+        """
+        if self._family == socket.AF_INET and not self._load_port():
+            return None
+        conn = socket.socket(self._family, socket.SOCK_STREAM)
+        conn.settimeout(timeout)
+        try:
+            conn.connect(self._address)
+        except OSError as e:
+            logger.debug("No running instance: %s", e)
+            conn.close()
+            return None
+        return conn
+    
+    def release(self) -> None:
+        """Close the socket and let another instance start."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.close()
+        try:
+            if self._socket_file is not None:
+                self._socket_file.unlink()
+            elif self._family == socket.AF_INET:
+                self._port_file.unlink()
+        except OSError:
+            pass
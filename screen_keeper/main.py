@@ -2,25 +2,132 @@
 Main entry point for Screen Keeper application.
 """
 
+import argparse
+import logging
 import sys
-from PyQt5.QtWidgets import QApplication
-from screen_keeper.gui.main_window import MainWindow
+from typing import Optional
 
+from screen_keeper import startup_profile
+from screen_keeper.ctl import ControlError, request
+from screen_keeper.instance import InstanceGuard
 
-def main():
-    """Main function to start the application."""
-    app = QApplication(sys.argv)
+
+def run_gui(qt_argv: list, metrics_file: Optional[str] = None,
+            instance: Optional[InstanceGuard] = None) -> int:
+    """
+    Run the application with its main window.
+    
+    Args:
+        qt_argv: Arguments for QApplication
+        metrics_file: File to write metrics snapshots to, None for no snapshots
+        instance: Held single instance lock, served to control clients
+    """
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from screen_keeper.control import ControlServer
+    from screen_keeper.core.metrics import SnapshotWriter, get_metrics
+    from screen_keeper.gui.main_window import MainWindow
+    startup_profile.mark("modules imported")
+    
+    app = QApplication(qt_argv)
     app.setApplicationName("Screen Keeper")
     app.setOrganizationName("Screen Keeper")
+    startup_profile.mark("QApplication created")
     
     # Check if system tray is available
     if not QApplication.instance().isSessionRestored():
         window = MainWindow()
+        startup_profile.mark("main window constructed")
         window.show()
         
-        sys.exit(app.exec_())
+        # Requests arrive on the control thread, commands run on the GUI thread
+        control = ControlServer(instance, window.keeper, window.settings) if instance else None
+        if control:
+            control.start()
+        
+        # Runs once the event loop has shown the window and tray icon
+        QTimer.singleShot(0, lambda: startup_profile.startup_complete("event loop running"))
+        
+        snapshots = SnapshotWriter(get_metrics(), metrics_file) if metrics_file else None
+        if snapshots:
+            snapshots.start()
+        try:
+            return app.exec_()
+        finally:
+            if control:
+                control.stop()
+            if snapshots:
+                snapshots.stop()
+    return 0
+
+
+def main():
+    """Main function to start the application."""
+    parser = argparse.ArgumentParser(prog="screen_keeper", description="Keep the screen alive.")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window and without PyQt5, controlled by signals")
+    parser.add_argument("--config", help="path to the configuration file (headless mode)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and initialization times once started")
+    parser.add_argument("--log-level", default="warning",
+                        choices=["debug", "info", "warning", "error"],
+                        help="least severe messages to log (default: warning)")
+    parser.add_argument("--log-file", help="log to this file instead of stderr")
+    parser.add_argument("--metrics-file",
+                        help="write a JSON snapshot of internal metrics to this file every minute")
+    control = parser.add_mutually_exclusive_group()
+    control.add_argument("--start", action="store_true",
+                         help="make the running instance start keeping the screen alive")
+    control.add_argument("--stop", action="store_true",
+                         help="make the running instance stop keeping the screen alive")
+    # Unknown arguments are left for Qt
+    args, qt_args = parser.parse_known_args()
+    
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        filename=args.log_file,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    
+    if args.profile_startup:
+        startup_profile.enable()
+    
+    # Only one instance per user; a later launch hands its command over
+    instance = InstanceGuard()
+    if not instance.acquire():
+        sys.exit(send_command(instance, "start" if args.start else "stop" if args.stop else "show"))
+    if args.stop:
+        instance.release()
+        print("Screen Keeper is not running")
+        sys.exit(1)
+    
+    try:
+        if args.headless:
+            from screen_keeper.headless import run_headless
+            sys.exit(run_headless(args.config, args.metrics_file, instance))
+        
+        sys.exit(run_gui(sys.argv[:1] + qt_args, args.metrics_file, instance))
+    finally:
+        instance.release()
+
+
+def send_command(instance: InstanceGuard, command: str) -> int:
+    """
+    Send a command to the running instance.
+    
+    Returns:
+        Process exit code
+    """
+    try:
+        reply = request(command, instance=instance)
+    except ControlError:
+        print("Screen Keeper is already running but does not answer")
+        return 1
+    if reply.get("ok"):
+        return 0
+    print(f"Screen Keeper: {reply.get('error')}")
+    return 1
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,199 @@
+"""
+Startup profiling module.
+Measures module import and initialization times for --profile-startup.
+"""
+
+import importlib.abc
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# When set, the path of a file written once startup is complete; used by
+# measure_startup.py to time launches of the frozen builds
+READY_FILE_ENV = "SCREEN_KEEPER_READY_FILE"
+
+
+class _ModuleTiming:
+    """Accumulated load time of one module."""
+    
+    __slots__ = ("name", "total", "own")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0.0  # including nested imports
+        self.own = 0.0  # excluding nested imports
+
+
+class _TimedLoader:
+    """Loader wrapper timing module creation and execution."""
+    
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+    
+    def create_module(self, spec):
+        self._profiler._enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._profiler._exit()
+    
+    def exec_module(self, module):
+        self._profiler._enter(module.__spec__.name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+    
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder wrapping the loaders found by the other finders."""
+    
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+    
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+def process_age() -> Optional[float]:
+    """Get seconds since this process was started, None if unknown."""
+    try:
+        with open(f"/proc/{os.getpid()}/stat") as f:
+            # Field 22, after the parenthesized command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        uptime = time.clock_gettime(time.CLOCK_BOOTTIME)
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, AttributeError, ValueError, IndexError):
+        return None
+
+
+class StartupProfiler:
+    """
+    Records how long each module takes to import and when each startup
+    phase is reached.
+    """
+    
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._start_age = process_age()
+        self._finder = _TimingFinder(self)
+        self._modules: Dict[str, _ModuleTiming] = {}
+        # (timing, start time, time spent in nested imports)
+        self._stack: List[Tuple[_ModuleTiming, float, float]] = []
+        self._marks: List[Tuple[str, float]] = []
+    
+    def install(self) -> None:
+        """Start timing imports."""
+        if self._finder not in sys.meta_path:
+            sys.meta_path.insert(0, self._finder)
+    
+    def uninstall(self) -> None:
+        """Stop timing imports."""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+    
+    def _enter(self, name: str) -> None:
+        timing = self._modules.get(name)
+        if timing is None:
+            timing = self._modules[name] = _ModuleTiming(name)
+        self._stack.append((timing, time.perf_counter(), 0.0))
+    
+    def _exit(self) -> None:
+        timing, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        timing.total += elapsed
+        timing.own += elapsed - nested
+        if self._stack:
+            parent, parent_start, parent_nested = self._stack[-1]
+            self._stack[-1] = (parent, parent_start, parent_nested + elapsed)
+    
+    def mark(self, phase: str) -> None:
+        """Record that a startup phase was reached."""
+        self._marks.append((phase, time.perf_counter() - self._start))
+    
+    def report(self, top: int = 25) -> str:
+        """
+        Format the timings.
+        
+        Args:
+            top: Number of modules to list, slowest own time first
+        
+        Returns:
+            Multi-line report
+        """
+        if self._start_age is None:
+            lines = ["Startup profile (time since profiling was enabled)"]
+            offset = 0.0
+        else:
+            lines = ["Startup profile (time since process start)"]
+            offset = self._start_age
+            lines.append(f"  {offset * 1000:8.1f} ms  profiling enabled")
+        for phase, elapsed in self._marks:
+            lines.append(f"  {(offset + elapsed) * 1000:8.1f} ms  {phase}")
+        
+        import_total = sum(t.own for t in self._modules.values())
+        lines.append(f"Imports: {len(self._modules)} modules, {import_total * 1000:.1f} ms")
+        lines.append(f"  {'own ms':>8}  {'total ms':>8}  module")
+        slowest = sorted(self._modules.values(), key=lambda t: t.own, reverse=True)[:top]
+        for timing in slowest:
+            lines.append(f"  {timing.own * 1000:8.1f}  {timing.total * 1000:8.1f}  {timing.name}")
+        return "\n".join(lines)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def enable() -> StartupProfiler:
+    """Start profiling the rest of the startup."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def mark(phase: str) -> None:
+    """Record a startup phase; does nothing unless profiling is enabled."""
+    if _profiler is not None:
+        _profiler.mark(phase)
+
+
+def finish() -> None:
+    """Stop profiling and print the report; does nothing unless profiling is enabled."""
+    global _profiler
+    if _profiler is None:
+        return
+    _profiler.uninstall()
+    print(_profiler.report())
+    _profiler = None
+
+
+def startup_complete(phase: str) -> None:
+    """
+    Record the last startup phase, print the profile if enabled, and write
+    the ready file if one was requested through the environment.
+    """
+    mark(phase)
+    finish()
+    
+    ready_file = os.environ.get(READY_FILE_ENV)
+    if ready_file:
+        try:
+            with open(ready_file, "w") as f:
+                f.write(f"{os.getpid()}\n")
+        except OSError as e:
+            print(f"Error writing ready file: {e}")
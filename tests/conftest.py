@@ -0,0 +1,9 @@
+"""
+Shared test setup: makes the repository root importable, for runs of plain
+`pytest` from any directory.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
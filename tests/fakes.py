@@ -0,0 +1,33 @@
+"""
+Stand-ins for the D-Bus inhibitor, so tests need no session or system bus.
+
+Input is faked with screen_keeper.core.simulation.SimulatedInput.
+"""
+
+
+class FakeInhibitor:
+    """Stand-in for DBusInhibitor, taking locks without a bus."""
+    
+    def __init__(self, sleep_lock: bool = True, idle_lock: bool = False):
+        """
+        Initialize inhibitor.
+        
+        Args:
+            sleep_lock: Whether acquire() can get the logind sleep lock
+            idle_lock: Whether acquire() gets the screensaver inhibit
+        """
+        self._sleep_lock = sleep_lock
+        self._idle_lock = idle_lock
+        self.holds_sleep_lock = False
+        self.holds_idle_lock = False
+        self.acquisitions = 0
+    
+    def acquire(self, reason: str = "Screen Keeper", sleep: bool = True) -> bool:
+        self.acquisitions += 1
+        self.holds_sleep_lock = self._sleep_lock and sleep
+        self.holds_idle_lock = self._idle_lock
+        return self.holds_sleep_lock or self.holds_idle_lock
+    
+    def release(self) -> None:
+        self.holds_sleep_lock = False
+        self.holds_idle_lock = False
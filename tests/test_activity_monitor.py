@@ -0,0 +1,96 @@
+"""
+Tests of the activity monitor deadline and state transitions, in virtual time.
+"""
+
+from screen_keeper.core.activity_monitor import ActivityMonitor
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import MOVE, SimulatedInput
+
+
+def test_input_ends_inactivity_within_coalesce_window():
+    clock = VirtualClock()
+    scheduler = Scheduler(clock, threaded=False)
+    backend = SimulatedInput(echo=False)
+    # A coalesce window longer than the timeout
+    monitor = ActivityMonitor(inactivity_timeout=1.0, coalesce_window=10.0, clock=clock,
+                              scheduler=scheduler, input_backend=backend)
+    transitions = []
+    monitor.set_inactivity_callback(lambda: transitions.append("inactive"))
+    monitor.set_activity_callback(lambda: transitions.append("active"))
+    assert monitor.start()
+    
+    backend.deliver(MOVE)
+    scheduler.advance(2.0)
+    assert monitor.is_inactive
+    
+    backend.deliver(MOVE)
+    assert not monitor.is_inactive
+    assert transitions == ["inactive", "active"]
+    monitor.stop()
+
+
+def make_monitor(timeout: float = 60.0):
+    clock = VirtualClock()
+    scheduler = Scheduler(clock, threaded=False)
+    backend = SimulatedInput(echo=False)
+    monitor = ActivityMonitor(inactivity_timeout=timeout, coalesce_window=0.0, clock=clock,
+                              scheduler=scheduler, input_backend=backend)
+    transitions = []
+    monitor.set_inactivity_callback(lambda: transitions.append(("inactive", clock.now())))
+    monitor.set_activity_callback(lambda: transitions.append(("active", clock.now())))
+    assert monitor.start()
+    return monitor, scheduler, backend, transitions
+
+
+def test_inactive_exactly_at_the_deadline():
+    monitor, scheduler, backend, transitions = make_monitor(timeout=60.0)
+    scheduler.advance(59.9)
+    assert not monitor.is_inactive
+    scheduler.advance(0.1)
+    assert transitions == [("inactive", 60.0)]
+    # Nothing polls while waiting for the deadline
+    assert scheduler.wakeups == 1
+    monitor.stop()
+
+
+def test_input_moves_the_deadline():
+    monitor, scheduler, backend, transitions = make_monitor(timeout=60.0)
+    for _ in range(10):
+        scheduler.advance(30)
+        for _ in range(100):
+            backend.deliver(MOVE)
+    assert transitions == []
+    scheduler.advance(60)
+    assert transitions == [("inactive", 360.0)]
+    # One wakeup per expired deadline, however many input events came in
+    assert scheduler.wakeups == 11
+    
+    backend.deliver(MOVE)
+    assert transitions[-1] == ("active", 360.0)
+    scheduler.advance(60)
+    assert transitions[-1] == ("inactive", 420.0)
+    monitor.stop()
+
+
+def test_set_timeout_reschedules_the_deadline():
+    monitor, scheduler, backend, transitions = make_monitor(timeout=60.0)
+    scheduler.advance(10)
+    monitor.set_timeout(20.0)
+    scheduler.advance(10)
+    assert transitions == [("inactive", 20.0)]
+    
+    # While inactive the finished deadline job stays finished
+    monitor.set_timeout(5.0)
+    scheduler.advance(60)
+    assert transitions == [("inactive", 20.0)]
+    assert scheduler.pending_jobs == 0
+    monitor.stop()
+
+
+def test_stop_cancels_the_deadline():
+    monitor, scheduler, backend, transitions = make_monitor(timeout=60.0)
+    monitor.stop()
+    backend.deliver(MOVE)
+    scheduler.advance(120)
+    assert transitions == [] and scheduler.pending_jobs == 0
@@ -0,0 +1,69 @@
+"""
+Tests of suspend detection and how the timers handle a resume.
+"""
+
+from screen_keeper.core.activity_monitor import ActivityMonitor
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+
+
+def test_suspend_gap_from_suspended_time():
+    clock = VirtualClock(suspend_threshold=5.0)
+    mark = clock.suspended_ns()
+    clock.suspend(4.0)
+    assert clock.suspend_gap_ns(mark) == 0
+    clock.suspend(600.0)
+    assert clock.suspend_gap_ns(mark) == 604 * 10**9
+    # The monotonic time skipped it
+    assert clock.now() == 0.0
+
+
+def test_suspend_gap_from_overshoot():
+    # Where suspended time is not measured, a wait ending late is a suspend
+    clock = VirtualClock(suspend_threshold=5.0)
+    expected_ns = 10 * 10**9
+    clock.advance(14.0)
+    assert clock.suspend_gap_ns(0, expected_ns) == 0
+    clock.advance(100.0)
+    assert clock.suspend_gap_ns(0, expected_ns) == 104 * 10**9
+    assert clock.suspend_gap_ns(0) == 0
+
+
+def test_resume_is_not_inactivity():
+    clock = VirtualClock()
+    scheduler = Scheduler(clock, threaded=False)
+    monitor = ActivityMonitor(inactivity_timeout=60.0, clock=clock, scheduler=scheduler,
+                              input_backend=SimulatedInput(echo=False))
+    transitions = []
+    monitor.set_inactivity_callback(lambda: transitions.append(clock.now()))
+    assert monitor.start()
+    
+    scheduler.advance(30)
+    clock.suspend(3600)
+    scheduler.advance(30)
+    # The deadline came up right after the resume and was restarted from it
+    assert transitions == []
+    scheduler.advance(60)
+    assert transitions == [120.0]
+    monitor.stop()
+
+
+def test_no_input_simulated_right_after_resume():
+    clock = VirtualClock()
+    scheduler = Scheduler(clock, threaded=False)
+    backend = SimulatedInput(echo=False)
+    mover = MouseMover(interval=30, mode=MouseMover.MODE_KEYBOARD, clock=clock,
+                       scheduler=scheduler, input_backend=backend)
+    assert mover.start()
+    scheduler.advance(30)
+    assert backend.injections == 1
+    
+    clock.suspend(3600)
+    scheduler.advance(30)
+    assert backend.injections == 1
+    # The interval restarts at the resume
+    scheduler.advance(30)
+    assert backend.injections == 2
+    mover.stop()
@@ -0,0 +1,198 @@
+"""
+Tests of the control protocol, served on a private instance socket.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import pytest
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.control import MAX_LINE, ControlServer
+from screen_keeper.core.events import COMMAND_RECEIVED
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+from screen_keeper.core.sleep_preventer import SleepPreventer
+from screen_keeper.ctl import request
+from screen_keeper.instance import InstanceGuard
+from tests.fakes import FakeInhibitor
+
+
+class Client:
+    """Blocking line protocol client on one connection."""
+    
+    def __init__(self, guard: InstanceGuard):
+        self.conn = guard.connect()
+        assert self.conn is not None
+        self.replies = self.conn.makefile("rb")
+    
+    def send_line(self, line: bytes) -> dict:
+        self.conn.sendall(line + b"\n")
+        return json.loads(self.replies.readline())
+    
+    def send(self, **message) -> dict:
+        return self.send_line(json.dumps(message).encode())
+    
+    def close(self) -> None:
+        self.replies.close()
+        self.conn.close()
+
+
+@pytest.fixture
+def guard(monkeypatch, tmp_path):
+    # Socket files, where used, go to a private configuration directory
+    monkeypatch.setenv("HOME", str(tmp_path))
+    guard = InstanceGuard(f"screen-keeper-test-{os.getpid()}-{id(tmp_path)}")
+    assert guard.acquire()
+    yield guard
+    guard.release()
+
+
+@pytest.fixture
+def keeper(tmp_path):
+    scheduler = Scheduler()
+    settings = Settings(str(tmp_path / "config.json"), scheduler=scheduler)
+    settings.update({
+        "prevent_sleep": False,
+        "simulation_mode": "auto",
+        "record_activity_history": False,
+    })
+    preventer = SleepPreventer(scheduler=scheduler,
+                               inhibitor_factory=lambda: FakeInhibitor(idle_lock=True))
+    preventer.system = "Linux"
+    keeper = KeepAliveController(settings, sleep_preventer=preventer,
+                                 input_backend=SimulatedInput(echo=False), scheduler=scheduler)
+    
+    def run_command(command, args, future):
+        # The application's part, as in headless mode
+        if command == "start":
+            future.set_result(None if keeper.start() else keeper.last_error)
+        elif command == "stop":
+            keeper.stop()
+            future.set_result(None)
+    keeper.event_bus.subscribe(COMMAND_RECEIVED, run_command)
+    yield keeper
+    keeper.stop()
+
+
+@pytest.fixture
+def server(guard, keeper):
+    server = ControlServer(guard, keeper, keeper.settings, timeout=2.0)
+    assert server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(guard, server):
+    client = Client(guard)
+    yield client
+    client.close()
+
+
+def test_status_is_answered_from_the_snapshot(client, keeper):
+    reply = client.send(id=7, command="status")
+    assert reply["id"] == 7 and reply["ok"]
+    assert reply["result"]["running"] is False
+    assert reply["result"]["pid"] == os.getpid()
+    
+    assert client.send(id=8, command="start") == {"id": 8, "ok": True, "result": None}
+    assert keeper.is_running
+    status = client.send(id=9, command="status")["result"]
+    assert status["running"] is True
+    assert status["strategy"] == "inhibitor"
+    
+    assert client.send(id=10, command="stop")["ok"]
+    assert client.send(id=11, command="status")["result"]["running"] is False
+
+
+def test_get_and_set_settings(client, keeper):
+    settings = client.send(id=1, command="get_settings")["result"]
+    assert settings["inactivity_timeout"] == 60.0
+    
+    reply = client.send(id=2, command="set_settings", settings={"inactivity_timeout": 120})
+    assert reply == {"id": 2, "ok": True, "result": None}
+    assert keeper.settings.values.inactivity_timeout == 120.0
+    assert client.send(id=3, command="get_settings")["result"]["inactivity_timeout"] == 120.0
+
+
+@pytest.mark.parametrize("settings, error", [
+    ({"inactivty_timeout": 120}, "unknown setting inactivty_timeout"),
+    ({"inactivity_timeout": -5}, "inactivity_timeout must be at least"),
+    ({"prevent_sleep": "yes"}, "prevent_sleep must be bool"),
+    ({}, "non-empty"),
+    (None, "non-empty"),
+])
+def test_invalid_settings_change_nothing(client, keeper, settings, error):
+    before = keeper.settings.get_all()
+    message = {"id": 4, "command": "set_settings"}
+    if settings is not None:
+        message["settings"] = settings
+    reply = client.send(**message)
+    assert reply["id"] == 4 and reply["ok"] is False
+    assert error in reply["error"]
+    assert keeper.settings.get_all() == before
+
+
+@pytest.mark.parametrize("line, error", [
+    (b"not json", "invalid JSON"),
+    (b"[1, 2]", "request must be a JSON object"),
+    (b'{"id": 5, "command": "reboot"}', "unknown command 'reboot'"),
+    (b'{"id": 6}', "unknown command None"),
+])
+def test_bad_requests_get_error_replies(client, line, error):
+    reply = client.send_line(line)
+    assert reply["ok"] is False
+    assert reply["error"] == error
+    # The connection stays usable
+    assert client.send(id=1, command="status")["ok"]
+
+
+def test_too_long_request_closes_the_connection(client):
+    reply = client.send_line(b"x" * (MAX_LINE + 1))
+    assert reply == {"id": None, "ok": False, "error": "request too long"}
+    assert client.replies.readline() == b""
+
+
+def test_token_is_required_when_set(guard, client):
+    guard._token = "secret"
+    assert client.send(id=1, command="status")["error"] == "invalid token"
+    assert client.send(id=2, command="status", token="secret")["ok"]
+
+
+def test_concurrent_clients(guard, server):
+    clients = [Client(guard) for _ in range(50)]
+    for i, c in enumerate(clients):
+        c.conn.sendall(json.dumps({"id": i, "command": "status"}).encode() + b"\n")
+    replies = [json.loads(c.replies.readline()) for c in clients]
+    for c in clients:
+        c.close()
+    assert [reply["id"] for reply in replies] == list(range(50))
+    assert all(reply["ok"] for reply in replies)
+    # One thread serves them all
+    assert sum(t.name == "screen-keeper-control" for t in threading.enumerate()) == 1
+
+
+def test_ctl_request(guard, server, keeper):
+    assert request("set_settings", {"mouse_movement_interval": 45}, instance=guard)["ok"]
+    assert keeper.settings.values.mouse_movement_interval == 45.0
+    assert request("get_settings", instance=guard)["result"]["mouse_movement_interval"] == 45.0
+
+
+def test_stop_with_connected_clients_is_clean(guard, keeper, caplog):
+    server = ControlServer(guard, keeper, keeper.settings)
+    assert server.start()
+    clients = [Client(guard) for _ in range(3)]
+    assert clients[0].send(id=1, command="status")["ok"]
+    
+    with caplog.at_level(logging.DEBUG, logger="asyncio"):
+        server.stop()
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    # Connections are closed by the server
+    for c in clients:
+        assert c.replies.readline() == b""
+        c.close()
+    assert not [t for t in threading.enumerate() if t.name == "screen-keeper-control"]
@@ -0,0 +1,151 @@
+"""
+Tests of the D-Bus inhibitor against a private dbus-daemon.
+
+A fake logind and a fake ScreenSaver service run on one private bus,
+passed to DBusInhibitor as both its system and its session bus.
+"""
+
+import os
+import select
+import shutil
+import subprocess
+import threading
+import warnings
+
+import pytest
+
+pytest.importorskip("jeepney")
+from jeepney import HeaderFields, MessageType, new_error, new_method_return  # noqa: E402
+from jeepney.bus_messages import message_bus  # noqa: E402
+from jeepney.io.blocking import open_dbus_connection  # noqa: E402
+
+from screen_keeper.core.dbus_inhibitor import DBusInhibitor  # noqa: E402
+
+pytestmark = pytest.mark.skipif(shutil.which("dbus-daemon") is None,
+                                reason="dbus-daemon is not installed")
+
+
+@pytest.fixture
+def bus():
+    """Address of a private session bus, shut down after the test."""
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    address = daemon.stdout.readline().strip()
+    yield address
+    daemon.terminate()
+    daemon.wait(5)
+
+
+class FakeServices:
+    """logind and ScreenSaver services answering Inhibit calls on a thread."""
+    
+    def __init__(self, address: str):
+        self.conn = open_dbus_connection(bus=address, enable_fds=True)
+        for name in ("org.freedesktop.login1", "org.freedesktop.ScreenSaver"):
+            self.conn.send_and_get_reply(message_bus.RequestName(name))
+        # Read ends of the pipes handed out by logind Inhibit
+        self.lock_pipes = []
+        self.cookies = set()
+        self.calls = []
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+    
+    def _serve(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                msg = self.conn.receive(timeout=0.1)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            if msg.header.message_type == MessageType.method_call:
+                self._answer(msg)
+    
+    def _answer(self, msg) -> None:
+        path, member = msg.header.fields[HeaderFields.path], msg.header.fields[HeaderFields.member]
+        self.calls.append((path, member))
+        if path == "/org/freedesktop/login1" and member == "Inhibit":
+            read_end, write_end = os.pipe()
+            self.lock_pipes.append(read_end)
+            self.conn.send(new_method_return(msg, "h", (write_end,)))
+            # Like logind, keep only the read end
+            os.close(write_end)
+        elif path == "/org/freedesktop/ScreenSaver" and member == "Inhibit":
+            cookie = len(self.calls)
+            self.cookies.add(cookie)
+            self.conn.send(new_method_return(msg, "u", (cookie,)))
+        elif path == "/org/freedesktop/ScreenSaver" and member == "UnInhibit":
+            self.cookies.discard(msg.body[0])
+            self.conn.send(new_method_return(msg))
+        else:
+            self.conn.send(new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod"))
+    
+    def lock_released(self, index: int = 0, timeout: float = 1.0) -> bool:
+        """Check if every copy of a logind lock descriptor was closed."""
+        readable, _, _ = select.select([self.lock_pipes[index]], [], [], timeout)
+        return bool(readable) and os.read(self.lock_pipes[index], 1) == b""
+    
+    def close(self) -> None:
+        self._stopping.set()
+        self._thread.join()
+        self.conn.close()
+        for fd in self.lock_pipes:
+            os.close(fd)
+
+
+@pytest.fixture
+def services(bus):
+    services = FakeServices(bus)
+    yield services
+    services.close()
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd" if os.path.isdir("/proc/self/fd") else "/dev/fd"))
+
+
+def test_inhibit_and_release(bus, services):
+    inhibitor = DBusInhibitor(system_bus=bus, session_bus=bus)
+    before = open_fds()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        assert inhibitor.acquire("testing")
+    # The descriptor is taken over, no copy is left for the garbage collector
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+    assert inhibitor.holds_sleep_lock and inhibitor.holds_idle_lock
+    assert len(services.cookies) == 1
+    assert not services.lock_released(timeout=0.2)
+    
+    inhibitor.release()
+    assert not inhibitor.holds_sleep_lock and not inhibitor.holds_idle_lock
+    assert services.cookies == set()
+    assert ("/org/freedesktop/ScreenSaver", "UnInhibit") in services.calls
+    assert services.lock_released()
+    # Only the read end kept by the fake logind is left
+    assert open_fds() == before + len(services.lock_pipes)
+
+
+def test_without_sleep_only_screensaver_is_inhibited(bus, services):
+    inhibitor = DBusInhibitor(system_bus=bus, session_bus=bus)
+    assert inhibitor.acquire("testing", sleep=False)
+    assert not inhibitor.holds_sleep_lock and inhibitor.holds_idle_lock
+    assert not services.lock_pipes
+    inhibitor.release()
+    assert services.cookies == set()
+
+
+def test_repeated_cycles_release_every_lock(bus, services):
+    inhibitor = DBusInhibitor(system_bus=bus, session_bus=bus)
+    for i in range(5):
+        assert inhibitor.acquire("testing")
+        inhibitor.release()
+        assert services.lock_released(i)
+    assert services.cookies == set()
+
+
+def test_no_services_on_the_bus(bus):
+    inhibitor = DBusInhibitor(system_bus=bus, session_bus=bus)
+    assert not inhibitor.acquire("testing")
+    assert not inhibitor.holds_sleep_lock and not inhibitor.holds_idle_lock
+    inhibitor.release()
@@ -0,0 +1,94 @@
+"""
+Tests of the memory-mapped activity history.
+"""
+
+import os
+
+from screen_keeper.core.history import ActivityHistory
+
+MINUTE_NS = 60_000_000_000
+# A wall clock time on a whole minute
+T0 = 1_700_000_040 * 1_000_000_000
+
+
+def test_transitions_wrap_around(tmp_path):
+    history = ActivityHistory(str(tmp_path / "history.bin"), capacity=4, minutes=60)
+    for i in range(10):
+        history.append(i % 2 == 0, T0 + i * 1_000_000_000)
+    
+    assert history.transition_count == 10
+    # Only the newest `capacity` transitions, oldest first
+    assert history.transitions() == [(T0 / 1e9 + i, i % 2 == 0) for i in range(6, 10)]
+    history.close()
+
+
+def test_minutes_wrap_around(tmp_path):
+    history = ActivityHistory(str(tmp_path / "history.bin"), capacity=4, minutes=10)
+    start = T0 / 1e9
+    history.mark_active(T0)
+    history.mark_active(T0 + 3 * MINUTE_NS)
+    assert history.active_minutes(start, start + 4 * 60) == [True, False, False, True, False]
+    
+    # Twelve minutes later the first mark has left the bitmap, and its bit,
+    # reused by minute 10, was cleared
+    history.mark_active(T0 + 12 * MINUTE_NS)
+    assert history.active_minutes(start, start + 12 * 60) == [False] * 3 + [True] + [False] * 8 + [True]
+    
+    # Input older than the bitmap is ignored
+    history.mark_active(T0)
+    assert history.active_minutes(start, start) == [False]
+    history.close()
+
+
+def test_reopening_keeps_the_history(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ActivityHistory(path, capacity=8, minutes=60)
+    history.append(False, T0)
+    history.append(True, T0 + 90 * 1_000_000_000)
+    history.mark_active(T0 + 2 * MINUTE_NS)
+    history.close()
+    
+    history = ActivityHistory(path, capacity=8, minutes=60)
+    assert history.transitions() == [(T0 / 1e9, False), (T0 / 1e9 + 90, True)]
+    assert history.active_minutes(T0 / 1e9, T0 / 1e9 + 120) == [False, False, True]
+    
+    # Appending continues after the reopened records
+    history.append(False, T0 + 200 * 1_000_000_000)
+    assert history.transition_count == 3
+    history.close()
+
+
+def test_other_layout_starts_over(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ActivityHistory(path, capacity=8, minutes=60)
+    history.append(True, T0)
+    history.close()
+    
+    # Another capacity changes the file size
+    history = ActivityHistory(path, capacity=16, minutes=60)
+    assert history.transitions() == []
+    history.append(True, T0)
+    history.close()
+    
+    # Same size, but another version in the header
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write((99).to_bytes(4, "little"))
+    history = ActivityHistory(path, capacity=16, minutes=60)
+    assert history.transitions() == [] and history.transition_count == 0
+    history.close()
+
+
+def test_garbage_file_starts_over(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(os.urandom(64 + 8 * 8 + 8))
+    history = ActivityHistory(str(path), capacity=8, minutes=60)
+    assert history.transitions() == []
+    history.close()
+
+
+def test_in_memory_history():
+    history = ActivityHistory(capacity=2, minutes=60)
+    history.append(True, T0)
+    assert history.transitions() == [(T0 / 1e9, True)]
+    history.close()
@@ -0,0 +1,105 @@
+"""
+Tests of the idle counter activity monitor, in virtual time.
+"""
+
+import pytest
+
+from screen_keeper.core import idle_monitor
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.idle_monitor import IdleActivityMonitor
+from screen_keeper.core.scheduler import Scheduler
+
+
+class FakeIdleCounter:
+    """System idle counter on a virtual clock."""
+    
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.last_input_ns = clock.now_ns()
+        self.reads = 0
+        self.failing = False
+        self.closed = False
+    
+    def input(self) -> None:
+        self.last_input_ns = self.clock.now_ns()
+    
+    def get_idle_time_ms(self):
+        self.reads += 1
+        if self.failing:
+            return None
+        return (self.clock.now_ns() - self.last_input_ns) // 1_000_000
+    
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(start=1000.0)
+
+
+@pytest.fixture
+def counter(clock, monkeypatch):
+    counter = FakeIdleCounter(clock)
+    monkeypatch.setattr(idle_monitor, "open_idle_counter", lambda: counter)
+    return counter
+
+
+@pytest.fixture
+def monitor(clock, counter):
+    scheduler = Scheduler(clock, threaded=False)
+    monitor = IdleActivityMonitor(inactivity_timeout=60.0, poll_interval=1.0, clock=clock,
+                                  scheduler=scheduler)
+    monitor.transitions = []
+    monitor.set_inactivity_callback(lambda: monitor.transitions.append(("inactive", clock.now())))
+    monitor.set_activity_callback(lambda: monitor.transitions.append(("active", clock.now())))
+    assert monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def test_counter_is_read_once_per_deadline_while_active(monitor, counter, clock):
+    scheduler = monitor._scheduler
+    scheduler.advance(30)
+    counter.input()
+    scheduler.advance(59)
+    assert monitor.transitions == []
+    # At start, at the first deadline, then at the deadline moved by the input
+    assert counter.reads == 2
+    scheduler.advance(1)
+    assert monitor.transitions == [("inactive", 1090.0)]
+    assert counter.reads == 3
+
+
+def test_input_while_inactive_is_seen_within_the_poll_interval(monitor, counter, clock):
+    scheduler = monitor._scheduler
+    scheduler.advance(70)
+    assert monitor.is_inactive
+    scheduler.advance(0.5)
+    counter.input()
+    scheduler.advance(1)
+    assert monitor.transitions[-1] == ("active", 1071.0)
+    assert not monitor.is_inactive
+
+
+def test_simulated_input_does_not_end_inactivity(monitor, counter, clock):
+    scheduler = monitor._scheduler
+    scheduler.advance(70)
+    for _ in range(5):
+        # The simulator resets the counter and says so
+        counter.input()
+        monitor.note_synthetic_input()
+        scheduler.advance(30)
+    assert monitor.is_inactive
+    assert [name for name, _ in monitor.transitions] == ["inactive"]
+
+
+def test_failed_read_stops_polling(monitor, counter):
+    scheduler = monitor._scheduler
+    counter.failing = True
+    scheduler.advance(120)
+    assert counter.reads == 1
+    assert scheduler.pending_jobs == 0
+    
+    monitor.stop()
+    assert counter.closed
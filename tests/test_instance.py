@@ -0,0 +1,116 @@
+"""
+Tests of the single instance lock and the hand-off of later launches.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from screen_keeper import instance as instance_module
+from screen_keeper.config.settings import Settings
+from screen_keeper.control import ControlServer
+from screen_keeper.core.events import COMMAND_RECEIVED
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+from screen_keeper.instance import InstanceGuard
+from screen_keeper.main import send_command
+
+
+@pytest.fixture
+def name(monkeypatch, tmp_path):
+    # Socket and port files, where used, go to a private configuration directory
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return f"screen-keeper-test-{os.getpid()}-{id(tmp_path)}"
+
+
+@pytest.fixture
+def short_home(monkeypatch):
+    # Unix socket paths are short, too short for the pytest temporary directory
+    home = Path(tempfile.mkdtemp(prefix="sk-"))
+    monkeypatch.setenv("HOME", str(home))
+    yield home
+    shutil.rmtree(home)
+
+
+def test_second_instance_is_refused_until_release(name):
+    first, second = InstanceGuard(name), InstanceGuard(name)
+    assert first.acquire()
+    assert not second.acquire()
+    assert second.listening_socket is None
+    
+    conn = second.connect()
+    assert conn is not None
+    conn.close()
+    
+    first.release()
+    assert second.connect() is None
+    assert second.acquire()
+    second.release()
+
+
+def test_lock_is_released_when_the_process_dies(name):
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys, time; from screen_keeper.instance import InstanceGuard; "
+         f"guard = InstanceGuard({name!r}); print(guard.acquire(), flush=True); time.sleep(60)"],
+        stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    try:
+        assert holder.stdout.readline().strip() == "True"
+        guard = InstanceGuard(name)
+        assert not guard.acquire()
+    finally:
+        holder.kill()
+        holder.wait()
+    assert guard.acquire()
+    guard.release()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_socket_file_left_by_a_crash_is_taken_over(short_home, monkeypatch):
+    # The socket file variant, as used on POSIX systems other than Linux
+    home = short_home
+    monkeypatch.setattr(instance_module.sys, "platform", "darwin")
+    guard = InstanceGuard("test")
+    socket_file = home / ".screen-keeper" / "test.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as crashed:
+        crashed.bind(str(socket_file))
+    assert socket_file.exists()
+    
+    assert guard.acquire()
+    assert oct(socket_file.stat().st_mode & 0o777) == oct(0o600)
+    assert not InstanceGuard("test").acquire()
+    guard.release()
+    assert not socket_file.exists()
+
+
+def test_later_launch_hands_its_command_over(name, tmp_path):
+    running = InstanceGuard(name)
+    assert running.acquire()
+    scheduler = Scheduler()
+    settings = Settings(str(tmp_path / "config.json"), scheduler=scheduler)
+    keeper = KeepAliveController(settings, input_backend=SimulatedInput(echo=False),
+                                 scheduler=scheduler)
+    commands = []
+    
+    def on_command(command, args, future):
+        commands.append(command)
+        future.set_result(None if command == "show" else f"{command} refused")
+    keeper.event_bus.subscribe(COMMAND_RECEIVED, on_command)
+    server = ControlServer(running, keeper, settings, timeout=2.0)
+    assert server.start()
+    try:
+        later = InstanceGuard(name)
+        assert not later.acquire()
+        assert send_command(later, "show") == 0
+        assert send_command(later, "start") == 1
+        assert commands == ["show", "start"]
+    finally:
+        server.stop()
+        running.release()
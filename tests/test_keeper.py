@@ -0,0 +1,46 @@
+"""
+Tests of keep-alive controller warnings.
+"""
+
+import threading
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+from screen_keeper.core.sleep_preventer import SleepPreventer
+
+
+def test_warning_callback_runs_without_the_lock(tmp_path):
+    scheduler = Scheduler()
+    settings = Settings(str(tmp_path / "config.json"), scheduler=scheduler)
+    settings.update({
+        "prevent_sleep": True,
+        "use_activity_detection": True,
+        "activity_backend": "hooks",
+        "simulation_mode": "mouse",
+        "record_activity_history": False,
+    })
+    # Sleep cannot be prevented on an unknown system, so start() warns
+    preventer = SleepPreventer(scheduler=scheduler)
+    preventer.system = "Unknown"
+    keeper = KeepAliveController(settings, sleep_preventer=preventer,
+                                 input_backend=SimulatedInput(echo=False), scheduler=scheduler)
+    
+    statuses = []
+    
+    def on_warning(message):
+        # A modal message box blocks here; other threads must still get the status
+        reader = threading.Thread(target=lambda: statuses.append(keeper.status()))
+        reader.start()
+        reader.join(2.0)
+        assert not reader.is_alive()
+    keeper.set_warning_callback(on_warning)
+    
+    assert keeper.start()
+    assert len(statuses) == 1 and statuses[0]["running"]
+    
+    # Warnings of a restart are passed on as well, once
+    keeper.apply_settings({"prevent_sleep": True})
+    assert len(statuses) == 2
+    keeper.stop()
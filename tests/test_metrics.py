@@ -0,0 +1,84 @@
+"""
+Tests of the metrics registry and its snapshot files.
+"""
+
+import json
+import threading
+
+import pytest
+
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.metrics import Histogram, MetricsRegistry, SnapshotWriter
+from screen_keeper.core.scheduler import Scheduler
+
+
+def test_counters_are_created_once_and_thread_safe():
+    registry = MetricsRegistry()
+    counter = registry.counter("events")
+    assert registry.counter("events") is counter
+    
+    def count():
+        for _ in range(10000):
+            registry.counter("events").inc()
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 40000
+
+
+def test_histogram_buckets():
+    histogram = Histogram("latency", bounds=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0, 3.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    # Bounds are inclusive upper limits
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 1, "+Inf": 2}
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == pytest.approx(5.65)
+    assert (snapshot["min"], snapshot["max"]) == (0.05, 3.0)
+
+
+def test_snapshot_reads_gauges_and_survives_failing_ones():
+    registry = MetricsRegistry()
+    registry.counter("b").inc(2)
+    registry.counter("a").inc()
+    registry.gauge("queue", lambda: 7)
+    registry.gauge("broken", lambda: 1 / 0)
+    registry.histogram("latency").observe(0.002)
+    
+    snapshot = registry.snapshot()
+    assert list(snapshot["counters"].items()) == [("a", 1), ("b", 2)]
+    assert snapshot["gauges"] == {"queue": 7}
+    assert snapshot["histograms"]["latency"]["count"] == 1
+
+
+def test_snapshot_writer(tmp_path):
+    registry = MetricsRegistry()
+    ticks = registry.counter("ticks")
+    scheduler = Scheduler(VirtualClock(), threaded=False)
+    path = tmp_path / "metrics.json"
+    writer = SnapshotWriter(registry, str(path), interval=60, scheduler=scheduler)
+    
+    writer.start()
+    scheduler.advance(0)
+    assert json.loads(path.read_text())["counters"] == {"ticks": 0}
+    
+    ticks.inc()
+    scheduler.advance(59)
+    assert json.loads(path.read_text())["counters"] == {"ticks": 0}
+    scheduler.advance(1)
+    assert json.loads(path.read_text())["counters"] == {"ticks": 1}
+    
+    # A last snapshot on stop, then no more writes
+    ticks.inc()
+    writer.stop()
+    assert json.loads(path.read_text())["counters"] == {"ticks": 2}
+    assert scheduler.pending_jobs == 0
+    assert not (tmp_path / "metrics.json.tmp").exists()
+
+
+def test_unwritable_snapshot_is_reported(tmp_path):
+    registry = MetricsRegistry()
+    assert not registry.write_snapshot(str(tmp_path / "missing" / "metrics.json"))
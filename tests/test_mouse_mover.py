@@ -0,0 +1,164 @@
+"""
+Tests of the activity simulator: adaptive intervals, skipping simulations
+while the user is active, and mode changes while it runs.
+"""
+
+import pytest
+
+from screen_keeper.core import mouse_mover
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+
+
+class FakeDisplay:
+    """Stand-in for X11Display, counting screensaver resets."""
+    
+    opened = []
+    
+    def __init__(self):
+        self.resets = 0
+        self.closed = False
+    
+    @classmethod
+    def open(cls) -> "FakeDisplay":
+        display = cls()
+        cls.opened.append(display)
+        return display
+    
+    def reset_screensaver(self) -> None:
+        self.resets += 1
+    
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def display(monkeypatch):
+    FakeDisplay.opened = []
+    monkeypatch.setattr(mouse_mover, "X11Display", FakeDisplay)
+    return FakeDisplay
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler(VirtualClock(), threaded=False)
+
+
+def make_mover(scheduler, mode, **options):
+    backend = SimulatedInput(echo=False)
+    options.setdefault("interval", 10)
+    mover = MouseMover(mode=mode, scheduler=scheduler, input_backend=backend, **options)
+    return mover, backend
+
+
+def test_adaptive_interval_lands_before_the_idle_timeout(scheduler):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD, adaptive=True,
+                                idle_timeout=300, safety_margin=10)
+    assert mover.effective_interval == 290
+    # Already idle for 100 s, so the first simulation is brought forward
+    assert mover.start(idle_elapsed=100)
+    scheduler.advance(189)
+    assert backend.injections == 0
+    scheduler.advance(1)
+    assert backend.injections == 1
+    scheduler.advance(290)
+    assert backend.injections == 2
+    mover.stop()
+
+
+def test_adaptive_interval_limits(scheduler):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD, adaptive=True,
+                                idle_timeout=8, safety_margin=10)
+    assert mover.effective_interval == MouseMover.MIN_ADAPTIVE_INTERVAL
+    # An unknown idle timeout falls back to the fixed interval
+    mover.idle_timeout = 0.0
+    assert mover.effective_interval == 10
+
+
+def test_skipped_while_the_user_is_active(scheduler):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD)
+    clock = scheduler.clock
+    last_input = [None]
+    mover.set_activity_source(
+        lambda: None if last_input[0] is None else clock.now() - last_input[0])
+    assert mover.start()
+    
+    # Input 4 s before the simulation was due: wait a full interval from it
+    scheduler.advance(6)
+    last_input[0] = clock.now()
+    scheduler.advance(4)
+    assert backend.injections == 0 and mover.skipped_simulations == 1
+    scheduler.advance(5.9)
+    assert backend.injections == 0
+    scheduler.advance(0.1)
+    assert backend.injections == 1
+    
+    # No input since, so the next one is not skipped
+    scheduler.advance(10)
+    assert backend.injections == 2 and mover.skipped_simulations == 1
+    mover.stop()
+
+
+def test_own_input_is_not_the_users(scheduler):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD)
+    clock = scheduler.clock
+    # An idle counter reset by each simulation
+    mover.set_simulation_callback(lambda: last_input.__setitem__(0, clock.now()))
+    last_input = [0.0]
+    mover.set_activity_source(lambda: clock.now() - last_input[0])
+    assert mover.start()
+    scheduler.advance(35)
+    assert backend.injections == 3 and mover.skipped_simulations == 0
+    mover.stop()
+
+
+def test_switch_to_screensaver_opens_the_display(scheduler, display):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD)
+    assert mover.start()
+    assert display.opened == []
+    
+    mover.set_mode(MouseMover.MODE_SCREENSAVER)
+    presses = backend.key_presses
+    scheduler.advance(25)
+    assert display.opened[0].resets == 2
+    assert backend.key_presses == presses
+    
+    mover.set_mode(MouseMover.MODE_KEYBOARD)
+    assert display.opened[0].closed
+    mover.stop()
+
+
+def test_switch_to_screensaver_without_display_keeps_the_mode(scheduler, monkeypatch):
+    monkeypatch.setattr(mouse_mover.X11Display, "open", classmethod(lambda cls: None))
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD)
+    assert mover.start()
+    mover.set_mode(MouseMover.MODE_SCREENSAVER)
+    assert mover.mode == MouseMover.MODE_KEYBOARD
+    scheduler.advance(15)
+    assert backend.key_presses > 0
+    mover.stop()
+
+
+def test_switch_to_mouse_restores_the_position_on_stop(scheduler, display):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_KEYBOARD)
+    backend.position = (40, 30)
+    assert mover.start()
+    
+    mover.set_mode(MouseMover.MODE_MOUSE)
+    scheduler.advance(15)
+    assert backend.mouse_moves > 1
+    backend.position = (41, 30)
+    mover.stop()
+    assert backend.position == (40, 30)
+
+
+def test_stop_after_switch_from_screensaver_closes_nothing_twice(scheduler, display):
+    mover, backend = make_mover(scheduler, MouseMover.MODE_SCREENSAVER)
+    assert mover.start()
+    mover.set_mode(MouseMover.MODE_BOTH)
+    assert display.opened[0].closed
+    scheduler.advance(15)
+    assert backend.injections > 0
+    assert mover.stop()
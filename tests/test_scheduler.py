@@ -0,0 +1,144 @@
+"""
+Tests of the shared scheduler, in virtual time and on its thread.
+"""
+
+import threading
+import time
+
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.scheduler import Scheduler
+
+
+def virtual_scheduler(coalesce_window: float = 0.25) -> Scheduler:
+    return Scheduler(VirtualClock(), coalesce_window=coalesce_window, threaded=False)
+
+
+def recorder(scheduler: Scheduler, runs: list, name: str, every=None):
+    """Callback appending its name and run time, repeating every `every` seconds."""
+    def callback():
+        runs.append((name, scheduler.clock.now()))
+        return every
+    return callback
+
+
+def test_jobs_run_in_deadline_order():
+    scheduler = virtual_scheduler(coalesce_window=0)
+    runs = []
+    for name, delay in (("c", 3), ("a", 1), ("b", 2)):
+        scheduler.schedule(delay, recorder(scheduler, runs, name))
+    assert scheduler.advance(10) == 3
+    assert runs == [("a", 1.0), ("b", 2.0), ("c", 3.0)]
+    assert scheduler.pending_jobs == 0
+
+
+def test_close_deadlines_share_a_wakeup():
+    scheduler = virtual_scheduler(coalesce_window=0.25)
+    runs = []
+    scheduler.schedule(1.0, recorder(scheduler, runs, "a"))
+    scheduler.schedule(1.2, recorder(scheduler, runs, "b"))
+    scheduler.schedule(1.5, recorder(scheduler, runs, "c"))
+    
+    assert scheduler.advance(2) == 2
+    # b runs early with a; c is outside the window
+    assert runs == [("a", 1.0), ("b", 1.0), ("c", 1.5)]
+    assert scheduler.wakeups == 2 and scheduler.jobs_run == 3
+
+
+def test_repeating_job():
+    scheduler = virtual_scheduler()
+    runs = []
+    job = scheduler.schedule(1, recorder(scheduler, runs, "a", every=2))
+    scheduler.advance(6)
+    assert [t for _, t in runs] == [1.0, 3.0, 5.0]
+    assert not job.finished
+    
+    scheduler.cancel(job)
+    scheduler.advance(10)
+    assert len(runs) == 3 and scheduler.pending_jobs == 0
+
+
+def test_cancel_before_the_deadline():
+    scheduler = virtual_scheduler()
+    runs = []
+    job = scheduler.schedule(1, recorder(scheduler, runs, "a"))
+    scheduler.cancel(job)
+    scheduler.cancel(None)
+    assert scheduler.pending_jobs == 0
+    assert scheduler.advance(5) == 0 and runs == []
+
+
+def test_reschedule_pending_job():
+    scheduler = virtual_scheduler()
+    runs = []
+    job = scheduler.schedule(1, recorder(scheduler, runs, "a"))
+    scheduler.advance(0.5)
+    scheduler.reschedule(job, 3)
+    scheduler.advance(10)
+    assert runs == [("a", 3.5)]
+
+
+def test_reschedule_is_a_no_op_for_finished_and_cancelled_jobs():
+    scheduler = virtual_scheduler()
+    runs = []
+    finished = scheduler.schedule(1, recorder(scheduler, runs, "finished"))
+    cancelled = scheduler.schedule(1, recorder(scheduler, runs, "cancelled"))
+    scheduler.cancel(cancelled)
+    scheduler.advance(2)
+    assert finished.finished
+    
+    scheduler.reschedule(finished, 1)
+    scheduler.reschedule(cancelled, 1)
+    assert scheduler.pending_jobs == 0
+    scheduler.advance(5)
+    assert runs == [("finished", 1.0)]
+
+
+def test_reschedule_while_running_runs_again():
+    scheduler = virtual_scheduler()
+    runs = []
+    
+    def callback():
+        runs.append(scheduler.clock.now())
+        if len(runs) == 1:
+            scheduler.reschedule(job, 2)
+        return None
+    job = scheduler.schedule(1, callback)
+    scheduler.advance(10)
+    assert runs == [1.0, 3.0]
+    assert job.finished
+
+
+def test_failing_job_is_finished():
+    scheduler = virtual_scheduler()
+    
+    def fail():
+        raise RuntimeError("boom")
+    job = scheduler.schedule(1, fail)
+    scheduler.advance(2)
+    assert job.finished and scheduler.jobs_run == 1
+
+
+def test_threaded_scheduler_runs_on_its_thread():
+    scheduler = Scheduler()
+    threads = []
+    done = threading.Event()
+    
+    def callback():
+        threads.append(threading.current_thread().name)
+        if len(threads) == 3:
+            done.set()
+            return None
+        return 0.01
+    job = scheduler.schedule(0.01, callback)
+    assert done.wait(2.0)
+    assert threads == ["screen-keeper-scheduler"] * 3
+    
+    # Rescheduling a finished job does not bring it back
+    deadline = time.monotonic() + 2.0
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.001)
+    scheduler.reschedule(job, 0)
+    check = threading.Event()
+    scheduler.schedule(0.05, check.set)
+    assert check.wait(2.0)
+    assert len(threads) == 3
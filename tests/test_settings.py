@@ -0,0 +1,169 @@
+"""
+Tests of settings validation, migration and the delayed atomic writes.
+"""
+
+import json
+import os
+
+import pytest
+
+from screen_keeper.config import settings as settings_module
+from screen_keeper.config.schema import SCHEMA_VERSION, VERSION_KEY
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.clock import VirtualClock
+from screen_keeper.core.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler(VirtualClock(), threaded=False)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    return tmp_path / "config.json"
+
+
+def read(path) -> dict:
+    return json.loads(path.read_text())
+
+
+def test_dirty_tracking(config_file, scheduler):
+    settings = Settings(str(config_file), scheduler=scheduler)
+    assert not settings.is_dirty
+    
+    # Setting the current value changes nothing
+    settings.set("inactivity_timeout", 60.0)
+    assert not settings.is_dirty
+    assert settings.save() and settings.write_count == 0
+    
+    settings.set("inactivity_timeout", 90)
+    assert settings.is_dirty
+    assert settings.flush()
+    assert not settings.is_dirty and settings.write_count == 1
+    
+    # Nothing pending, nothing written
+    assert settings.flush() and settings.write_count == 1
+
+
+def test_dirty_keys_win_over_the_file_on_reload(config_file, scheduler):
+    settings = Settings(str(config_file), scheduler=scheduler)
+    settings.set("inactivity_timeout", 90)
+    config_file.write_text(json.dumps({"inactivity_timeout": 30, "mouse_movement_interval": 45}))
+    
+    assert settings.reload() == {"mouse_movement_interval": 45.0}
+    assert settings.values.inactivity_timeout == 90.0
+
+
+def test_save_is_debounced(config_file, scheduler):
+    settings = Settings(str(config_file), save_delay=1.0, scheduler=scheduler)
+    for value in range(100, 110):
+        settings.set("inactivity_timeout", value)
+        settings.save()
+        scheduler.advance(0.5)
+    assert settings.write_count == 0 and not config_file.exists()
+    
+    scheduler.advance(1.0)
+    assert settings.write_count == 1
+    assert read(config_file)["inactivity_timeout"] == 109.0
+    assert not settings.is_dirty
+
+
+def test_flush_writes_atomically_and_syncs(config_file, scheduler, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    
+    def fsync(fd):
+        synced.append(fd)
+        real_fsync(fd)
+    monkeypatch.setattr(settings_module.os, "fsync", fsync)
+    
+    settings = Settings(str(config_file), scheduler=scheduler)
+    settings.update({"inactivity_timeout": 120, "custom_key": [1, 2]})
+    settings.save()
+    assert settings.flush()
+    
+    # The file, and where possible its directory
+    assert len(synced) == (2 if hasattr(os, "O_DIRECTORY") else 1)
+    assert not os.path.exists(str(config_file) + ".tmp")
+    data = read(config_file)
+    assert data[VERSION_KEY] == SCHEMA_VERSION
+    assert data["inactivity_timeout"] == 120.0
+    assert data["custom_key"] == [1, 2]
+    
+    # The pending delayed write was cancelled
+    scheduler.advance(5.0)
+    assert settings.write_count == 1
+
+
+def test_failed_write_keeps_the_old_file_and_the_changes(config_file, scheduler, monkeypatch):
+    config_file.write_text(json.dumps({"inactivity_timeout": 30}))
+    settings = Settings(str(config_file), scheduler=scheduler)
+    settings.set("inactivity_timeout", 45)
+    
+    def fail(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(settings_module.os, "fsync", fail)
+    assert not settings.flush()
+    assert settings.is_dirty
+    assert read(config_file) == {"inactivity_timeout": 30}
+
+
+def test_v0_migration(config_file, scheduler):
+    # Unversioned, with numbers stored as strings
+    config_file.write_text(json.dumps({
+        "inactivity_timeout": " 120 ",
+        "movement_distance": "3",
+        "mouse_movement_interval": "soon",
+    }))
+    settings = Settings(str(config_file), scheduler=scheduler)
+    assert settings.values.inactivity_timeout == 120.0
+    assert settings.values.movement_distance == 3
+    assert settings.values.mouse_movement_interval == 30.0
+    
+    settings.set("prevent_sleep", False)
+    assert settings.flush()
+    assert read(config_file)[VERSION_KEY] == SCHEMA_VERSION
+
+
+def test_invalid_values_fall_back_to_defaults(config_file, scheduler):
+    config_file.write_text(json.dumps({
+        VERSION_KEY: SCHEMA_VERSION,
+        "inactivity_timeout": -1,
+        "mouse_movement_interval": 45.25,
+        "prevent_sleep": 1,
+        "simulation_mode": "teleport",
+        "unknown_key": "kept",
+    }))
+    settings = Settings(str(config_file), scheduler=scheduler)
+    assert settings.values.inactivity_timeout == 60.0
+    assert settings.values.prevent_sleep is True
+    assert settings.values.simulation_mode == "auto"
+    # Rounded to the decimals of the setting
+    assert settings.values.mouse_movement_interval == 45.2
+    assert settings.get("unknown_key") == "kept"
+
+
+def test_invalid_update_changes_nothing(config_file, scheduler):
+    settings = Settings(str(config_file), scheduler=scheduler)
+    notified = []
+    settings.subscribe(notified.append)
+    with pytest.raises(ValueError):
+        settings.update({"inactivity_timeout": 120, "movement_distance": 0})
+    assert settings.values.inactivity_timeout == 60.0
+    assert not settings.is_dirty and notified == []
+
+
+@pytest.mark.parametrize("contents", ["{not json", "[1, 2]", '{"schema_version": "one"}'])
+def test_unreadable_file_is_quarantined(config_file, scheduler, contents):
+    config_file.write_text(contents)
+    settings = Settings(str(config_file), scheduler=scheduler)
+    assert settings.values.inactivity_timeout == 60.0
+    assert not config_file.exists()
+    assert (config_file.parent / "config.json.corrupt").read_text() == contents
+    
+    # The next write does not touch the quarantined copy
+    settings.set("inactivity_timeout", 90)
+    assert settings.flush()
+    assert read(config_file)["inactivity_timeout"] == 90.0
+    assert (config_file.parent / "config.json.corrupt").read_text() == contents
@@ -0,0 +1,26 @@
+"""
+Soak tests: days of synthetic usage replayed through the controller in virtual time.
+"""
+
+import pytest
+
+from screen_keeper.core.simulation import KeepAliveSimulation, synthetic_trace
+
+DAYS = 3
+
+
+@pytest.mark.parametrize("echo", [True, False])
+@pytest.mark.parametrize("mode", ["mouse", "keyboard"])
+def test_multi_day_soak(echo, mode):
+    duration = DAYS * 24 * 3600
+    trace = synthetic_trace(duration, seed=0)
+    simulation = KeepAliveSimulation(
+        {"inactivity_timeout": 60.0, "mouse_movement_interval": 30.0, "simulation_mode": mode},
+        echo=echo,
+    )
+    report = simulation.replay(trace, duration)
+    
+    assert report.input_events == len(trace)
+    assert report.inactive_transitions > 0
+    assert report.injections > 0
+    assert report.false_inactive_transitions == 0
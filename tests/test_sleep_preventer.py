@@ -0,0 +1,91 @@
+"""
+Tests of the sleep preventer, with stand-ins for the Windows API.
+"""
+
+import threading
+import types
+
+import pytest
+
+from screen_keeper.core import sleep_preventer as sleep_preventer_module
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.sleep_preventer import ES_CONTINUOUS, SleepPreventer
+
+
+class FakeKernel32:
+    """Records SetThreadExecutionState calls with the thread that made them."""
+    
+    def __init__(self):
+        self.calls = []
+        self.called = threading.Condition()
+    
+    def SetThreadExecutionState(self, flags):  # noqa: N802 - Windows API name
+        with self.called:
+            self.calls.append((threading.get_ident(), flags))
+            self.called.notify_all()
+        return ES_CONTINUOUS
+    
+    def wait_for(self, predicate) -> None:
+        with self.called:
+            assert self.called.wait_for(lambda: predicate(self.calls), timeout=1.0)
+    
+    def held_by_thread(self) -> dict:
+        """Get the state each thread was left with."""
+        state = {}
+        for thread, flags in self.calls:
+            state[thread] = flags
+        return state
+
+
+@pytest.fixture
+def kernel32(monkeypatch):
+    kernel32 = FakeKernel32()
+    monkeypatch.setattr(sleep_preventer_module.ctypes, "windll",
+                        types.SimpleNamespace(kernel32=kernel32), raising=False)
+    return kernel32
+
+
+def windows_preventer(scheduler: Scheduler) -> SleepPreventer:
+    preventer = SleepPreventer(scheduler=scheduler)
+    preventer.system = "Windows"
+    return preventer
+
+
+def test_execution_state_is_reset_on_the_thread_that_holds_it(kernel32):
+    scheduler = Scheduler()
+    preventer = windows_preventer(scheduler)
+    
+    # Called from another thread, as the GUI or control thread would
+    caller = threading.Thread(target=preventer.prevent_sleep)
+    caller.start()
+    caller.join()
+    assert preventer.is_active
+    kernel32.wait_for(lambda calls: any(flags != ES_CONTINUOUS and thread != caller.ident
+                                        for thread, flags in calls))
+    
+    assert preventer.allow_sleep()
+    kernel32.wait_for(lambda calls: calls[-1][1] == ES_CONTINUOUS and calls[-1][0] != caller.ident)
+    
+    held = {thread: flags for thread, flags in kernel32.held_by_thread().items() if flags != ES_CONTINUOUS}
+    assert held == {}
+    assert len({thread for thread, flags in kernel32.calls if thread != caller.ident}) == 1
+
+
+def test_repeated_cycles_leave_no_state(kernel32):
+    scheduler = Scheduler()
+    preventer = windows_preventer(scheduler)
+    for _ in range(20):
+        assert preventer.prevent_sleep()
+        assert preventer.allow_sleep()
+    
+    done = threading.Event()
+    scheduler.schedule(0, done.set)
+    assert done.wait(1.0)
+    assert all(flags == ES_CONTINUOUS for flags in kernel32.held_by_thread().values())
+
+
+def test_failed_call_reports_failure(kernel32, monkeypatch):
+    monkeypatch.setattr(kernel32, "SetThreadExecutionState", lambda flags: 0)
+    preventer = windows_preventer(Scheduler())
+    assert not preventer.prevent_sleep()
+    assert not preventer.is_active
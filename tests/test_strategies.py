@@ -0,0 +1,52 @@
+"""
+Tests of keep-alive strategy selection and the prevent_sleep setting.
+"""
+
+import pytest
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import SimulatedInput
+from screen_keeper.core.sleep_preventer import SleepPreventer
+from screen_keeper.core.strategies import StrategyEngine
+from tests.fakes import FakeInhibitor
+
+
+def linux_preventer(inhibitor: FakeInhibitor) -> SleepPreventer:
+    preventer = SleepPreventer(scheduler=Scheduler(), inhibitor_factory=lambda: inhibitor)
+    preventer.system = "Linux"
+    return preventer
+
+
+@pytest.mark.parametrize("block_sleep", [True, False])
+def test_inhibitor_strategy_blocks_sleep_only_when_asked(block_sleep):
+    inhibitor = FakeInhibitor(sleep_lock=True, idle_lock=True)
+    engine = StrategyEngine.for_mode(linux_preventer(inhibitor), 30.0, "auto", block_sleep)
+    
+    strategy = engine.select()
+    assert strategy.name == "inhibitor"
+    assert inhibitor.holds_idle_lock
+    assert inhibitor.holds_sleep_lock == block_sleep
+    
+    engine.release()
+    assert not inhibitor.holds_idle_lock and not inhibitor.holds_sleep_lock
+
+
+def test_keeper_honors_prevent_sleep_setting(tmp_path):
+    scheduler = Scheduler()
+    settings = Settings(str(tmp_path / "config.json"), scheduler=scheduler)
+    settings.update({
+        "prevent_sleep": False,
+        "simulation_mode": "auto",
+        "record_activity_history": False,
+    })
+    inhibitor = FakeInhibitor(sleep_lock=True, idle_lock=True)
+    keeper = KeepAliveController(settings, sleep_preventer=linux_preventer(inhibitor),
+                                 input_backend=SimulatedInput(echo=False), scheduler=scheduler)
+    
+    assert keeper.start()
+    assert keeper.strategy.name == "inhibitor"
+    assert inhibitor.holds_idle_lock
+    assert not inhibitor.holds_sleep_lock
+    keeper.stop()
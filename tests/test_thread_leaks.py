@@ -0,0 +1,88 @@
+"""
+Checks that start/stop cycles of the core components leave no threads behind.
+"""
+
+import json
+import threading
+
+import pytest
+
+from screen_keeper.config.settings import Settings
+from screen_keeper.core.activity_monitor import ActivityMonitor
+from screen_keeper.core.keeper import KeepAliveController
+from screen_keeper.core.mouse_mover import MouseMover
+from screen_keeper.core.scheduler import Scheduler
+from screen_keeper.core.simulation import MOVE, SimulatedInput
+from screen_keeper.core.sleep_preventer import SleepPreventer
+from tests.fakes import FakeInhibitor
+
+CYCLES = 50
+
+
+@pytest.fixture
+def scheduler():
+    """Scheduler of one test, with its thread already running."""
+    scheduler = Scheduler()
+    done = threading.Event()
+    scheduler.schedule(0, done.set)
+    assert done.wait(1.0)
+    return scheduler
+
+
+def settle(scheduler: Scheduler) -> None:
+    """Wait until the scheduler has run everything due now, e.g. queued events."""
+    done = threading.Event()
+    scheduler.schedule(0, done.set)
+    assert done.wait(1.0)
+
+
+def test_mouse_mover_cycles(scheduler):
+    mover = MouseMover(interval=300, mode=MouseMover.MODE_BOTH, scheduler=scheduler,
+                       input_backend=SimulatedInput(echo=False))
+    before = set(threading.enumerate())
+    for _ in range(CYCLES):
+        mover.start()
+        mover.stop()
+    settle(scheduler)
+    assert set(threading.enumerate()) == before
+
+
+def test_activity_monitor_cycles(scheduler):
+    backend = SimulatedInput(echo=False)
+    monitor = ActivityMonitor(inactivity_timeout=300, scheduler=scheduler, input_backend=backend)
+    before = set(threading.enumerate())
+    for _ in range(CYCLES):
+        monitor.start()
+        backend.deliver(MOVE)
+        monitor.stop()
+    settle(scheduler)
+    assert set(threading.enumerate()) == before
+
+
+def test_keeper_cycles(scheduler, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({
+        "prevent_sleep": True,
+        "use_activity_detection": True,
+        "activity_backend": "hooks",
+        "simulation_mode": "mouse",
+        "record_activity_history": False,
+    }))
+    preventer = SleepPreventer(scheduler=scheduler, inhibitor_factory=FakeInhibitor)
+    preventer.system = "Linux"
+    keeper = KeepAliveController(Settings(str(config_file), scheduler=scheduler),
+                                 sleep_preventer=preventer, input_backend=SimulatedInput(echo=False),
+                                 scheduler=scheduler)
+    before = set(threading.enumerate())
+    for _ in range(CYCLES):
+        assert keeper.start()
+        # Flap between inactive and active, starting and stopping the simulator
+        monitor = keeper.activity_monitor
+        monitor._on_inactive_callback()
+        settle(scheduler)
+        assert keeper.mouse_mover.is_running
+        monitor._on_active_callback()
+        settle(scheduler)
+        keeper.stop()
+    settle(scheduler)
+    assert set(threading.enumerate()) == before